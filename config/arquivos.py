@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+# Só biblioteca padrão: usado pelas métricas e pelo catálogo
+
+# umask do processo, lida uma vez (os.umask só permite lê-la trocando-a)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+def gravar_atomico(caminho: str, conteudo: str) -> None:
+    """
+    Grava um arquivo de texto de forma atômica.
+    
+    O conteúdo vai para um temporário na mesma pasta, sincronizado com o
+    disco e renomeado sobre o destino: quem lê o arquivo (node_exporter,
+    outra execução) nunca encontra uma gravação pela metade.
+    
+    Args:
+        caminho: Arquivo de destino (a pasta é criada se não existir)
+        conteudo: Texto gravado em UTF-8
+    """
+    pasta = os.path.dirname(caminho) or '.'
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta, prefix='.tmp_', suffix='.part')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        # mkstemp cria com 0600; o coletor textfile do node_exporter roda com outro usuário
+        os.chmod(temporario, 0o644 & ~_UMASK)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
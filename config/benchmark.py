@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Resultados das execuções e baseline de referência
+PASTA_BENCHMARKS = "benchmarks"
+ARQUIVO_BASELINE = os.path.join(PASTA_BENCHMARKS, "baseline.json")
+
+# Aumento relativo da mediana considerado regressão (0.2 = 20% mais lento)
+LIMITE_REGRESSAO = 0.20
+
+# Diferenças menores que isto (ms) são tratadas como ruído
+RUIDO_MINIMO_MS = 1.0
+
+# Módulos cujo tempo de importação (python -X importtime) é medido: o menu
+# e os comandos sem coleta não podem voltar a carregar pandas e o Selenium na partida
+MODULOS_IMPORTACAO = ("main", "config.coleta", "config.saidas")
+
+# Importações mais pesadas listadas para cada módulo
+MAIORES_IMPORTACOES = 5
+
+# Produtos da fixture sintética: (nome, categoria, porção, cabeçalho da 3ª coluna, valores por 100g/100ml)
+PRODUTOS_FIXTURE = [
+    ("Croissant Traditional", "PADOCA", "1 unidade", "50g", (350, 37, 5, 21, 14, 0, 1, 328)),
+    ("Pure Black (Double Shot)", "BEBIDAS PURISTAS", "1/2 copo pequeno (36ml)", "36ml", (25, 4.2, 1.9, 0, 0, 0, 0, 0)),
+    ("Latte", "BEBIDAS PURISTAS", "1 copo médio", "220ml", (62, 5.1, 3.2, 3.1, 2, 0, 0, 44)),
+    ("Yuzu Tonic", "BEBIDAS AUTORAIS", "1 copo grande", "330ml", (41, 10.2, 0, 0, 0, 0, 0, 12)),
+    ("Cookie de Chocolate", "DOCES", "1 unidade (80g)", "80g", (480, 62, 6, 23, 12, 0, 2.4, 290)),
+    ("Pão de Queijo", "PADOCA", "3/4 de unidade", "30g", (320, 38, 6.5, 16, 5, 0, 0.8, 610)),
+]
+
+def resumir(amostras: List[float]) -> Dict[str, float]:
+    """
+    Estatísticas de uma etapa, em milissegundos.
+    
+    Args:
+        amostras: Durações em segundos
+    
+    Returns:
+        Dicionário com n, total, media, mediana, p95, minimo e maximo
+    """
+    ms = sorted(amostra * 1000 for amostra in amostras)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return {
+        'n': len(ms),
+        'total': round(sum(ms), 3),
+        'media': round(statistics.fmean(ms), 3),
+        'mediana': round(statistics.median(ms), 3),
+        'p95': round(p95, 3),
+        'minimo': round(ms[0], 3),
+        'maximo': round(ms[-1], 3),
+    }
+
+class Cronometro:
+    """Acumula as durações de cada etapa do benchmark"""
+    
+    def __init__(self):
+        self.amostras: Dict[str, List[float]] = {}
+    
+    def medir(self, etapa: str, funcao: Callable, *args, **kwargs):
+        """Executa funcao(*args, **kwargs) com a saída silenciada e registra a duração"""
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao(*args, **kwargs)
+            duracao = time.perf_counter() - inicio
+        self.amostras.setdefault(etapa, []).append(duracao)
+        return resultado
+    
+    def registrar(self, etapa: str, segundos: float) -> None:
+        """Registra uma duração medida fora do processo (ex: importação)"""
+        self.amostras.setdefault(etapa, []).append(segundos)
+    
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        return {etapa: resumir(amostras) for etapa, amostras in self.amostras.items()}
+
+def _html_popup(nome: str, porcao: str, coluna_porcao: str, valores) -> str:
+    nutrientes = ['Valor energético (kcal)', 'Carboidratos (g)', 'Proteínas (g)', 'Gorduras totais (g)',
+                  'Gorduras saturadas (g)', 'Gorduras trans (g)', 'Fibra alimentar (g)', 'Sódio (mg)']
+    linhas = ''.join(f"<tr><td>{nutriente}</td><td>{valor}</td><td>{round(valor * 0.5, 1)}</td></tr>"
+                     for nutriente, valor in zip(nutrientes, valores))
+    return (f'<div class="styles_popup__nejKE"><button class="close">×</button><h4>{nome}</h4>'
+            f'<p>Porção: {porcao}</p><table><tr><th>Nutriente</th><th>100g</th><th>{coluna_porcao}</th></tr>'
+            f'{linhas}</table></div>')
+
+def gerar_fixture(pasta: str, num_produtos: int = 30) -> str:
+    """
+    Gera uma gravação sintética no formato de config/gravacao.py.
+    
+    Serve para rodar o benchmark sem uma gravação real do site: o menu tem
+    uma seção por categoria e um botão "info nutricional" por produto.
+    
+    Args:
+        pasta: Pasta da fixture (recriada)
+        num_produtos: Número de produtos do menu
+    
+    Returns:
+        A própria pasta
+    """
+    from config.gravacao import SCRIPT_REPRODUCAO
+    from config.esperas import SELETOR_BOTOES
+    
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.makedirs(os.path.join(pasta, 'popups'))
+    
+    secoes: Dict[str, List[str]] = {}
+    rotas = {}
+    popups = []
+    for indice in range(num_produtos):
+        nome, categoria, porcao, coluna_porcao, valores = PRODUTOS_FIXTURE[indice % len(PRODUTOS_FIXTURE)]
+        nome = f"{nome} {indice + 1}"
+        arquivo = os.path.join('popups', f"{indice:04d}.html")
+        with open(os.path.join(pasta, arquivo), 'w', encoding='utf-8') as saida:
+            saida.write(_html_popup(nome, porcao, coluna_porcao, valores))
+        rota = f"/__popups/{indice:04d}.html"
+        rotas[rota] = {'arquivo': arquivo, 'tipo': 'text/html; charset=utf-8'}
+        popups.append(rota)
+        secoes.setdefault(categoria, []).append(
+            f'<div class="produto"><h3>{nome}</h3><span class="styles_btNutritionalInfo__3QtQz">info nutricional</span></div>')
+    
+    corpo = ''.join(f"<section><h2>{categoria}</h2>{''.join(itens)}</section>" for categoria, itens in secoes.items())
+    script = SCRIPT_REPRODUCAO % (json.dumps(SELETOR_BOTOES), json.dumps(popups))
+    with open(os.path.join(pasta, 'menu.html'), 'w', encoding='utf-8') as saida:
+        saida.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Menu</title></head>"
+                    f"<body>{corpo}{script}</body></html>")
+    
+    manifesto = {'url': 'fixture', 'caminho_menu': '/menu', 'rotas': rotas}
+    with open(os.path.join(pasta, 'manifesto.json'), 'w', encoding='utf-8') as saida:
+        json.dump(manifesto, saida, ensure_ascii=False, indent=2)
+    return pasta
+
+def registros_fixture(num_registros: int) -> List[Dict[str, str]]:
+    """Registros sintéticos, como os da coleta, para as etapas sem navegador"""
+    from config.coleta import criar_registro_vazio
+    
+    colunas = ['CALORIAS (kcal)', 'CARBOIDRATOS (g)', 'PROTEINAS (g)', 'GORDURAS_TOTAIS (g)',
+               'GORDURAS_SATURADAS (g)', 'GORDURAS_TRANS (g)', 'FIBRAS (g)', 'SODIO (mg)']
+    registros = []
+    for indice in range(num_registros):
+        nome, categoria, porcao, coluna_porcao, valores = PRODUTOS_FIXTURE[indice % len(PRODUTOS_FIXTURE)]
+        registro = criar_registro_vazio("http://127.0.0.1/menu")
+        registro.update(NOME_PRODUTO=f"{nome} {indice + 1}", CATEGORIA=categoria, **{'PORCAO (g)': porcao})
+        registro.update({coluna: str(valor) for coluna, valor in zip(colunas, valores)})
+        registros.append(registro)
+    return registros
+
+def medir_etapas_navegador(cronometro: Cronometro, url: str, num_produtos: Optional[int]) -> bool:
+    """
+    Mede as etapas que dependem do navegador contra um menu servido localmente.
+    
+    Etapas: driver (get_webdriver), pagina (driver.get + pagina_pronta),
+    popup (popup_pronto após o clique), extracao (extrair_dados_tabela_nutricional
+    com o popup já aberto, sem esperar de novo), categoria (determinar_categoria)
+    e produto (scroll, clique, espera, extração e fechamento).
+    
+    Returns:
+        False se nenhum navegador estiver disponível
+    """
+    from config.coleta import (get_webdriver, encontrar_botoes_info, determinar_categoria,
+                               extrair_dados_tabela_nutricional, fechar_popup)
+    from config.esperas import Esperas
+    
+    driver = cronometro.medir('driver', get_webdriver, perfil_enxuto=False)
+    if not driver:
+        cronometro.amostras.pop('driver', None)
+        return False
+    
+    try:
+        esperas = Esperas(driver)
+        
+        def carregar_pagina():
+            driver.get(url)
+            esperas.pagina_pronta()
+        
+        cronometro.medir('pagina', carregar_pagina)
+        botoes = cronometro.medir('botoes', encontrar_botoes_info, driver)
+        if num_produtos:
+            botoes = botoes[:num_produtos]
+        
+        for botao in botoes:
+            inicio = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                driver.execute_script("arguments[0].scrollIntoView(true);", botao)
+                esperas.apos_scroll()
+                driver.execute_script("arguments[0].click();", botao)
+            cronometro.medir('popup', esperas.popup_pronto)
+            cronometro.medir('extracao', extrair_dados_tabela_nutricional, driver, esperas=esperas, categoria='PRODUTOS',
+                             aguardar_popup=False)
+            cronometro.medir('categoria', determinar_categoria, driver)
+            with redirect_stdout(io.StringIO()):
+                fechar_popup(driver)
+                esperas.popup_fechado()
+            cronometro.amostras.setdefault('produto', []).append(time.perf_counter() - inicio)
+    finally:
+        driver.quit()
+    return True
+
+def medir_etapas_dados(cronometro: Cronometro, num_registros: int, repeticoes: int) -> None:
+    """
+    Mede as etapas sem navegador sobre registros sintéticos: porcoes
+    (processar_porcoes_conhecidas), csv (escrita do DataFrame já processado)
+    e salvar_dados_csv (as duas juntas, como na coleta).
+    """
+    import pandas as pd
+    from config.coleta import processar_porcoes_conhecidas, salvar_dados_csv
+    
+    registros = registros_fixture(num_registros)
+    pasta = tempfile.mkdtemp(prefix="benchmark_coffee_")
+    try:
+        for repeticao in range(repeticoes):
+            df = cronometro.medir('porcoes', processar_porcoes_conhecidas, pd.DataFrame(registros))
+            caminho = os.path.join(pasta, f"csv_{repeticao}.csv")
+            cronometro.medir('csv', df.to_csv, caminho, index=False, encoding='utf-8-sig')
+            cronometro.medir('salvar_dados_csv', salvar_dados_csv, registros, pasta,
+                             os.path.join(pasta, f"salvar_{repeticao}.csv"))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+def medir_importacao(modulo: str) -> Dict:
+    """
+    Importa o módulo num interpretador novo com -X importtime.
+    
+    Args:
+        modulo: Nome do módulo (ex: 'config.coleta')
+    
+    Returns:
+        Dicionário com 'total' (segundos, cumulativo do módulo) e 'maiores'
+        (as importações diretas mais pesadas, em ms)
+    """
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    ambiente = dict(os.environ, PYTHONPATH=raiz)
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                              cwd=raiz, env=ambiente, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else modulo)
+    
+    # Linhas "import time: self [us] | cumulative | nome", com o nome indentado pela
+    # profundidade; as importações filhas aparecem antes da linha do módulo pai
+    total, diretas, pendentes = 0, [], []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or '|' not in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        if not cumulativo.strip().isdigit():
+            continue  # cabeçalho
+        profundidade = (len(nome) - len(nome.lstrip()) - 1) // 2
+        if profundidade == 1:
+            pendentes.append((nome.strip(), int(cumulativo) / 1000))
+        elif profundidade == 0:
+            if nome.strip() == modulo:
+                total, diretas = int(cumulativo) / 1e6, pendentes
+            pendentes = []
+    
+    maiores = sorted(diretas, key=lambda item: item[1], reverse=True)[:MAIORES_IMPORTACOES]
+    return {'total': total, 'maiores': [{'modulo': nome, 'ms': round(ms, 3)} for nome, ms in maiores]}
+
+def medir_importacoes(cronometro: Cronometro, repeticoes: int) -> Dict[str, List[Dict]]:
+    """
+    Mede a importação de cada módulo de MODULOS_IMPORTACAO (etapas 'import <módulo>').
+    
+    Returns:
+        As importações diretas mais pesadas de cada módulo, da última repetição
+    """
+    maiores = {}
+    for modulo in MODULOS_IMPORTACAO:
+        for _ in range(repeticoes):
+            medicao = medir_importacao(modulo)
+            cronometro.registrar(f"import {modulo}", medicao['total'])
+        maiores[modulo] = medicao['maiores']
+    return maiores
+
+def executar_benchmark(gravacao: Optional[str] = None, num_produtos: Optional[int] = None,
+                       num_registros: int = 1000, repeticoes: int = 5, navegador: bool = True,
+                       importacao: bool = True) -> Dict:
+    """
+    Executa o benchmark de todas as etapas.
+    
+    Args:
+        gravacao: Pasta de uma gravação (config/gravacao.py); None = fixture sintética
+        num_produtos: Popups medidos (None = todos os da gravação; 30 na fixture)
+        num_registros: Registros usados nas etapas de porções e CSV
+        repeticoes: Repetições das etapas de porções e CSV
+        navegador: Se False, mede só as etapas sem navegador
+        importacao: Se False, não mede o tempo de importação dos módulos
+    
+    Returns:
+        Resultado com o ambiente, os parâmetros e o resumo de cada etapa
+    """
+    from config.gravacao import servir_gravacao
+    
+    cronometro = Cronometro()
+    pasta_temporaria = None
+    
+    if navegador:
+        if gravacao is None:
+            pasta_temporaria = tempfile.mkdtemp(prefix="fixture_coffee_")
+            gravacao = gerar_fixture(os.path.join(pasta_temporaria, 'fixture'), num_produtos or 30)
+        servidor, url = servir_gravacao(gravacao)
+        try:
+            navegador = medir_etapas_navegador(cronometro, url, num_produtos)
+            if not navegador:
+                log.warning("⚠️  Nenhum navegador disponível: medindo só as etapas sem navegador")
+        finally:
+            servidor.shutdown()
+            if pasta_temporaria:
+                shutil.rmtree(pasta_temporaria, ignore_errors=True)
+    
+    medir_etapas_dados(cronometro, num_registros, repeticoes)
+    
+    # Interpretadores novos: não importa o que este processo já carregou
+    maiores_importacoes = medir_importacoes(cronometro, repeticoes) if importacao else {}
+    
+    resultado = {
+        'data': datetime.now().replace(microsecond=0).isoformat(),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+        },
+        'parametros': {
+            'gravacao': 'sintetica' if pasta_temporaria else gravacao,
+            'navegador': navegador,
+            'num_registros': num_registros,
+            'repeticoes': repeticoes,
+        },
+        'etapas': cronometro.resumo(),
+    }
+    if maiores_importacoes:
+        resultado['importacao'] = maiores_importacoes
+    return resultado
+
+def salvar_resultado(resultado: Dict, caminho: Optional[str] = None) -> str:
+    """
+    Grava um resultado em JSON.
+    
+    Args:
+        resultado: Retorno de executar_benchmark
+        caminho: Arquivo (None = benchmarks/resultados/benchmark_<timestamp>.json)
+    
+    Returns:
+        Caminho do arquivo gravado
+    """
+    if caminho is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        caminho = os.path.join(PASTA_BENCHMARKS, "resultados", f"benchmark_{timestamp}.json")
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as saida:
+        json.dump(resultado, saida, ensure_ascii=False, indent=2)
+    return caminho
+
+def carregar_resultado(caminho: str) -> Dict:
+    with open(caminho, 'r', encoding='utf-8') as entrada:
+        return json.load(entrada)
+
+def ultimo_resultado() -> Optional[str]:
+    """Resultado mais recente em benchmarks/resultados (None se não houver)"""
+    pasta = os.path.join(PASTA_BENCHMARKS, "resultados")
+    if not os.path.isdir(pasta):
+        return None
+    arquivos = sorted(nome for nome in os.listdir(pasta) if nome.endswith('.json'))
+    return os.path.join(pasta, arquivos[-1]) if arquivos else None
+
+def imprimir_resultado(resultado: Dict) -> None:
+    """Tabela com as estatísticas de cada etapa"""
+    print(f"\n📊 Benchmark de {resultado['data']} (Python {resultado['ambiente']['python']})")
+    print(f"{'etapa':<22}{'n':>6}{'mediana':>12}{'p95':>12}{'total':>12}")
+    for etapa, resumo in resultado['etapas'].items():
+        print(f"{etapa:<22}{resumo['n']:>6}{resumo['mediana']:>10.2f}ms{resumo['p95']:>10.2f}ms{resumo['total']:>10.1f}ms")
+    
+    for modulo, maiores in resultado.get('importacao', {}).items():
+        detalhes = ', '.join(f"{item['modulo']} {item['ms']:.1f}ms" for item in maiores)
+        print(f"   • import {modulo}: {detalhes}")
+
+def comparar_resultados(baseline: Dict, atual: Dict, limite: float = LIMITE_REGRESSAO,
+                        ruido_ms: float = RUIDO_MINIMO_MS) -> List[str]:
+    """
+    Compara a mediana de cada etapa com a baseline.
+    
+    Args:
+        baseline: Resultado de referência
+        atual: Resultado a verificar
+        limite: Aumento relativo da mediana tolerado
+        ruido_ms: Diferença absoluta (ms) abaixo da qual não há regressão
+    
+    Returns:
+        Lista das etapas que regrediram
+    """
+    regressoes = []
+    print(f"\n{'etapa':<22}{'baseline':>12}{'atual':>12}{'variação':>11}")
+    for etapa, resumo in atual['etapas'].items():
+        referencia = baseline['etapas'].get(etapa)
+        if not referencia:
+            print(f"{etapa:<22}{'—':>12}{resumo['mediana']:>10.2f}ms{'nova':>11}")
+            continue
+        antes, depois = referencia['mediana'], resumo['mediana']
+        variacao = (depois - antes) / antes if antes else 0.0
+        regrediu = variacao > limite and depois - antes > ruido_ms
+        marcador = " ❌" if regrediu else (" ✅" if variacao < -limite else "")
+        print(f"{etapa:<22}{antes:>10.2f}ms{depois:>10.2f}ms{variacao:>+10.1%}{marcador}")
+        if regrediu:
+            regressoes.append(etapa)
+    return regressoes
+
+def estimar_duracao(num_produtos: int, caminho_baseline: str = ARQUIVO_BASELINE) -> Optional[float]:
+    """
+    Estima a duração (segundos) de uma coleta pela baseline.
+    
+    Usa a inicialização do driver, o carregamento da página e a mediana por
+    produto medidos no benchmark. A baseline é medida contra um servidor
+    local, então a estimativa não inclui a latência do site real.
+    
+    Args:
+        num_produtos: Produtos a coletar
+        caminho_baseline: Arquivo da baseline
+    
+    Returns:
+        Segundos estimados, ou None se não houver baseline com as etapas do navegador
+    """
+    try:
+        etapas = carregar_resultado(caminho_baseline)['etapas']
+        milissegundos = (etapas['driver']['mediana'] + etapas['pagina']['mediana']
+                         + num_produtos * etapas['produto']['mediana'])
+    except (OSError, ValueError, KeyError):
+        return None
+    return milissegundos / 1000
+
+def main(argv=None) -> int:
+    """Linha de comando: executar o benchmark ou comparar com a baseline"""
+    parser = argparse.ArgumentParser(description="Benchmark das etapas da coleta do The Coffee")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    executar = subcomandos.add_parser('executar', help="mede todas as etapas e grava o resultado")
+    executar.add_argument('--gravacao', help="pasta de uma gravação real (padrão: fixture sintética)")
+    executar.add_argument('--produtos', type=int, help="popups medidos")
+    executar.add_argument('--registros', type=int, default=1000, help="registros das etapas de porções e CSV")
+    executar.add_argument('--repeticoes', type=int, default=5)
+    executar.add_argument('--sem-navegador', action='store_true', help="mede só as etapas sem navegador")
+    executar.add_argument('--sem-importacao', action='store_true',
+                          help="não mede o tempo de importação (python -X importtime)")
+    executar.add_argument('--saida', help="arquivo do resultado")
+    executar.add_argument('--baseline', action='store_true', help=f"grava o resultado também como {ARQUIVO_BASELINE}")
+    
+    comparar = subcomandos.add_parser('comparar', help="compara um resultado com a baseline")
+    comparar.add_argument('resultado', nargs='?', help="resultado a verificar (padrão: o mais recente)")
+    comparar.add_argument('--baseline', default=ARQUIVO_BASELINE)
+    comparar.add_argument('--limite', type=float, default=LIMITE_REGRESSAO,
+                          help="aumento relativo da mediana tolerado (padrão: 0.20)")
+    comparar.add_argument('--ruido-ms', type=float, default=RUIDO_MINIMO_MS)
+    
+    argumentos = parser.parse_args(argv)
+    
+    if argumentos.comando == 'executar':
+        resultado = executar_benchmark(argumentos.gravacao, argumentos.produtos, argumentos.registros,
+                                       argumentos.repeticoes, navegador=not argumentos.sem_navegador,
+                                       importacao=not argumentos.sem_importacao)
+        imprimir_resultado(resultado)
+        print(f"\n💾 Resultado salvo em {salvar_resultado(resultado, argumentos.saida)}")
+        if argumentos.baseline:
+            print(f"💾 Baseline atualizada: {salvar_resultado(resultado, ARQUIVO_BASELINE)}")
+        return 0
+    
+    caminho = argumentos.resultado or ultimo_resultado()
+    if not caminho or not os.path.exists(argumentos.baseline):
+        print("❌ É preciso um resultado e uma baseline (python main.py benchmark executar --baseline)")
+        return 2
+    regressoes = comparar_resultados(carregar_resultado(argumentos.baseline), carregar_resultado(caminho),
+                                     argumentos.limite, argumentos.ruido_ms)
+    if regressoes:
+        print(f"\n❌ Regressão acima de {argumentos.limite:.0%} em: {', '.join(regressoes)}")
+        return 1
+    print(f"\n✅ Nenhuma regressão acima de {argumentos.limite:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
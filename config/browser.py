@@ -2,9 +2,51 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
+import json
+import shutil
 import subprocess
 import platform
-from typing import Dict, List, Optional
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Cache em disco da detecção do navegador e do caminho do WebDriver
+CACHE_NAVEGADOR = os.environ.get(
+    'THE_COFFEE_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'scraping_the_coffee', 'navegador.json')
+)
+
+# Ordem de preferência dos navegadores
+ORDEM_PREFERENCIA = ('chrome', 'chromium', 'firefox', 'edge', 'safari')
+
+def get_browser_path(browser_name: str) -> Optional[str]:
+    """
+    Retorna o caminho do executável de um navegador, sem criar subprocessos.
+    
+    Args:
+        browser_name: Nome do navegador para localizar
+        
+    Returns:
+        Caminho do executável ou None se o navegador não for encontrado
+    """
+    system = platform.system()
+    
+    # Para Linux: equivalente ao comando which, mas sem subprocesso
+    if system == 'Linux':
+        return shutil.which(browser_name)
+    
+    browser_paths = _get_known_paths(system).get(browser_name.lower(), [])
+    for path in browser_paths:
+        if os.path.exists(path):
+            return path
+    
+    return None
 
 def check_browser_exists(browser_name: str) -> bool:
     """
@@ -16,22 +58,20 @@ def check_browser_exists(browser_name: str) -> bool:
     Returns:
         True se o navegador estiver instalado, False caso contrário
     """
-    system = platform.system()
-    
-    # Para Linux
-    if system == 'Linux':
-        try:
-            # Tenta executar o comando which para verificar se o executável existe
-            subprocess.run(['which', browser_name], 
-                          stdout=subprocess.PIPE, 
-                          stderr=subprocess.PIPE, 
-                          check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+    return get_browser_path(browser_name) is not None
+
+def _get_known_paths(system: str) -> Dict[str, List[str]]:
+    """
+    Retorna os caminhos conhecidos dos navegadores para Windows e MacOS.
     
+    Args:
+        system: Nome do sistema operacional (platform.system())
+        
+    Returns:
+        Dicionário com nome do navegador e lista de caminhos possíveis
+    """
     # Para Windows
-    elif system == 'Windows':
+    if system == 'Windows':
         # Caminhos comuns para navegadores no Windows
         paths = {
             'chrome': [
@@ -51,9 +91,6 @@ def check_browser_exists(browser_name: str) -> bool:
                 r'C:\Program Files\Microsoft\Edge\Application\msedge.exe'
             ],
         }
-        
-        browser_paths = paths.get(browser_name.lower(), [])
-        return any(os.path.exists(path) for path in browser_paths)
     
     # Para MacOS
     elif system == 'Darwin':
@@ -63,11 +100,11 @@ def check_browser_exists(browser_name: str) -> bool:
             'chromium': ['/Applications/Chromium.app/Contents/MacOS/Chromium'],
             'safari': ['/Applications/Safari.app/Contents/MacOS/Safari']
         }
-        
-        browser_paths = paths.get(browser_name.lower(), [])
-        return any(os.path.exists(path) for path in browser_paths)
     
-    return False
+    else:
+        paths = {}
+    
+    return paths
 
 def get_installed_browsers() -> Dict[str, bool]:
     """
@@ -76,10 +113,9 @@ def get_installed_browsers() -> Dict[str, bool]:
     Returns:
         Dicionário com nome do navegador e status de instalação
     """
-    browsers = ['chrome', 'chromium', 'firefox', 'edge', 'safari']
     installed_browsers = {}
     
-    for browser in browsers:
+    for browser in ORDEM_PREFERENCIA:
         installed_browsers[browser] = check_browser_exists(browser)
     
     return installed_browsers
@@ -92,15 +128,205 @@ def get_preferred_browser() -> Optional[str]:
     Returns:
         Nome do navegador preferido ou None se nenhum navegador for encontrado
     """
-    preference_order = ['chrome', 'chromium', 'firefox', 'edge', 'safari']
     installed = get_installed_browsers()
     
-    for browser in preference_order:
+    for browser in ORDEM_PREFERENCIA:
         if installed.get(browser, False):
             return browser
             
     return None
 
+def _versao_arquivo_windows(browser_path: str) -> str:
+    """Versão gravada no recurso de versão de um executável do Windows (sem executá-lo)"""
+    import ctypes
+    from ctypes import wintypes
+    
+    versao = ctypes.windll.version
+    tamanho = versao.GetFileVersionInfoSizeW(browser_path, None)
+    if not tamanho:
+        return ''
+    dados = ctypes.create_string_buffer(tamanho)
+    if not versao.GetFileVersionInfoW(browser_path, 0, tamanho, dados):
+        return ''
+    ponteiro, comprimento = ctypes.c_void_p(), wintypes.UINT()
+    if not versao.VerQueryValueW(dados, '\\', ctypes.byref(ponteiro), ctypes.byref(comprimento)):
+        return ''
+    if not comprimento.value:
+        return ''
+    # VS_FIXEDFILEINFO: assinatura, versão da estrutura, versão do arquivo (MS, LS)
+    campos = ctypes.cast(ponteiro, ctypes.POINTER(wintypes.DWORD * 4)).contents
+    return f"{campos[2] >> 16}.{campos[2] & 0xFFFF}.{campos[3] >> 16}.{campos[3] & 0xFFFF}"
+
+def get_browser_version(browser_path: str) -> str:
+    """
+    Obtém a versão de um navegador.
+    
+    No Windows a versão é lida do próprio executável: lá, rodar o navegador
+    com --version abre uma janela em vez de imprimir a versão.
+    
+    Args:
+        browser_path: Caminho do executável do navegador
+        
+    Returns:
+        Texto da versão ou string vazia se não for possível obtê-la
+    """
+    if platform.system() == 'Windows':
+        try:
+            return _versao_arquivo_windows(browser_path)
+        except (OSError, AttributeError, ValueError):
+            return ''
+    
+    try:
+        resultado = subprocess.run([browser_path, '--version'],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   timeout=10,
+                                   check=True)
+        return resultado.stdout.decode('utf-8', errors='ignore').strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def is_offline_mode() -> bool:
+    """
+    Indica se o modo offline foi ativado pela variável THE_COFFEE_OFFLINE.
+    
+    Returns:
+        True se nenhuma consulta de rede deve ser feita para resolver drivers
+    """
+    return os.environ.get('THE_COFFEE_OFFLINE', '').lower() in ('1', 'true', 'sim', 'yes')
+
+def load_browser_cache(cache_path: str = CACHE_NAVEGADOR) -> Dict:
+    """
+    Lê o cache de navegador do disco.
+    
+    Args:
+        cache_path: Caminho do arquivo de cache
+        
+    Returns:
+        Dicionário com o conteúdo do cache (vazio se inexistente ou corrompido)
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as arquivo:
+            cache = json.load(arquivo)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_browser_cache(cache: Dict, cache_path: str = CACHE_NAVEGADOR) -> None:
+    """
+    Grava o cache de navegador de forma atômica (arquivo temporário + rename).
+    
+    Args:
+        cache: Conteúdo do cache
+        cache_path: Caminho do arquivo de cache
+    """
+    try:
+        pasta = os.path.dirname(cache_path) or '.'
+        os.makedirs(pasta, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+            json.dump(cache, arquivo, indent=2)
+        os.replace(temporario, cache_path)
+    except OSError as e:
+        log.warning("Não foi possível gravar o cache do navegador: %s", e)
+
+def _get_mtime(path: str) -> Optional[float]:
+    """Retorna o mtime de um arquivo ou None se ele não existir"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def get_browser_info(cache_path: str = CACHE_NAVEGADOR) -> Optional[Dict]:
+    """
+    Retorna o navegador preferido, seu executável e versão, usando o cache em disco.
+    
+    O cache é válido enquanto o mtime do executável não mudar e nenhum
+    navegador de maior preferência tiver sido instalado depois (verificado
+    sem subprocessos). Quando o mtime muda, a versão é lida novamente e, se
+    ela também mudou, o caminho do driver salvo é descartado para ser
+    resolvido de novo.
+    
+    Args:
+        cache_path: Caminho do arquivo de cache
+        
+    Returns:
+        Dicionário com 'browser', 'path', 'mtime', 'version' e 'driver_path',
+        ou None se nenhum navegador for encontrado
+    """
+    cache = load_browser_cache(cache_path)
+    
+    # Cache válido: o executável continua no mesmo lugar, não foi alterado e
+    # continua sendo o preferido entre os instalados
+    if cache.get('browser') and cache.get('path') and _get_mtime(cache['path']) == cache.get('mtime'):
+        posicao = ORDEM_PREFERENCIA.index(cache['browser']) if cache['browser'] in ORDEM_PREFERENCIA else 0
+        anteriores = ORDEM_PREFERENCIA[:posicao]
+        if not any(check_browser_exists(browser) for browser in anteriores):
+            return cache
+    
+    preferred = get_preferred_browser()
+    if not preferred:
+        return None
+    
+    path = get_browser_path(preferred)
+    info = {
+        'browser': preferred,
+        'path': path,
+        'mtime': _get_mtime(path) if path else None,
+        'version': get_browser_version(path) if path else '',
+        'driver_path': None,
+    }
+    
+    # Mantém o driver apenas se for o mesmo navegador na mesma versão
+    if cache.get('browser') == preferred and cache.get('version') == info['version']:
+        info['driver_path'] = cache.get('driver_path')
+    
+    save_browser_cache(info, cache_path)
+    return info
+
+def resolve_driver_path(browser_name: str,
+                        installer: Callable[[], str],
+                        offline: Optional[bool] = None,
+                        cache_path: str = CACHE_NAVEGADOR) -> Optional[str]:
+    """
+    Resolve o caminho do WebDriver, consultando o webdriver-manager só quando necessário.
+    
+    Args:
+        browser_name: Nome do navegador em uso
+        installer: Função que instala o driver e retorna seu caminho
+                   (ex: ChromeDriverManager().install)
+        offline: Se True, nunca chama o installer (None = usa THE_COFFEE_OFFLINE)
+        cache_path: Caminho do arquivo de cache
+        
+    Returns:
+        Caminho do driver ou None para deixar o Selenium localizá-lo no PATH
+    """
+    if offline is None:
+        offline = is_offline_mode()
+    
+    cache = load_browser_cache(cache_path)
+    driver_path = cache.get('driver_path')
+    if cache.get('browser') == browser_name and driver_path and os.path.exists(driver_path):
+        return driver_path
+    
+    if offline:
+        # Sem caminho, o Selenium recorreria ao Selenium Manager, que baixa o driver
+        os.environ['SE_OFFLINE'] = 'true'
+        log.warning("Modo offline: driver não está em cache, usando o driver disponível no PATH.")
+        return None
+    
+    try:
+        driver_path = installer()
+    except Exception as e:
+        log.warning("Não foi possível resolver o driver via webdriver-manager: %s", e)
+        return None
+    
+    if cache.get('browser') == browser_name:
+        cache['driver_path'] = driver_path
+        save_browser_cache(cache, cache_path)
+    
+    return driver_path
+
 if __name__ == "__main__":
     # Teste simples para verificar a detecção de navegadores
     browsers = get_installed_browsers()
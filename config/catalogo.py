@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import csv
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.arquivos import gravar_atomico
+from config.log import obter_log
+from config.urls import identificar_loja
+
+log = obter_log(__name__)
+
+# Catálogo das coletas, dentro da pasta de dados
+ARQUIVO_CATALOGO = "catalogo.json"
+
+# Arquivos catalogados: snapshots das coletas (gerar_caminho_arquivo e todas as lojas)
+# nos formatos das saídas (config/saidas.py); histórico, checkpoint e logs ficam de fora
+PREFIXO_SNAPSHOT = "dados_nutricionais_the_coffee_"
+EXTENSOES_DADOS = ('.csv', '.jsonl', '.sqlite', '.parquet')
+
+VERSAO_CATALOGO = 1
+
+# Leitura-modificação-gravação do catálogo por threads do mesmo processo
+_trava = threading.Lock()
+
+def calcular_checksum(caminho: str, tamanho_bloco: int = 1024 * 1024) -> str:
+    """SHA-256 do arquivo, lido em blocos"""
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+def ler_registros(caminho: str):
+    """Registros (dicionários) de um arquivo de dados, de acordo com a extensão"""
+    extensao = os.path.splitext(caminho)[1]
+    if extensao == '.csv':
+        with open(caminho, 'r', encoding='utf-8-sig', newline='') as arquivo:
+            yield from csv.DictReader(arquivo)
+    elif extensao == '.jsonl':
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+    elif extensao == '.sqlite':
+        conexao = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+        conexao.row_factory = sqlite3.Row
+        try:
+            yield from (dict(linha) for linha in conexao.execute("SELECT * FROM produtos"))
+        finally:
+            conexao.close()
+    elif extensao == '.parquet':
+        import pyarrow.parquet as pq
+        yield from pq.read_table(caminho).to_pylist()
+
+def inspecionar_arquivo(caminho: str) -> Dict:
+    """
+    Conta as linhas, as categorias e as lojas de um arquivo de dados.
+    
+    Usada para arquivos que não foram registrados por uma coleta (copiados
+    ou editados à mão); arquivos ilegíveis ficam com linhas = None.
+    
+    Args:
+        caminho: Arquivo de dados
+    
+    Returns:
+        Dicionário com linhas, categorias e lojas
+    """
+    categorias, lojas = Counter(), Counter()
+    linhas = 0
+    try:
+        for registro in ler_registros(caminho):
+            linhas += 1
+            categorias[str(registro.get('CATEGORIA') or 'N/A')] += 1
+            # Snapshots de uma loja não têm a coluna LOJA: a loja vem da URL
+            loja = registro.get('LOJA') or (identificar_loja(str(registro['URL'])) if registro.get('URL') else '')
+            if loja:
+                lojas[str(loja)] += 1
+    except (OSError, ValueError, UnicodeDecodeError, sqlite3.Error, ImportError) as e:
+        log.warning("⚠️  Não foi possível ler %s: %s", os.path.basename(caminho), e)
+        return {'linhas': None, 'categorias': {}, 'lojas': {}}
+    return {'linhas': linhas, 'categorias': dict(categorias), 'lojas': dict(lojas)}
+
+class Catalogo:
+    """
+    Índice dos arquivos de dados em <pasta_dados>/catalogo.json.
+    
+    Cada coleta registra o seu arquivo (linhas, lojas, contagem por categoria,
+    duração e checksum) ao terminar, e as telas de listagem e estatísticas
+    leem só o catálogo. reconciliar() confere a pasta com uma única passada
+    de os.scandir: arquivos novos ou alterados à mão são inspecionados uma vez
+    e os removidos saem do catálogo.
+    """
+    
+    def __init__(self, pasta_dados: str = "dados"):
+        """
+        Args:
+            pasta_dados: Pasta dos arquivos de dados
+        """
+        self.pasta_dados = pasta_dados
+        self.caminho = os.path.join(pasta_dados, ARQUIVO_CATALOGO)
+    
+    def _ler(self) -> Dict:
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as arquivo:
+                return json.load(arquivo)
+        except (OSError, ValueError):
+            return {}
+    
+    def carregar(self) -> Dict[str, Dict]:
+        """Entradas do catálogo por nome de arquivo (vazio se não houver catálogo)"""
+        return self._ler().get('arquivos', {})
+    
+    def compactados(self) -> Dict[str, Dict]:
+        """Entradas dos snapshots já movidos para o arquivo compactado (config/retencao.py)"""
+        return self._ler().get('compactados', {})
+    
+    def _salvar(self, entradas: Dict[str, Dict], compactados: Optional[Dict[str, Dict]] = None) -> None:
+        if compactados is None:
+            compactados = self.compactados()
+        conteudo = {'versao': VERSAO_CATALOGO, 'atualizado': datetime.now().replace(microsecond=0).isoformat(),
+                    'arquivos': entradas, 'compactados': compactados}
+        gravar_atomico(self.caminho, json.dumps(conteudo, ensure_ascii=False, indent=2))
+    
+    def registrar(self, caminho: str, linhas: Optional[int] = None, categorias: Optional[Dict[str, int]] = None,
+                  lojas: Optional[Dict[str, int]] = None, duracao: Optional[float] = None,
+                  origem: str = 'coleta') -> Dict:
+        """
+        Registra (ou atualiza) um arquivo de dados no catálogo.
+        
+        Args:
+            caminho: Arquivo dentro da pasta de dados
+            linhas: Registros gravados (None = contar lendo o arquivo)
+            categorias: Registros por categoria
+            lojas: Registros por loja
+            duracao: Duração da coleta em segundos
+            origem: 'coleta' (registrado pela execução) ou 'externo' (encontrado na pasta)
+        
+        Returns:
+            A entrada gravada
+        """
+        if linhas is None:
+            contagem = inspecionar_arquivo(caminho)
+            linhas, categorias, lojas = contagem['linhas'], contagem['categorias'], contagem['lojas']
+        
+        estado = os.stat(caminho)
+        entrada = {
+            'caminho': caminho,
+            'tamanho': estado.st_size,
+            'modificado': estado.st_mtime_ns,
+            'registrado': datetime.now().replace(microsecond=0).isoformat(),
+            'linhas': linhas,
+            'lojas': dict(lojas or {}),
+            'categorias': dict(categorias or {}),
+            'duracao': round(duracao, 3) if duracao is not None else None,
+            'checksum': calcular_checksum(caminho),
+            'origem': origem,
+        }
+        with _trava:
+            entradas = self.carregar()
+            entradas[os.path.basename(caminho)] = entrada
+            self._salvar(entradas)
+        return entrada
+    
+    def remover(self, nomes: List[str]) -> None:
+        """Retira arquivos do catálogo (os arquivos em si não são apagados)"""
+        with _trava:
+            entradas = self.carregar()
+            for nome in nomes:
+                entradas.pop(os.path.basename(nome), None)
+            self._salvar(entradas)
+    
+    def marcar_compactados(self, nomes: List[str], arquivo_compactado: str) -> None:
+        """
+        Move as entradas dos snapshots compactados para a seção 'compactados',
+        preservando linhas, categorias e checksum do arquivo original.
+        
+        Args:
+            nomes: Snapshots incluídos no arquivo compactado
+            arquivo_compactado: Nome do arquivo compactado
+        """
+        with _trava:
+            documento = self._ler()
+            entradas = documento.get('arquivos', {})
+            compactados = documento.get('compactados', {})
+            for nome in nomes:
+                entrada = entradas.pop(os.path.basename(nome), None) or compactados.get(nome, {})
+                compactados[os.path.basename(nome)] = dict(entrada, arquivo_compactado=arquivo_compactado)
+            self._salvar(entradas, compactados)
+    
+    def reconciliar(self) -> List[Dict]:
+        """
+        Confere o catálogo com a pasta e retorna as entradas, da mais recente à mais antiga.
+        
+        Uma única passada de os.scandir compara tamanho e data de modificação
+        de cada arquivo com o catálogo; só arquivos novos ou alterados são lidos.
+        
+        Returns:
+            Lista de entradas do catálogo (cada uma com a chave 'arquivo')
+        """
+        if not os.path.isdir(self.pasta_dados):
+            return []
+        
+        with _trava:
+            entradas = self.carregar()
+            encontrados = {}
+            alterados = []
+            with os.scandir(self.pasta_dados) as itens:
+                for item in itens:
+                    if (not item.name.startswith(PREFIXO_SNAPSHOT) or not item.name.endswith(EXTENSOES_DADOS)
+                            or not item.is_file()):
+                        continue
+                    estado = item.stat()
+                    entrada = entradas.get(item.name)
+                    if (entrada is None or entrada.get('tamanho') != estado.st_size
+                            or entrada.get('modificado') != estado.st_mtime_ns):
+                        alterados.append(item.path)
+                    encontrados[item.name] = entrada
+            
+            mudou = bool(alterados) or encontrados.keys() != entradas.keys()
+            for caminho in alterados:
+                estado = os.stat(caminho)
+                contagem = inspecionar_arquivo(caminho)
+                encontrados[os.path.basename(caminho)] = {
+                    'caminho': caminho,
+                    'tamanho': estado.st_size,
+                    'modificado': estado.st_mtime_ns,
+                    'registrado': datetime.now().replace(microsecond=0).isoformat(),
+                    'linhas': contagem['linhas'],
+                    'lojas': contagem['lojas'],
+                    'categorias': contagem['categorias'],
+                    'duracao': None,
+                    'checksum': calcular_checksum(caminho),
+                    'origem': 'externo',
+                }
+            if mudou:
+                self._salvar(encontrados)
+        
+        return [dict(entrada, arquivo=nome)
+                for nome, entrada in sorted(encontrados.items(), key=lambda item: item[1]['modificado'], reverse=True)]
+
+def registrar_saida(saida, duracao: Optional[float] = None, loja: Optional[str] = None) -> Optional[Dict]:
+    """
+    Registra no catálogo da pasta do arquivo o resultado de uma Saida já fechada.
+    
+    Args:
+        saida: Saida de config/saidas.py
+        duracao: Duração da coleta em segundos
+        loja: Loja atribuída aos registros sem coluna LOJA
+    
+    Returns:
+        A entrada gravada, ou None se a saída não gravou nada
+    """
+    if not saida.total or not os.path.exists(saida.caminho):
+        return None
+    lojas = dict(saida.lojas) or ({loja: saida.total} if loja else {})
+    try:
+        return Catalogo(os.path.dirname(saida.caminho) or '.').registrar(
+            saida.caminho, saida.total, dict(saida.categorias), lojas, duracao)
+    except OSError as e:
+        log.warning("⚠️  Não foi possível atualizar o catálogo: %s", e)
+        return None
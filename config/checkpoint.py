@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Arquivo de checkpoint da coleta em andamento, dentro da pasta de dados
+ARQUIVO_CHECKPOINT = "checkpoint_coleta.jsonl"
+
+# Registros gravados entre duas chamadas de fsync
+LOTE_FSYNC_PADRAO = 10
+
+class Checkpoint:
+    """
+    Checkpoint da coleta em um arquivo JSON Lines somente de acréscimo.
+    
+    A primeira linha guarda a URL, o arquivo final e o formato da coleta; cada
+    linha seguinte é um produto concluído ({"indice": ..., "dados": {...}}).
+    Cada registro é enviado ao sistema operacional assim que gravado, e o
+    fsync é feito a cada lote_fsync registros e ao fechar.
+    """
+    
+    def __init__(self, pasta_dados: str = "dados", lote_fsync: int = LOTE_FSYNC_PADRAO):
+        """
+        Args:
+            pasta_dados: Pasta onde fica o arquivo de checkpoint
+            lote_fsync: Número de registros entre duas chamadas de fsync
+        """
+        self.caminho = os.path.join(pasta_dados, ARQUIVO_CHECKPOINT)
+        self.lote_fsync = max(1, lote_fsync)
+        self.url: Optional[str] = None
+        self.arquivo_final: Optional[str] = None
+        self.formato: Optional[str] = None
+        self.registros: Dict[int, Dict[str, str]] = {}
+        self._arquivo = None
+        self._pendentes = 0
+    
+    def existe(self) -> bool:
+        """Indica se há uma coleta interrompida para retomar"""
+        return os.path.exists(self.caminho)
+    
+    def iniciar(self, url: str, arquivo_final: str, formato: str = 'csv') -> None:
+        """
+        Começa um checkpoint novo, descartando o anterior.
+        
+        Args:
+            url: URL do menu coletado
+            arquivo_final: Arquivo onde a coleta será salva ao terminar
+            formato: Formato do arquivo final (chave de config.saidas.SAIDAS)
+        """
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        self.url = url
+        self.arquivo_final = arquivo_final
+        self.formato = formato
+        self.registros = {}
+        self._arquivo = open(self.caminho, 'w', encoding='utf-8')
+        self._escrever({'url': url, 'arquivo': arquivo_final, 'formato': formato,
+                        'inicio': datetime.now().isoformat()})
+        self._sincronizar()
+    
+    def retomar(self) -> bool:
+        """
+        Carrega o checkpoint existente e continua acrescentando a ele.
+        
+        Uma última linha incompleta (gravação interrompida) é ignorada.
+        
+        Returns:
+            True se o checkpoint foi carregado
+        """
+        if not self.existe():
+            return False
+        
+        with open(self.caminho, 'r', encoding='utf-8') as arquivo:
+            linhas = arquivo.read().splitlines()
+        
+        try:
+            cabecalho = json.loads(linhas[0])
+        except (IndexError, ValueError):
+            log.warning("⚠️  Checkpoint inválido: %s", self.caminho)
+            return False
+        
+        self.url = cabecalho.get('url')
+        self.arquivo_final = cabecalho.get('arquivo')
+        # Checkpoints antigos não guardam o formato: vale a extensão do arquivo final
+        self.formato = cabecalho.get('formato') or os.path.splitext(self.arquivo_final or '.csv')[1].lstrip('.')
+        self.registros = {}
+        for linha in linhas[1:]:
+            try:
+                registro = json.loads(linha)
+                self.registros[int(registro['indice'])] = registro['dados']
+            except (ValueError, KeyError, TypeError):
+                continue
+        
+        # Reescreve sem a possível linha incompleta antes de acrescentar
+        with open(self.caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(cabecalho, ensure_ascii=False) + '\n')
+            for indice, dados in self.registros.items():
+                arquivo.write(json.dumps({'indice': indice, 'dados': dados}, ensure_ascii=False) + '\n')
+        
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        self._sincronizar()
+        log.info("♻️  Retomando coleta: %s produtos já no checkpoint", len(self.registros))
+        return True
+    
+    def registrar(self, indice: int, dados: Dict[str, str]) -> None:
+        """
+        Grava um produto concluído.
+        
+        Args:
+            indice: Índice (base 0) do botão do produto na página
+            dados: Registro do produto
+        """
+        self.registros[indice] = dados
+        if self._arquivo is None:
+            return
+        self._escrever({'indice': indice, 'dados': dados})
+        self._pendentes += 1
+        if self._pendentes >= self.lote_fsync:
+            self._sincronizar()
+    
+    def fechar(self) -> None:
+        """Sincroniza e fecha o arquivo, mantendo o checkpoint em disco"""
+        if self._arquivo is not None:
+            self._sincronizar()
+            self._arquivo.close()
+            self._arquivo = None
+    
+    def remover(self) -> None:
+        """Fecha e apaga o checkpoint depois que o CSV final foi salvo"""
+        self.fechar()
+        if self.existe():
+            os.remove(self.caminho)
+    
+    def _escrever(self, objeto: Dict) -> None:
+        """Acrescenta uma linha e a envia ao sistema operacional"""
+        self._arquivo.write(json.dumps(objeto, ensure_ascii=False) + '\n')
+        self._arquivo.flush()
+    
+    def _sincronizar(self) -> None:
+        """Força a gravação em disco dos registros pendentes"""
+        os.fsync(self._arquivo.fileno())
+        self._pendentes = 0
@@ -1,37 +1,240 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+# Anotações não são avaliadas na importação: webdriver.Remote e pd.DataFrame
+# não obrigam a carregar o Selenium remoto nem o pandas
+from __future__ import annotations
+
 import sys
 import os
+import re
 import time
-import pandas as pd
+from functools import partial
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-from typing import Optional, Dict, List
+from typing import TYPE_CHECKING, Optional, Dict, Iterable, Iterator, List, Tuple
+from contextlib import nullcontext
 from datetime import datetime
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Adiciona o diretório raiz ao path para importação
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config.browser import get_preferred_browser
+from config.browser import get_browser_info, resolve_driver_path
+from config.esperas import Esperas, SELETOR_BOTOES
+from config.checkpoint import Checkpoint
+from config.porcoes import aplicar_porcoes
+from config.log import obter_log, iniciar_produto, despejar_falha, terminal_exibe
+from config.recursos import (is_perfil_enxuto, configurar_opcoes_chromium, ativar_bloqueio_cdp,
+                             configurar_preferencias_firefox, drenar_bloqueadas, medir_recursos,
+                             imprimir_relatorio_recursos, TIPOS_PADRAO)
+
+URL_MENU_PADRAO = "https://thecoffee.jp/shortcut/brasil/sao-paulo/the-coffee-vila-olimpia/menu"
+
+log = obter_log(__name__)
+
+# Mapeia os nomes dos nutrientes para as chaves do nosso dicionário
+# Nomes exatos como aparecem na tabela
+NUTRIENTES_MAP = {
+    'Valor energético (kcal)': 'CALORIAS (kcal)',
+    'Carboidratos (g)': 'CARBOIDRATOS (g)', 
+    'Proteínas (g)': 'PROTEINAS (g)',
+    'Gorduras totais (g)': 'GORDURAS_TOTAIS (g)',
+    'Gorduras saturadas (g)': 'GORDURAS_SATURADAS (g)',
+    'Gorduras trans (g)': 'GORDURAS_TRANS (g)',
+    'Fibra alimentar (g)': 'FIBRAS (g)',
+    'Sódio (mg)': 'SODIO (mg)'
+}
+
+# Títulos das seções do menu, usados para determinar a categoria dos produtos
+TITULOS_SECOES = [
+    "BEBIDAS PURISTAS", "BEBIDAS AUTORAIS", "COADOS", "COMIDAS", 
+    "OUTRAS BEBIDAS", "SHOP", "DOCES", "PADOCA", "SOBREMESAS"
+]
+
+def criar_registro_vazio(url: str) -> Dict[str, str]:
+    """
+    Cria o dicionário de um produto com todos os campos nos valores padrão.
+    
+    Args:
+        url: URL de origem do produto
+    
+    Returns:
+        Dicionário com as colunas do CSV preenchidas com valores padrão
+    """
+    return {
+        'NOME_PRODUTO': '',
+        'URL': url,
+        'CATEGORIA': 'N/A',  # Será determinada dinamicamente
+        'PORCAO (g)': '0',  # Nota: mantém (g) no nome da coluna, mas aceita qualquer unidade
+        'CALORIAS (kcal)': '0',
+        'CARBOIDRATOS (g)': '0',
+        'PROTEINAS (g)': '0',
+        'GORDURAS_TOTAIS (g)': '0',
+        'GORDURAS_SATURADAS (g)': '0',
+        'GORDURAS_TRANS (g)': '0',
+        'FIBRAS (g)': '0',
+        'ACUCARES (g)': '0',
+        'SODIO (mg)': '0'
+    }
 
-def get_webdriver() -> Optional[webdriver.Remote]:
+# Porções padronizadas cujo volume não aparece no texto do popup
+PORCOES_PADRONIZADAS = {
+    '1 copo grande': '330ml',
+    '1 copo médio': '220ml'
+}
+
+# Regex para capturar números + unidades (ml, g, kg, l) e números isolados
+REGEX_QUANTIDADE = re.compile(r'(\d+(?:[.,]\d+)?\s*(?:ml|g|kg|l))', re.IGNORECASE)
+REGEX_NUMERO = re.compile(r'(\d+(?:[.,]\d+)?)')
+
+# Um único padrão com todos os nutrientes de NUTRIENTES_MAP: cada linha da tabela
+# é testada uma vez, e o nome encontrado leva à chave pelo dicionário em minúsculas
+REGEX_NUTRIENTES = re.compile('|'.join(re.escape(nome) for nome in NUTRIENTES_MAP), re.IGNORECASE)
+NUTRIENTES_POR_NOME = {nome.lower(): chave for nome, chave in NUTRIENTES_MAP.items()}
+
+# Lê o popup aberto inteiro dentro da página e devolve sua estrutura em JSON
+SCRIPT_EXTRAIR_POPUP = """
+const visivel = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const texto = (el) => (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim();
+
+let popup = document.querySelector('.styles_popup__nejKE');
+if (!popup) {
+    popup = Array.from(document.querySelectorAll("[class*='popup'], [class*='modal'], [class*='dialog']")).find(visivel) || null;
+}
+if (!popup) {
+    return null;
+}
+
+const tabela = popup.querySelector('table');
+return {
+    url: window.location.href,
+    titulos: Array.from(popup.querySelectorAll('h1, h2, h3, h4, h5')).map((el) => [el.tagName.toLowerCase(), texto(el)]),
+    paragrafos: Array.from(popup.querySelectorAll('p')).map(texto),
+    cabecalhos: tabela ? Array.from(tabela.querySelectorAll('th')).map(texto) : [],
+    linhas: tabela ? Array.from(tabela.querySelectorAll('tr')).map((tr) => [texto(tr), Array.from(tr.querySelectorAll('td')).map(texto)]) : []
+};
+"""
+
+def preencher_dados_popup(dados: Dict[str, str],
+                          titulos: List[Tuple[str, str]],
+                          paragrafos: List[str],
+                          cabecalhos: List[str],
+                          linhas: List[Tuple[str, List[str]]]) -> Dict[str, str]:
+    """
+    Preenche o registro de um produto a partir do conteúdo textual do popup nutricional.
+    
+    Aplica as mesmas regras de extrair_dados_tabela_nutricional, mas sobre
+    textos já coletados, sem acessar o navegador.
+    
+    Args:
+        dados: Registro criado por criar_registro_vazio
+        titulos: Lista de (tag, texto) dos títulos h1-h5 do popup, em ordem
+        paragrafos: Textos dos elementos <p> do popup
+        cabecalhos: Textos dos <th> da tabela nutricional
+        linhas: Lista de (texto da linha, textos das células <td>) da tabela
+    
+    Returns:
+        O próprio dicionário dados, preenchido
+    """
+    # Nome: h4 do popup, ou o primeiro título com mais de 3 caracteres
+    nomes_h4 = [texto for tag, texto in titulos if tag.lower() == 'h4' and texto]
+    if nomes_h4:
+        dados['NOME_PRODUTO'] = nomes_h4[0]
+    else:
+        for _, texto in titulos:
+            if texto and len(texto) > 3:
+                dados['NOME_PRODUTO'] = texto
+                break
+    
+    # Porção: "Porção:" que não seja "Porções por embalagem"
+    for texto in paragrafos:
+        if "Porção:" in texto and "embalagem" not in texto.lower():
+            dados['PORCAO (g)'] = texto.split("Porção:")[1].strip()
+            break
+    else:
+        for texto in paragrafos:
+            if any(palavra in texto.lower() for palavra in ["porção", "unidade", "fatia", "pedaço"]) and "embalagem" not in texto.lower():
+                if ":" in texto:
+                    dados['PORCAO (g)'] = texto.split(":")[1].strip()
+                    break
+    
+    # Completa a porção com o valor quantitativo quando ela não tem g/ml
+    porcao_atual = dados['PORCAO (g)']
+    if porcao_atual and porcao_atual != '0' and 'g' not in porcao_atual.lower() and 'ml' not in porcao_atual.lower():
+        valor_quantitativo_porcao = PORCOES_PADRONIZADAS.get(porcao_atual.lower().strip(), '')
+        if not valor_quantitativo_porcao and len(cabecalhos) >= 3:
+            # A terceira coluna (índice 2) contém o valor da porção (ex: "30g", "120g")
+            terceiro_cabecalho = cabecalhos[2].strip()
+            match = REGEX_QUANTIDADE.search(terceiro_cabecalho)
+            if match:
+                valor_quantitativo_porcao = match.group(1).strip()
+            else:
+                match_numero = REGEX_NUMERO.search(terceiro_cabecalho)
+                if match_numero:
+                    numero = match_numero.group(1)
+                    cabecalho_lower = terceiro_cabecalho.lower()
+                    if 'ml' in cabecalho_lower:
+                        valor_quantitativo_porcao = f"{numero}ml"
+                    elif 'g' in cabecalho_lower:
+                        valor_quantitativo_porcao = f"{numero}g"
+                    elif 'l' in cabecalho_lower:
+                        valor_quantitativo_porcao = f"{numero}l"
+                    else:
+                        valor_quantitativo_porcao = numero
+        if valor_quantitativo_porcao:
+            dados['PORCAO (g)'] = f"{porcao_atual} ({valor_quantitativo_porcao})"
+    
+    # Nutrientes: primeira coluna numérica (100ml) de cada linha conhecida
+    for texto_linha, celulas in linhas:
+        nutriente = REGEX_NUTRIENTES.search(texto_linha)
+        if nutriente:
+            fonte = celulas[1] if len(celulas) >= 3 else texto_linha
+            match = REGEX_NUMERO.search(fonte)
+            if match:
+                dados[NUTRIENTES_POR_NOME[nutriente.group(0).lower()]] = match.group(1).replace(',', '.')
+    
+    return dados
+
+def _instalar_driver(navegador: str) -> str:
+    """Instala o driver pelo webdriver-manager, importando apenas o backend do navegador"""
+    if navegador == 'firefox':
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager().install()
+    if navegador == 'edge':
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager().install()
+    
+    from webdriver_manager.chrome import ChromeDriverManager
+    if navegador == 'chromium':
+        return ChromeDriverManager(chrome_type="chromium").install()
+    return ChromeDriverManager().install()
+
+def get_webdriver(offline: Optional[bool] = None, perfil_enxuto: Optional[bool] = None,
+                  tipos_bloqueados: Optional[Iterable[str]] = None) -> Optional[webdriver.Remote]:
     """
     Retorna uma instância do WebDriver configurada para o navegador preferido em modo headless.
     
+    A detecção do navegador e o caminho do driver vêm do cache em disco
+    (ver config/browser.py), evitando subprocessos e consultas de rede a cada execução.
+    
+    Args:
+        offline: Se True, não consulta o webdriver-manager (None = usa THE_COFFEE_OFFLINE)
+        perfil_enxuto: Se True, bloqueia imagens, mídia, fontes e rastreadores
+                       (None = usa THE_COFFEE_PERFIL_ENXUTO; ver config/recursos.py)
+        tipos_bloqueados: Tipos de recurso bloqueados no perfil enxuto (None = todos)
+    
     Returns:
         Uma instância do WebDriver ou None se nenhum navegador compatível for encontrado.
     """
-    preferred_browser = get_preferred_browser()
+    if perfil_enxuto is None:
+        perfil_enxuto = is_perfil_enxuto()
+    
+    info_navegador = get_browser_info()
+    preferred_browser = info_navegador['browser'] if info_navegador else None
     driver = None
-
+    
     if preferred_browser == 'chrome':
         try:
             from selenium.webdriver.chrome.options import Options
@@ -42,12 +245,17 @@ def get_webdriver() -> Optional[webdriver.Remote]:
             chrome_options.add_argument("--disable-gpu")
             chrome_options.add_argument("--window-size=1920,1080")
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+            if perfil_enxuto:
+                configurar_opcoes_chromium(chrome_options, tipos_bloqueados)
             
-            service = ChromeService(ChromeDriverManager().install())
+            from selenium.webdriver.chrome.service import Service as ChromeService
+            service = ChromeService(resolve_driver_path(preferred_browser, partial(_instalar_driver, preferred_browser), offline))
             driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("WebDriver Chrome inicializado com sucesso (modo headless).")
+            if perfil_enxuto:
+                ativar_bloqueio_cdp(driver, tipos_bloqueados)
+            log.info("WebDriver Chrome inicializado com sucesso (modo headless).")
         except Exception as e:
-            print(f"Erro ao inicializar WebDriver Chrome: {e}")
+            log.error("Erro ao inicializar WebDriver Chrome: %s", e)
     elif preferred_browser == 'chromium':
         try:
             from selenium.webdriver.chrome.options import Options
@@ -58,12 +266,17 @@ def get_webdriver() -> Optional[webdriver.Remote]:
             chrome_options.add_argument("--disable-gpu")
             chrome_options.add_argument("--window-size=1920,1080")
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+            if perfil_enxuto:
+                configurar_opcoes_chromium(chrome_options, tipos_bloqueados)
             
-            service = ChromeService(ChromeDriverManager(chrome_type="chromium").install())
+            from selenium.webdriver.chrome.service import Service as ChromeService
+            service = ChromeService(resolve_driver_path(preferred_browser, partial(_instalar_driver, preferred_browser), offline))
             driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("WebDriver Chromium inicializado com sucesso (modo headless).")
+            if perfil_enxuto:
+                ativar_bloqueio_cdp(driver, tipos_bloqueados)
+            log.info("WebDriver Chromium inicializado com sucesso (modo headless).")
         except Exception as e:
-            print(f"Erro ao inicializar WebDriver Chromium: {e}")
+            log.error("Erro ao inicializar WebDriver Chromium: %s", e)
     elif preferred_browser == 'firefox':
         try:
             from selenium.webdriver.firefox.options import Options
@@ -72,12 +285,17 @@ def get_webdriver() -> Optional[webdriver.Remote]:
             firefox_options.add_argument("--width=1920")
             firefox_options.add_argument("--height=1080")
             firefox_options.set_preference("general.useragent.override", "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0")
+            if perfil_enxuto:
+                configurar_preferencias_firefox(firefox_options, tipos_bloqueados)
             
-            service = FirefoxService(GeckoDriverManager().install())
+            from selenium.webdriver.firefox.service import Service as FirefoxService
+            service = FirefoxService(resolve_driver_path(preferred_browser, partial(_instalar_driver, preferred_browser), offline))
             driver = webdriver.Firefox(service=service, options=firefox_options)
-            print("WebDriver Firefox inicializado com sucesso (modo headless).")
+            if perfil_enxuto:
+                driver.tipos_bloqueados = tuple(tipos_bloqueados or TIPOS_PADRAO)
+            log.info("WebDriver Firefox inicializado com sucesso (modo headless).")
         except Exception as e:
-            print(f"Erro ao inicializar WebDriver Firefox: {e}")
+            log.error("Erro ao inicializar WebDriver Firefox: %s", e)
     elif preferred_browser == 'edge':
         try:
             from selenium.webdriver.edge.options import Options
@@ -88,63 +306,112 @@ def get_webdriver() -> Optional[webdriver.Remote]:
             edge_options.add_argument("--disable-gpu")
             edge_options.add_argument("--window-size=1920,1080")
             edge_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0")
+            if perfil_enxuto:
+                configurar_opcoes_chromium(edge_options, tipos_bloqueados)
             
-            service = EdgeService(EdgeChromiumDriverManager().install())
+            from selenium.webdriver.edge.service import Service as EdgeService
+            service = EdgeService(resolve_driver_path(preferred_browser, partial(_instalar_driver, preferred_browser), offline))
             driver = webdriver.Edge(service=service, options=edge_options)
-            print("WebDriver Edge inicializado com sucesso (modo headless).")
+            if perfil_enxuto:
+                ativar_bloqueio_cdp(driver, tipos_bloqueados)
+            log.info("WebDriver Edge inicializado com sucesso (modo headless).")
         except Exception as e:
-            print(f"Erro ao inicializar WebDriver Edge: {e}")
+            log.error("Erro ao inicializar WebDriver Edge: %s", e)
     else:
-        print("Nenhum navegador compatível encontrado para inicializar o WebDriver.")
-        print("Por favor, instale Chrome, Chromium, Firefox ou Edge.")
-
+        log.error("Nenhum navegador compatível encontrado para inicializar o WebDriver.")
+        log.error("Por favor, instale Chrome, Chromium, Firefox ou Edge.")
+    
     return driver
 
-def extrair_dados_tabela_nutricional(driver: webdriver.Remote) -> Dict[str, str]:
+def extrair_dados_popup_script(driver: webdriver.Remote, categoria: str = 'N/A') -> Optional[Dict[str, str]]:
+    """
+    Extrai os dados do popup aberto com um único execute_script.
+    
+    Todo o conteúdo do popup (nome, porção, cabeçalhos e linhas da tabela)
+    é lido dentro da página e devolvido como JSON em uma só chamada ao driver.
+    
+    Args:
+        driver: Instância do WebDriver
+        categoria: Categoria já determinada para o produto
+    
+    Returns:
+        Dicionário com os dados nutricionais ou None se o popup/tabela não foi encontrado
+    """
+    try:
+        estrutura = driver.execute_script(SCRIPT_EXTRAIR_POPUP)
+    except Exception as e:
+        log.warning("Erro ao executar script de extração do popup: %s", e)
+        return None
+    
+    if not estrutura or not estrutura.get('linhas'):
+        return None
+    
+    dados = criar_registro_vazio(estrutura.get('url', ''))
+    dados['CATEGORIA'] = categoria
+    preencher_dados_popup(
+        dados,
+        titulos=[tuple(titulo) for titulo in estrutura.get('titulos', [])],
+        paragrafos=estrutura.get('paragrafos', []),
+        cabecalhos=estrutura.get('cabecalhos', []),
+        linhas=[(texto, celulas) for texto, celulas in estrutura.get('linhas', [])],
+    )
+    
+    log.info("Dados extraídos para %s (script único)", dados['NOME_PRODUTO'])
+    return dados
+
+def extrair_dados_tabela_nutricional(driver: webdriver.Remote, usar_script: bool = True, esperas: Optional[Esperas] = None, categoria: Optional[str] = None,
+                                     aguardar_popup: bool = True) -> Dict[str, str]:
     """
     Extrai os dados da tabela nutricional do popup aberto.
     
     Args:
         driver: Instância do WebDriver
-        
+        usar_script: Se True, tenta primeiro a extração em uma única chamada
+                     (extrair_dados_popup_script) e só lê o outerHTML do
+                     popup (config/extracao.py) se ela falhar
+        esperas: Se informado, aguarda o popup ficar pronto em vez de um sleep fixo
+        categoria: Categoria já conhecida (ver indexar_categorias); se None,
+                   é determinada pela página com determinar_categoria
+        aguardar_popup: Se False, não espera o popup (quem chama já esperou)
+    
     Returns:
         Dicionário com os dados nutricionais
     """
-    dados = {
-        'NOME_PRODUTO': '',
-        'URL': driver.current_url,
-        'CATEGORIA': 'N/A',  # Será determinada dinamicamente
-        'PORCAO (g)': '0',  # Nota: mantém (g) no nome da coluna, mas aceita qualquer unidade
-        'CALORIAS (kcal)': '0',
-        'CARBOIDRATOS (g)': '0',
-        'PROTEINAS (g)': '0',
-        'GORDURAS_TOTAIS (g)': '0',
-        'GORDURAS_SATURADAS (g)': '0',
-        'GORDURAS_TRANS (g)': '0',
-        'FIBRAS (g)': '0',
-        'ACUCARES (g)': '0',
-        'SODIO (mg)': '0'
-    }
+    # Aguarda o popup carregar completamente
+    if not aguardar_popup:
+        pass
+    elif esperas:
+        esperas.popup_pronto()
+    else:
+        time.sleep(2)
+    
+    # Determina a categoria antes de abrir o popup
+    if categoria is None:
+        categoria = determinar_categoria(driver)
+    log.debug("Categoria determinada: %s", categoria)
+    
+    if usar_script:
+        dados = extrair_dados_popup_script(driver, categoria)
+        if dados is not None:
+            return dados
+        log.warning("⚠️  Extração via script falhou, lendo o HTML do popup...")
+    
+    dados = criar_registro_vazio(driver.current_url)
+    dados['CATEGORIA'] = categoria
     
     try:
         # Aguarda o popup aparecer e localiza o popup específico
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         wait = WebDriverWait(driver, 10)
         
-        # Aguarda um pouco para o popup carregar completamente
-        time.sleep(2)
-        
-        # Determina a categoria antes de abrir o popup
-        categoria = determinar_categoria(driver)
-        dados['CATEGORIA'] = categoria
-        print(f"Categoria determinada: {categoria}")
-        
         # Localiza o popup específico pela classe
         popup = None
         try:
             popup = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".styles_popup__nejKE")))
-            print("Popup encontrado com sucesso!")
+            log.debug("Popup encontrado com sucesso!")
         except:
-            print("Não foi possível localizar o popup específico, tentando busca geral...")
+            log.debug("Não foi possível localizar o popup específico, tentando busca geral...")
             # Fallback para qualquer popup visível
             popups = driver.find_elements(By.CSS_SELECTOR, "[class*='popup'], [class*='modal'], [class*='dialog']")
             for p in popups:
@@ -153,384 +420,425 @@ def extrair_dados_tabela_nutricional(driver: webdriver.Remote) -> Dict[str, str]
                     break
         
         if not popup:
-            print("Nenhum popup encontrado!")
+            log.warning("Nenhum popup encontrado!")
             return dados
         
-        # Extrai o nome do produto - busca especificamente no h4 dentro do popup
-        try:
-            nome_elemento = popup.find_element(By.CSS_SELECTOR, "h4")
-            dados['NOME_PRODUTO'] = nome_elemento.text.strip()
-            print(f"Nome do produto encontrado: {dados['NOME_PRODUTO']}")
-        except Exception as e:
-            print(f"Erro ao buscar nome do produto no popup: {e}")
-            # Fallback: busca por qualquer título dentro do popup
-            try:
-                titulos = popup.find_elements(By.CSS_SELECTOR, "h1, h2, h3, h4, h5")
-                for titulo in titulos:
-                    texto = titulo.text.strip()
-                    if texto and len(texto) > 3:
-                        dados['NOME_PRODUTO'] = texto
-                        print(f"Nome do produto encontrado (fallback): {texto}")
-                        break
-            except:
-                pass
-        
-        # Extrai a porção - busca especificamente por "Porção:" dentro do popup
-        # Aceita qualquer tipo de unidade: copos, fatias, unidades, ml, g, etc.
-        try:
-            # Busca por qualquer elemento <p> dentro do popup que contenha "Porção:"
-            elementos_porcao = popup.find_elements(By.XPATH, ".//p[contains(text(), 'Porção:')]")
-            
-            print(f"Encontrados {len(elementos_porcao)} elementos com 'Porção:'")
-            
-            for elemento in elementos_porcao:
-                try:
-                    texto = elemento.text.strip()
-                    print(f"Texto da porção encontrado: '{texto}'")
-                    
-                    # Verifica se é "Porção:" e não "Porções por embalagem"
-                    if "Porção:" in texto and "embalagem" not in texto.lower():
-                        porcao_info = texto.split("Porção:")[1].strip()
-                        dados['PORCAO (g)'] = porcao_info  # Aceita qualquer unidade (copo, fatia, unidade, ml, g)
-                        print(f"✅ Porção encontrada: '{porcao_info}' (pode ser: copo, fatia, unidade, ml, g, etc.)")
-                        break
-                    else:
-                        print(f"❌ Elemento descartado (contém 'embalagem' ou não é 'Porção:'): {texto}")
-                except Exception as e:
-                    print(f"Erro ao processar elemento de porção: {e}")
-                    continue
-                    
-            # Se ainda não encontrou, tenta busca mais geral
-            if not dados['PORCAO (g)'] or dados['PORCAO (g)'] == '0':
-                print("Tentando busca alternativa para porção...")
-                todos_p = popup.find_elements(By.TAG_NAME, "p")
-                for p in todos_p:
-                    texto = p.text.strip()
-                    # Busca por padrões mais amplos de porção
-                    if any(palavra in texto.lower() for palavra in ["porção", "unidade", "fatia", "pedaço"]) and "embalagem" not in texto.lower():
-                        print(f"Texto alternativo encontrado: '{texto}'")
-                        if ":" in texto:
-                            porcao_info = texto.split(":")[1].strip()
-                            dados['PORCAO (g)'] = porcao_info
-                            print(f"✅ Porção encontrada (método alternativo): '{porcao_info}'")
-                            break
-                            
-        except Exception as e:
-            print(f"Erro ao buscar porção: {e}")
-        
-        # NOVA FUNCIONALIDADE: Extrair valor quantitativo da segunda coluna da tabela
-        # e adicionar à porção se ela não já contiver "g" ou "ml"
-        valor_quantitativo_porcao = ""
-        try:
-            # Verifica se a porção atual já contém "g" ou "ml"
-            porcao_atual = dados['PORCAO (g)']
-            if porcao_atual and porcao_atual != '0':
-                if 'g' in porcao_atual.lower() or 'ml' in porcao_atual.lower():
-                    print(f"✅ Porção já contém valor quantitativo: '{porcao_atual}'")
-                else:
-                    print(f"🔍 Porção não contém valor quantitativo, buscando na tabela...")
-                    
-                    # Mapeamento de porções conhecidas (apenas as padronizadas)
-                    porcoes_conhecidas = {
-                        '1 copo grande': '330ml',
-                        '1 copo médio': '220ml'
-                    }
-                    
-                    # Verifica se é uma porção conhecida
-                    porcao_limpa = porcao_atual.lower().strip()
-                    print(f"🔍 Verificando porção: '{porcao_atual}' → '{porcao_limpa}'")
-                    print(f"🔍 Porções conhecidas: {list(porcoes_conhecidas.keys())}")
-                    
-                    if porcao_limpa in porcoes_conhecidas:
-                        valor_quantitativo_porcao = porcoes_conhecidas[porcao_limpa]
-                        print(f"✅ Porção conhecida encontrada: '{porcao_atual}' → '{valor_quantitativo_porcao}'")
-                        
-                        # Adiciona o valor quantitativo entre parênteses na porção
-                        nova_porcao = f"{porcao_atual} ({valor_quantitativo_porcao})"
-                        dados['PORCAO (g)'] = nova_porcao
-                        print(f"✅ Porção atualizada: '{nova_porcao}'")
-                    else:
-                        print(f"❌ Porção '{porcao_limpa}' não encontrada no mapeamento")
-                        # Se não for conhecida, tenta extrair da tabela
-                        # Localiza a tabela para extrair o cabeçalho da terceira coluna
-                        tabela = popup.find_element(By.CSS_SELECTOR, "table")
-                        
-                        # Busca pelos cabeçalhos da tabela (th)
-                        cabecalhos = tabela.find_elements(By.TAG_NAME, "th")
-                        print(f"Encontrados {len(cabecalhos)} cabeçalhos na tabela")
-                        
-                        if len(cabecalhos) >= 3:  # Precisamos pelo menos 3 colunas (100g, porção, %VD)
-                            # A terceira coluna (índice 2) contém o valor da porção (ex: "30g", "120g")
-                            terceiro_cabecalho = cabecalhos[2].text.strip()
-                            print(f"Cabeçalho da terceira coluna (porção): '{terceiro_cabecalho}'")
-                            
-                            # Extrai o valor quantitativo diretamente do texto do cabeçalho
-                            import re
-                            # Regex para capturar números + unidades (ml, g, kg, l)
-                            match = re.search(r'(\d+(?:[.,]\d+)?\s*(?:ml|g|kg|l))', terceiro_cabecalho, re.IGNORECASE)
-                            if match:
-                                valor_quantitativo_porcao = match.group(1).strip()
-                                print(f"✅ Valor quantitativo extraído: '{valor_quantitativo_porcao}'")
-                                
-                                # Adiciona o valor quantitativo entre parênteses na porção
-                                nova_porcao = f"{porcao_atual} ({valor_quantitativo_porcao})"
-                                dados['PORCAO (g)'] = nova_porcao
-                                print(f"✅ Porção atualizada: '{nova_porcao}'")
-                            else:
-                                # Fallback: extrai apenas o número e identifica a unidade
-                                match_numero = re.search(r'(\d+(?:[.,]\d+)?)', terceiro_cabecalho)
-                                if match_numero:
-                                    numero = match_numero.group(1)
-                                    # Identifica a unidade no texto
-                                    if 'ml' in terceiro_cabecalho.lower():
-                                        valor_quantitativo_porcao = f"{numero}ml"
-                                    elif 'g' in terceiro_cabecalho.lower():
-                                        valor_quantitativo_porcao = f"{numero}g"
-                                    elif 'kg' in terceiro_cabecalho.lower():
-                                        valor_quantitativo_porcao = f"{numero}kg"
-                                    elif 'l' in terceiro_cabecalho.lower():
-                                        valor_quantitativo_porcao = f"{numero}l"
-                                    else:
-                                        valor_quantitativo_porcao = numero
-                                    
-                                    print(f"✅ Valor quantitativo extraído (fallback): '{valor_quantitativo_porcao}'")
-                                    nova_porcao = f"{porcao_atual} ({valor_quantitativo_porcao})"
-                                    dados['PORCAO (g)'] = nova_porcao
-                                    print(f"✅ Porção atualizada: '{nova_porcao}'")
-                                else:
-                                    print(f"❌ Não foi possível extrair valor quantitativo de '{terceiro_cabecalho}'")
-                        else:
-                            print(f"❌ Tabela não possui colunas suficientes para extrair valor quantitativo")
-            else:
-                print(f"⚠️  Porção não encontrada ou vazia, pulando extração de valor quantitativo")
-                
-        except Exception as e:
-            print(f"Erro ao extrair valor quantitativo da porção: {e}")
-        
-        # Mapeia os nomes dos nutrientes para as chaves do nosso dicionário
-        # Nomes exatos como aparecem na tabela
-        nutrientes_map = {
-            'Valor energético (kcal)': 'CALORIAS (kcal)',
-            'Carboidratos (g)': 'CARBOIDRATOS (g)', 
-            'Proteínas (g)': 'PROTEINAS (g)',
-            'Gorduras totais (g)': 'GORDURAS_TOTAIS (g)',
-            'Gorduras saturadas (g)': 'GORDURAS_SATURADAS (g)',
-            'Gorduras trans (g)': 'GORDURAS_TRANS (g)',
-            'Fibra alimentar (g)': 'FIBRAS (g)',
-            'Sódio (mg)': 'SODIO (mg)'
-        }
-        
-        # Busca por linhas da tabela nutricional dentro do popup
-        try:
-            # Localiza a tabela especificamente dentro do popup
-            tabela = popup.find_element(By.CSS_SELECTOR, "table")
-            linhas = tabela.find_elements(By.CSS_SELECTOR, "tr")
-            
-            print(f"Encontradas {len(linhas)} linhas na tabela")
-            
-            for i, linha in enumerate(linhas):
-                texto_linha = linha.text.strip()
-                print(f"Linha {i}: '{texto_linha}'")
-                
-                # Processa cada nutriente
-                for nutriente_nome, chave_dados in nutrientes_map.items():
-                    if nutriente_nome.lower() in texto_linha.lower():
-                        print(f"🔍 Processando nutriente: {nutriente_nome}")
-                        
-                        # Procura pelas células da linha (td)
-                        celulas = linha.find_elements(By.TAG_NAME, "td")
-                        print(f"   Encontradas {len(celulas)} células")
-                        
-                        if len(celulas) >= 3:  # Nome do nutriente + 100ml + porção + %VD
-                            try:
-                                # A primeira célula numérica (índice 1) contém o valor para 100ml
-                                valor_100ml = celulas[1].text.strip()
-                                print(f"   Valor da célula 100ml: '{valor_100ml}'")
-                                
-                                # Extrai números incluindo decimais (aceita tanto vírgula quanto ponto)
-                                import re
-                                match = re.search(r'(\d+(?:[.,]\d+)?)', valor_100ml)
-                                if match:
-                                    valor_limpo = match.group(1).replace(',', '.')  # Converte vírgula para ponto
-                                    dados[chave_dados] = valor_limpo  # Mantém como string para preservar decimais
-                                    print(f"✅ {nutriente_nome}: {valor_limpo}")
-                                else:
-                                    print(f"❌ Não foi possível extrair valor numérico de '{valor_100ml}'")
-                            except Exception as e:
-                                print(f"❌ Erro ao processar células: {e}")
-                        else:
-                            # Fallback: extrai valores usando regex como antes
-                            import re
-                            valores = re.findall(r'(\d+(?:[.,]\d+)?)', texto_linha)
-                            print(f"   Valores encontrados via regex: {valores}")
-                            if valores and len(valores) >= 1:
-                                # Pega o primeiro valor (coluna 100ml)
-                                valor = valores[0].replace(',', '.')
-                                dados[chave_dados] = valor
-                                print(f"✅ {nutriente_nome} (fallback): {valor}")
-                        break  # Sai do loop de nutrientes após encontrar o correto
-                        
-        except Exception as e:
-            print(f"Erro ao extrair dados da tabela: {e}")
-        
-        print(f"Dados extraídos para {dados['NOME_PRODUTO']}")
+        # O popup é lido de uma vez (outerHTML) e interpretado pelo mesmo parser
+        # usado sem navegador, em vez de uma busca por elemento para cada campo
+        from config.extracao import extrair_dados_popup_html
+        extraidos = extrair_dados_popup_html(popup.get_attribute('outerHTML'), dados['URL'], categoria)
+        if extraidos is None:
+            log.warning("Tabela nutricional não encontrada no popup")
+            return dados
+        dados = extraidos
         
+        log.info("Dados extraídos para %s", dados['NOME_PRODUTO'])
+    
     except Exception as e:
-        print(f"Erro ao extrair dados nutricionais: {e}")
+        log.error("Erro ao extrair dados nutricionais: %s", e)
     
     return dados
 
+# Percorre o documento uma vez: localiza os títulos de seção e atribui a cada
+# botão o último título que o precede na ordem do documento
+SCRIPT_INDEXAR_CATEGORIAS = """
+const titulos = arguments[0];
+const botoes = arguments[1];
+
+const marcos = [];
+const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+    const texto = walker.currentNode.textContent.trim();
+    const titulo = titulos.find((t) => texto === t || (texto.includes(t) && texto.length <= t.length + 5));
+    if (titulo && walker.currentNode.parentElement) {
+        marcos.push([walker.currentNode.parentElement, titulo]);
+    }
+}
+
+const precede = (a, b) => !!(a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING);
+return botoes.map((botao) => {
+    // Busca binária pelo último título antes do botão
+    let inicio = 0, fim = marcos.length - 1, encontrado = null;
+    while (inicio <= fim) {
+        const meio = (inicio + fim) >> 1;
+        if (precede(marcos[meio][0], botao)) {
+            encontrado = marcos[meio][1];
+            inicio = meio + 1;
+        } else {
+            fim = meio - 1;
+        }
+    }
+    return encontrado;
+});
+"""
+
+def indexar_categorias(driver: webdriver.Remote, botoes: List) -> List[str]:
+    """
+    Determina a categoria de todos os botões de uma vez, logo após a página carregar.
+    
+    Cada botão recebe a seção que o contém (último título de seção antes
+    dele no documento), e não o título que estiver visível na tela.
+    
+    Args:
+        driver: Instância do WebDriver com o menu carregado
+        botoes: WebElements dos botões "info nutricional"
+    
+    Returns:
+        Lista de categorias alinhada com botoes ("PRODUTOS" quando não há seção)
+    """
+    try:
+        categorias = driver.execute_script(SCRIPT_INDEXAR_CATEGORIAS, TITULOS_SECOES, botoes)
+        categorias = [categoria or "PRODUTOS" for categoria in categorias]
+    except Exception as e:
+        log.error("Erro ao indexar categorias: %s", e)
+        return ["PRODUTOS"] * len(botoes)
+    
+    contagem = {}
+    for categoria in categorias:
+        contagem[categoria] = contagem.get(categoria, 0) + 1
+    log.info("Categorias indexadas: %s", contagem)
+    
+    return categorias
+
 def determinar_categoria(driver: webdriver.Remote) -> str:
     """
     Determina a categoria do produto baseado na seção da página onde o botão foi clicado.
     
     Args:
         driver: Instância do WebDriver
-        
+    
     Returns:
         Nome da categoria
     """
     try:
         # Busca por títulos de seção visíveis na página
-        titulos_secoes = [
-            "BEBIDAS PURISTAS", "BEBIDAS AUTORAIS", "COADOS", "COMIDAS", 
-            "OUTRAS BEBIDAS", "SHOP", "DOCES", "PADOCA", "SOBREMESAS"
-        ]
-        
-        for titulo in titulos_secoes:
+        for titulo in TITULOS_SECOES:
             elementos = driver.find_elements(By.XPATH, f"//*[contains(text(), '{titulo}')]")
             for elemento in elementos:
                 if elemento.is_displayed():
                     # Verifica se o elemento está próximo de onde clicamos
                     return titulo
-                    
+        
         return "PRODUTOS"  # Categoria genérica como fallback
     except:
         return "PRODUTOS"
 
-def coletar_produtos_the_coffee(url: str = "https://thecoffee.jp/shortcut/brasil/sao-paulo/the-coffee-vila-olimpia/menu", limite_produtos: int = None) -> List[Dict[str, str]]:
+def encontrar_botoes_info(driver: webdriver.Remote) -> List:
     """
-    Coleta dados nutricionais de todos os produtos do site The Coffee.
+    Localiza todos os botões "info nutricional" da página do menu.
+    
+    Args:
+        driver: Instância do WebDriver com o menu já carregado
+    
+    Returns:
+        Lista de WebElements dos botões, na ordem em que aparecem na página
+    """
+    log.info("Procurando botões de informação nutricional...")
+    
+    # Tenta diferentes seletores para encontrar os botões
+    botoes_info = []
+    seletores_possivel = [
+        ".styles_btNutritionalInfo__3QtQz",
+        "[class*='btNutritionalInfo']",
+        "span:contains('info nutricional')",
+        "button:contains('info nutricional')",
+        "*[class*='nutritional']"
+    ]
+    
+    for seletor in seletores_possivel:
+        try:
+            botoes_info = driver.find_elements(By.CSS_SELECTOR, seletor)
+            if botoes_info:
+                log.info("Encontrados %s botões com seletor: %s", len(botoes_info), seletor)
+                break
+        except:
+            continue
+    
+    if not botoes_info:
+        # Fallback: procura por texto "info nutricional"
+        try:
+            botoes_info = driver.find_elements(By.XPATH, "//*[contains(text(), 'info nutricional')]")
+            log.info("Encontrados %s botões via XPath", len(botoes_info))
+        except:
+            log.warning("Não foi possível encontrar botões de informação nutricional")
+            return []
+    
+    return botoes_info
+
+def fechar_popup(driver: webdriver.Remote) -> None:
+    """
+    Fecha o popup nutricional aberto (tenta diferentes métodos).
+    
+    Args:
+        driver: Instância do WebDriver
+    """
+    try:
+        # Procura botão de fechar (X)
+        botao_fechar = driver.find_element(By.CSS_SELECTOR, ".close, .modal-close, [class*='close'], button[aria-label='Close']")
+        botao_fechar.click()
+    except:
+        # Se não encontrar botão, pressiona ESC
+        try:
+            from selenium.webdriver.common.keys import Keys
+            driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
+        except:
+            # Como último recurso, clica fora do popup
+            driver.execute_script("document.body.click();")
+
+def processar_produto(driver: webdriver.Remote, botao, esperas: Optional[Esperas] = None, categoria: Optional[str] = None,
+                      gravador=None, instrumentacao=None) -> Dict[str, str]:
+    """
+    Abre o popup de um produto, extrai seus dados nutricionais e fecha o popup.
+    
+    Args:
+        driver: Instância do WebDriver
+        botao: WebElement do botão "info nutricional" do produto
+        esperas: Esperas por condição; se None, usa os sleeps fixos antigos
+        categoria: Categoria do produto vinda de indexar_categorias (None = determina na página)
+        gravador: Gravador opcional (config.gravacao) que guarda o DOM do popup aberto
+        instrumentacao: Instrumentacao opcional (config.instrumentacao) que mede
+                        cada etapa: scroll, clique, espera, extracao e fechar
+    
+    Returns:
+        Dicionário com os dados nutricionais do produto
+    """
+    etapa = instrumentacao.etapa if instrumentacao else (lambda nome: nullcontext())
+    
+    # Scroll até o botão para garantir que está visível
+    with etapa('scroll'):
+        driver.execute_script("arguments[0].scrollIntoView(true);", botao)
+        if esperas:
+            esperas.apos_scroll()
+        else:
+            time.sleep(1)
+    
+    # Clica no botão
+    with etapa('clique'):
+        driver.execute_script("arguments[0].click();", botao)
+    
+    # Aguarda o popup com a tabela preenchida
+    with etapa('espera'):
+        if esperas:
+            esperas.popup_pronto()
+        else:
+            time.sleep(5)
+    
+    # Extrai dados da tabela nutricional
+    with etapa('extracao'):
+        dados_produto = extrair_dados_tabela_nutricional(driver, esperas=esperas, categoria=categoria,
+                                                         aguardar_popup=False)
+    
+    if gravador:
+        gravador.gravar_popup(driver, botao, categoria)
+    
+    with etapa('fechar'):
+        fechar_popup(driver)
+        if esperas:
+            esperas.popup_fechado()
+        else:
+            time.sleep(2)
+    
+    return dados_produto
+
+def iterar_produtos_the_coffee(url: str = URL_MENU_PADRAO, limite_produtos: int = None, pool=None, perfil_enxuto: Optional[bool] = None,
+                               incremental: bool = False, pasta_dados: str = "dados",
+                               checkpoint=None, gravador=None) -> Iterator[Dict[str, str]]:
+    """
+    Coleta os produtos do site The Coffee, entregando cada registro assim que é extraído.
+    
+    O navegador é liberado quando o fluxo termina ou é fechado antes do fim.
     
     Args:
         url: URL do menu do The Coffee
         limite_produtos: Limite de produtos para coletar (None = todos)
-        
-    Returns:
-        Lista de dicionários com dados dos produtos
+        pool: PoolSessoes opcional; se informado, o navegador vem do pool e é
+              devolvido a ele ao final em vez de ser fechado
+        perfil_enxuto: Bloqueia recursos pesados no navegador criado pela coleta
+                       (ignorado quando o navegador vem do pool)
+        incremental: Se True, abre o popup apenas dos produtos novos ou alterados
+                     e copia os demais do último snapshot em pasta_dados
+        pasta_dados: Pasta dos snapshots e das impressões da coleta incremental
+        checkpoint: Checkpoint opcional; os produtos já gravados nele são pulados
+                    e cada produto concluído é acrescentado a ele
+        gravador: Gravador opcional (config.gravacao) que grava o menu, seus
+                  recursos e cada popup para reprodução local
+    
+    Yields:
+        Dicionário com os dados de cada produto, na ordem da página
     """
-    driver = get_webdriver()
+    driver = pool.adquirir() if pool else get_webdriver(perfil_enxuto=perfil_enxuto)
     if not driver:
-        return []
+        return
     
-    produtos_dados = []
+    # Mede os comandos WebDriver e as etapas de cada produto
+    from config.instrumentacao import Instrumentacao
+    from config.urls import identificar_loja
+    instrumentacao = Instrumentacao(identificar_loja(url))
+    instrumentacao.instrumentar(driver)
     
     try:
-        print(f"Navegando para: {url}")
-        driver.get(url)
+        log.info("Navegando para: %s", url)
+        drenar_bloqueadas(driver, zerar=True)
         
-        # Aguarda a página carregar
-        time.sleep(5)
+        # Aguarda a página carregar e os botões aparecerem
+        with instrumentacao.etapa('pagina'):
+            driver.get(url)
+            esperas = Esperas(driver)
+            esperas.pagina_pronta()
+        if gravador:
+            gravador.gravar_pagina(driver, url)
         
         # Procura todos os botões "info nutricional"
-        wait = WebDriverWait(driver, 15)
-        
-        print("Procurando botões de informação nutricional...")
-        
-        # Tenta diferentes seletores para encontrar os botões
-        botoes_info = []
-        seletores_possivel = [
-            ".styles_btNutritionalInfo__3QtQz",
-            "[class*='btNutritionalInfo']",
-            "span:contains('info nutricional')",
-            "button:contains('info nutricional')",
-            "*[class*='nutritional']"
-        ]
-        
-        for seletor in seletores_possivel:
-            try:
-                botoes_info = driver.find_elements(By.CSS_SELECTOR, seletor)
-                if botoes_info:
-                    print(f"Encontrados {len(botoes_info)} botões com seletor: {seletor}")
-                    break
-            except:
-                continue
-        
+        botoes_info = encontrar_botoes_info(driver)
         if not botoes_info:
-            # Fallback: procura por texto "info nutricional"
-            try:
-                botoes_info = driver.find_elements(By.XPATH, "//*[contains(text(), 'info nutricional')]")
-                print(f"Encontrados {len(botoes_info)} botões via XPath")
-            except:
-                print("Não foi possível encontrar botões de informação nutricional")
-                return []
+            return
         
         # Aplica limite se especificado
         if limite_produtos:
             botoes_info = botoes_info[:limite_produtos]
-            print(f"Limitando coleta a {limite_produtos} produtos")
+            log.info("Limitando coleta a %d produtos", limite_produtos)
+        
+        log.info("Total de produtos a processar: %d", len(botoes_info))
         
-        print(f"Total de produtos a processar: {len(botoes_info)}")
+        # Categoria de cada botão, calculada uma única vez
+        categorias = indexar_categorias(driver, botoes_info)
+        
+        # Impressão de cada produto a partir do cartão, sem abrir o popup
+        impressoes = [None] * len(botoes_info)
+        if incremental:
+            from config.incremental import ColetaIncremental, ler_cartoes, calcular_impressao
+            controle = ColetaIncremental(url, pasta_dados)
+            cartoes = ler_cartoes(driver, botoes_info, SELETOR_BOTOES)
+            impressoes = [calcular_impressao(cartao, categoria) for cartao, categoria in zip(cartoes, categorias)]
         
         # Coleta dados de cada produto
         for i, botao in enumerate(botoes_info, 1):
             try:
-                print(f"\nProcessando produto {i}/{len(botoes_info)}")
-                
-                # Scroll até o botão para garantir que está visível
-                driver.execute_script("arguments[0].scrollIntoView(true);", botao)
-                time.sleep(1)
-                
-                # Clica no botão
-                driver.execute_script("arguments[0].click();", botao)
-                time.sleep(3)
-                
-                # Extrai dados da tabela nutricional
-                dados_produto = extrair_dados_tabela_nutricional(driver)
-                produtos_dados.append(dados_produto)
-                
-                # Fecha o popup (tenta diferentes métodos)
-                try:
-                    # Procura botão de fechar (X)
-                    botao_fechar = driver.find_element(By.CSS_SELECTOR, ".close, .modal-close, [class*='close'], button[aria-label='Close']")
-                    botao_fechar.click()
-                except:
-                    # Se não encontrar botão, pressiona ESC
-                    try:
-                        from selenium.webdriver.common.keys import Keys
-                        driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-                    except:
-                        # Como último recurso, clica fora do popup
-                        driver.execute_script("document.body.click();")
-                
-                time.sleep(2)
-                
+                if checkpoint and (i - 1) in checkpoint.registros:
+                    dados_produto = checkpoint.registros[i - 1]
+                else:
+                    anterior = controle.registro_anterior(impressoes[i - 1]) if incremental else None
+                    if anterior:
+                        dados_produto = anterior
+                    else:
+                        log.info("\nProcessando produto %d/%d", i, len(botoes_info))
+                        iniciar_produto()
+                        with instrumentacao.produto(i - 1):
+                            dados_produto = processar_produto(driver, botao, esperas, categorias[i - 1], gravador,
+                                                              instrumentacao)
+                        if not dados_produto.get('NOME_PRODUTO'):
+                            log.warning("⚠️  Produto %d/%d sem nome no popup", i, len(botoes_info))
+                            despejar_falha(f"produto {i}/{len(botoes_info)}")
+                        if incremental:
+                            controle.registrar(impressoes[i - 1], dados_produto)
+                    # Só produtos extraídos com sucesso: uma falha é tentada de novo ao retomar
+                    if checkpoint and dados_produto.get('NOME_PRODUTO'):
+                        checkpoint.registrar(i - 1, dados_produto)
+            
             except Exception as e:
-                print(f"Erro ao processar produto {i}: {e}")
+                log.error("Erro ao processar produto %d: %s", i, e)
+                despejar_falha(f"produto {i}/{len(botoes_info)}")
                 continue
-        
+            finally:
+                drenar_bloqueadas(driver)
+            
+            yield dados_produto
+        
+        if incremental:
+            controle.concluir()
+        if gravador:
+            gravador.concluir()
+        
+        # Mede sempre (a referência do perfil completo alimenta o cache); só a exibição depende do terminal
+        relatorio_recursos = medir_recursos(driver, url)
+        if terminal_exibe():
+            esperas.registro.imprimir_resumo()
+            imprimir_relatorio_recursos(relatorio_recursos)
+    
     except Exception as e:
-        print(f"Erro durante a coleta: {e}")
+        log.error("Erro durante a coleta: %s", e)
     
     finally:
-        driver.quit()
-        print("WebDriver fechado.")
+        instrumentacao.desinstrumentar()
+        if terminal_exibe():
+            instrumentacao.imprimir_resumo()
+        try:
+            instrumentacao.exportar(pasta_dados)
+        except OSError as e:
+            log.warning("⚠️  Não foi possível salvar as métricas: %s", e)
+        
+        if pool:
+            pool.devolver(driver)
+            log.info("Sessão do WebDriver devolvida ao pool.")
+        else:
+            driver.quit()
+            log.info("WebDriver fechado.")
+
+def coletar_produtos_the_coffee(url: str = URL_MENU_PADRAO, limite_produtos: int = None, pool=None, perfil_enxuto: Optional[bool] = None,
+                                incremental: bool = False, pasta_dados: str = "dados",
+                                checkpoint=None, gravador=None) -> List[Dict[str, str]]:
+    """
+    Coleta dados nutricionais de todos os produtos do site The Coffee.
+    
+    Versão em lista de iterar_produtos_the_coffee (mesmos argumentos).
     
-    return produtos_dados
+    Returns:
+        Lista de dicionários com dados dos produtos
+    """
+    return list(iterar_produtos_the_coffee(url, limite_produtos, pool, perfil_enxuto, incremental, pasta_dados, checkpoint, gravador))
+
+def processar_porcoes_conhecidas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Interpreta as porções e adiciona os valores nutricionais por porção.
+    
+    Completa as porções sem valor quantitativo (ex: "1 fatia" → "1 fatia (60g)")
+    e cria as colunas numéricas descritas em config.porcoes.aplicar_porcoes.
+    
+    Args:
+        df: DataFrame com a coluna 'PORCAO (g)'
+    
+    Returns:
+        O próprio DataFrame, com as colunas de porção atualizadas
+    """
+    df = aplicar_porcoes(df)
+    
+    sem_quantidade = int(df['PORCAO_QUANTIDADE'].isna().sum())
+    if sem_quantidade:
+        log.info("ℹ️  %s porções sem quantidade conhecida (valores por porção vazios)", sem_quantidade)
+    
+    return df
+
+def gerar_caminho_arquivo(pasta_dados: str = "dados", extensao: str = "csv") -> str:
+    """
+    Gera o caminho do arquivo de uma nova coleta, com timestamp no nome.
+    
+    Args:
+        pasta_dados: Pasta onde o arquivo será salvo
+        extensao: Extensão do arquivo (formato de saída)
+        
+    Returns:
+        Caminho do arquivo (ex: dados/dados_nutricionais_the_coffee_20250723_223817.csv)
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(pasta_dados, f"dados_nutricionais_the_coffee_{timestamp}.{extensao}")
 
-def salvar_dados_csv(dados: List[Dict[str, str]], pasta_dados: str = "dados") -> str:
+def salvar_dados_csv(dados: List[Dict[str, str]], pasta_dados: str = "dados", caminho_arquivo: Optional[str] = None) -> str:
     """
     Salva os dados coletados em um arquivo CSV.
     
     Args:
         dados: Lista de dicionários com dados dos produtos
         pasta_dados: Pasta onde salvar o arquivo
-        
+        caminho_arquivo: Se informado e o arquivo já existir, os dados são
+                         acrescentados a ele (mesmas colunas, sem novo cabeçalho)
+    
     Returns:
         Caminho do arquivo salvo
     """
+    import pandas as pd
+    
     if not dados:
-        print("Nenhum dado para salvar.")
+        log.warning("Nenhum dado para salvar.")
         return ""
     
     # Cria a pasta se não existir
@@ -540,133 +848,148 @@ def salvar_dados_csv(dados: List[Dict[str, str]], pasta_dados: str = "dados") ->
     df = pd.DataFrame(dados)
     
     # Processa as porções antes de salvar
-    print("🔧 Processando porções conhecidas...")
-    
-    # Mapeamento completo de porções conhecidas (baseado nos dados coletados)
-    porcoes_conhecidas = {
-        # Porções de copo grande (330ml)
-        '1 copo grande': '330ml',
-        '1/2 copo grande': '165ml',
-        '1/3 copo grande': '110ml',
-        '2/3 copo grande': '220ml',
-        
-        # Porções de copo médio (220ml)
-        '1 copo médio': '220ml',
-        '1/2 copo médio': '110ml',
-        '1/3 copo médio': '73ml',
-        '2/3 copo médio': '147ml',
-        
-        # Porções de copo pequeno (assumindo ~180ml baseado nos dados)
-        '1 copo pequeno': '180ml',
-        '1/2 copo pequeno': '90ml',
-        '1/3 copo pequeno': '60ml',
-        '2/3 copo pequeno': '120ml',
-        
-        # Porções de unidades (baseado nos dados coletados)
-        '1 unidade': '50g',  # Croissant Traditional
-        '1/2 unidade': '25g',
-        '1/3 unidade': '17g',
-        '2/3 unidade': '33g',
-        '3/4 unidade': '38g',
-        
-        # Porções de fatias (baseado nos dados coletados)
-        '1 fatia': '60g',  # Banana Cake, Lemon Cake
-        '1/2 fatia': '30g',
-        '1/3 fatia': '20g',
-        '2/3 fatia': '40g',
-        '3/4 fatia': '45g',
-        
-        # Porções específicas encontradas nos dados
-        '1/2 copo pequeno': '90ml',  # Pure Black (Double Shot)
-        '1/2 copo médio': '110ml',   # Americano
-        '2/3 da unidade': '33g',     # Brownie
-        '3/4 da unidade': '38g',     # Cookie Traditional
-        '3/4 de unidade': '38g',     # Macadâmia Cookie
-        
-        # Porções específicas encontradas nos dados (sem valores quantitativos)
-        '1/2 copo pequeno': '90ml',  # Pure Black (Double Shot)
-        '1/2 copo médio': '110ml',   # Americano
-        '2/3 da unidade': '33g',     # Brownie
-        '3/4 da unidade': '38g',     # Cookie Traditional
-        '3/4 de unidade': '38g'      # Macadâmia Cookie
-    }
+    df = processar_porcoes_conhecidas(df)
     
-    # Aplica o mapeamento na coluna PORCAO (g)
-    total_atualizadas = 0
-    porcoes_processadas = []
-    
-    for porcao_original, valor_quantitativo in porcoes_conhecidas.items():
-        # Encontra linhas onde a porção é exatamente igual
-        mask = df['PORCAO (g)'] == porcao_original
-        
-        # Verifica se a porção já tem formato correto (contém parênteses com valor)
-        if mask.any():
-            # Verifica se já tem formato correto (ex: "1 unidade (50g)")
-            porcoes_ja_formatadas = df.loc[mask, 'PORCAO (g)'].str.contains(r'\([^)]+\)', regex=True)
-            
-            # Só processa as que não têm formato correto
-            mask_para_processar = mask & ~porcoes_ja_formatadas
-            
-            if mask_para_processar.any():
-                # Adiciona o valor quantitativo entre parênteses
-                nova_porcao = f"{porcao_original} ({valor_quantitativo})"
-                df.loc[mask_para_processar, 'PORCAO (g)'] = nova_porcao
-                count = mask_para_processar.sum()
-                total_atualizadas += count
-                porcoes_processadas.append(f"'{porcao_original}' ({count}x)")
-                print(f"✅ Atualizadas {count} porções: '{porcao_original}' → '{nova_porcao}'")
-            else:
-                # Se todas já têm formato correto, não processa
-                count_ja_formatadas = mask.sum()
-                print(f"ℹ️  {count_ja_formatadas} porções '{porcao_original}' já têm formato correto (puladas)")
-    
-    # Mostra estatísticas finais
-    if total_atualizadas > 0:
-        print(f"\n📊 RESUMO: {total_atualizadas} porções foram atualizadas:")
-        for porcao in porcoes_processadas:
-            print(f"   • {porcao}")
+    if caminho_arquivo and os.path.exists(caminho_arquivo):
+        # Acrescenta ao arquivo existente, mantendo a ordem das colunas do cabeçalho
+        colunas = pd.read_csv(caminho_arquivo, nrows=0, encoding='utf-8-sig').columns
+        df.reindex(columns=colunas).to_csv(caminho_arquivo, mode='a', header=False, index=False, encoding='utf-8')
     else:
-        print(f"\nℹ️  Nenhuma porção precisou ser atualizada (todas já tinham valores quantitativos)")
-    
-    # Nome do arquivo com timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    nome_arquivo = f"dados_nutricionais_the_coffee_{timestamp}.csv"
-    caminho_arquivo = os.path.join(pasta_dados, nome_arquivo)
-    
-    # Salva o DataFrame processado
-    df.to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
+        if not caminho_arquivo:
+            caminho_arquivo = gerar_caminho_arquivo(pasta_dados)
+        
+        # Salva o DataFrame processado
+        df.to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
     
-    print(f"Dados salvos em: {caminho_arquivo}")
-    print(f"Total de produtos coletados: {len(dados)}")
+    log.info("Dados salvos em: %s", caminho_arquivo)
+    log.info("Total de produtos coletados: %s", len(dados))
     
     return caminho_arquivo
 
-def main(modo_teste: bool = False):
+def main(modo_teste: bool = False, pool=None, num_workers: int = 1, estrategia: str = 'indice', motor: str = 'navegador',
+         perfil_enxuto: Optional[bool] = None, todas_lojas: bool = False, max_lojas_simultaneas: int = 4,
+         incremental: bool = False, retomar: bool = False, formato_saida: str = 'csv', historico: bool = True,
+         limite_produtos: Optional[int] = None, progresso=None) -> Optional[str]:
     """
     Função principal para executar o scraping completo.
     
     Args:
         modo_teste: Se True, coleta apenas 3 produtos para teste
+        pool: PoolSessoes opcional com navegadores já iniciados
+        num_workers: Número de processos com navegador próprio (1 = coleta sequencial)
+        estrategia: Divisão dos produtos entre os workers ('indice', 'bloco' ou 'categoria')
+        motor: 'navegador' (Selenium), 'http' (sem navegador) ou
+               'auto' (HTTP, usando o navegador se os dados não estiverem no HTML)
+        perfil_enxuto: Bloqueia imagens, mídia, fontes e rastreadores no navegador
+        todas_lojas: Se True, descobre e coleta os menus de todas as lojas
+        max_lojas_simultaneas: Número máximo de lojas em coleta ao mesmo tempo
+        incremental: Se True, reaproveita do último snapshot os produtos sem mudança
+                     (apenas na coleta sequencial pelo navegador)
+        retomar: Se True, continua a coleta interrompida registrada no checkpoint
+                 e salva no mesmo arquivo final (apenas na coleta sequencial pelo navegador)
+        formato_saida: 'csv', 'jsonl', 'sqlite' ou 'parquet' (ver config.saidas)
+        historico: Se True, acrescenta a execução ao banco de histórico (ver config.historico)
+        limite_produtos: Número de produtos a coletar (tem prioridade sobre modo_teste)
+        progresso: Função chamada com o número de produtos já concluídos, a cada produto
+    
+    Returns:
+        Caminho do arquivo salvo ou None se nenhum dado foi coletado
     """
-    print("=== Iniciando coleta de dados nutricionais do The Coffee ===")
+    log.info("=== Iniciando coleta de dados nutricionais do The Coffee ===")
+    inicio = time.perf_counter()
     
-    if modo_teste:
-        print("🧪 Modo TESTE: coletando apenas 3 produtos")
+    if limite_produtos:
+        log.info("📈 Modo PERSONALIZADO: coletando %d produtos", limite_produtos)
+        limite = limite_produtos
+    elif modo_teste:
+        log.info("🧪 Modo TESTE: coletando apenas 3 produtos")
         limite = 3
     else:
-        print("🚀 Modo COMPLETO: coletando todos os produtos")
+        log.info("🚀 Modo COMPLETO: coletando todos os produtos")
         limite = None
     
-    # Coleta os dados
-    dados = coletar_produtos_the_coffee(limite_produtos=limite)
+    if todas_lojas:
+        from config.lojas import coletar_todas_lojas
+        arquivo_salvo = coletar_todas_lojas(max_simultaneas=max_lojas_simultaneas, motor=motor, limite_produtos=limite,
+                                            historico=historico, formato_saida=formato_saida)
+        if arquivo_salvo:
+            log.info("\n✅ Coleta de todas as lojas concluída!")
+            log.info("📁 Arquivo salvo: %s", arquivo_salvo)
+        else:
+            log.warning("\n❌ Nenhum dado foi coletado.")
+        return arquivo_salvo or None
+    
+    from config.saidas import criar_saida, consumir
     
-    # Salva em CSV
-    if dados:
-        arquivo_salvo = salvar_dados_csv(dados)
-        print(f"\n✅ Coleta concluída com sucesso!")
-        print(f"📁 Arquivo salvo: {arquivo_salvo}")
+    # Fonte: fluxo de registros de acordo com o motor escolhido
+    checkpoint = None
+    arquivo_final = None
+    url = URL_MENU_PADRAO
+    if motor in ('http', 'auto'):
+        from config.coleta_http import coletar_produtos_http
+        registros = iter(coletar_produtos_http(limite_produtos=limite, fallback_navegador=(motor == 'auto'), pool=pool))
+    elif num_workers > 1:
+        from config.paralelo import coletar_produtos_paralelo
+        registros = iter(coletar_produtos_paralelo(limite_produtos=limite, num_workers=num_workers, estrategia=estrategia,
+                                                   perfil_enxuto=perfil_enxuto))
     else:
-        print("\n❌ Nenhum dado foi coletado.")
+        # Cada produto concluído vai para o checkpoint, para retomar após uma falha
+        checkpoint = Checkpoint()
+        if retomar and checkpoint.retomar():
+            url, arquivo_final = checkpoint.url, checkpoint.arquivo_final
+            # O arquivo final já tem a extensão do formato da coleta interrompida
+            if checkpoint.formato != formato_saida:
+                log.warning("⚠️  Retomando no formato da coleta interrompida (%s), não em %s",
+                            checkpoint.formato, formato_saida)
+                formato_saida = checkpoint.formato
+        else:
+            if retomar:
+                log.warning("⚠️  Nenhum checkpoint encontrado, iniciando uma nova coleta")
+            url, arquivo_final = URL_MENU_PADRAO, gerar_caminho_arquivo(extensao=formato_saida)
+            checkpoint.iniciar(url, arquivo_final, formato_saida)
+        registros = iterar_produtos_the_coffee(url, limite_produtos=limite, pool=pool, perfil_enxuto=perfil_enxuto,
+                                               incremental=incremental, checkpoint=checkpoint)
+    
+    # Destinos: cada registro é gravado conforme chega
+    saida = criar_saida(formato_saida, arquivo_final or gerar_caminho_arquivo(extensao=formato_saida))
+    saidas = [saida]
+    if historico:
+        from config.historico import SaidaHistorico
+        saidas.append(SaidaHistorico(arquivo=saida.caminho))
+    
+    try:
+        total = consumir(registros, saidas, progresso)
+    finally:
+        for destino in saidas:
+            destino.fechar()
+        if checkpoint:
+            checkpoint.fechar()
+    
+    if total:
+        from config.catalogo import registrar_saida
+        from config.urls import identificar_loja
+        registrar_saida(saida, time.perf_counter() - inicio, identificar_loja(url))
+        if checkpoint:
+            checkpoint.remover()
+        log.info("\n✅ Coleta concluída com sucesso!")
+        log.info("📁 Arquivo salvo: %s", saida.caminho)
+        return saida.caminho
+    log.warning("\n❌ Nenhum dado foi coletado.")
+    return None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Coleta os dados nutricionais do The Coffee")
+    parser.add_argument('--teste', action='store_true', help="coleta apenas 3 produtos")
+    parser.add_argument('--resume', action='store_true', help="retoma a coleta interrompida a partir do checkpoint")
+    parser.add_argument('--formato', choices=['csv', 'jsonl', 'sqlite', 'parquet'], default='csv', help="formato do arquivo de saída")
+    parser.add_argument('--silencioso', action='store_true', help="mostra apenas avisos e erros")
+    parser.add_argument('--log-nivel', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help="nível do log")
+    parser.add_argument('--log-jsonl', help="grava também o log neste arquivo JSON-lines")
+    argumentos = parser.parse_args()
+    
+    from config.log import configurar_log
+    configurar_log(argumentos.log_nivel, argumentos.silencioso, argumentos.log_jsonl)
+    
+    main(modo_teste=argumentos.teste, retomar=argumentos.resume, formato_saida=argumentos.formato)
\ No newline at end of file
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import (URL_MENU_PADRAO, NUTRIENTES_MAP, TITULOS_SECOES, REGEX_NUMERO,
+                           criar_registro_vazio, preencher_dados_popup,
+                           coletar_produtos_the_coffee)
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Padrão dos títulos de seção, para localizar a categoria de cada popup no HTML
+REGEX_TITULOS_SECOES = re.compile('|'.join(re.escape(titulo) for titulo in TITULOS_SECOES))
+
+_sessao_http: Optional[requests.Session] = None
+
+def get_sessao_http() -> requests.Session:
+    """
+    Retorna uma sessão HTTP compartilhada, com pool de conexões e retentativas.
+    
+    Returns:
+        Instância de requests.Session reaproveitada entre chamadas
+    """
+    global _sessao_http
+    if _sessao_http is None:
+        sessao = requests.Session()
+        retentativas = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retentativas)
+        sessao.mount('http://', adaptador)
+        sessao.mount('https://', adaptador)
+        sessao.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+        })
+        _sessao_http = sessao
+    return _sessao_http
+
+def baixar_pagina(url: str, timeout: float = 20) -> str:
+    """
+    Baixa o HTML de uma página usando a sessão compartilhada.
+    
+    Args:
+        url: URL da página
+        timeout: Tempo máximo da requisição em segundos
+    
+    Returns:
+        HTML da página
+    """
+    resposta = get_sessao_http().get(url, timeout=timeout)
+    resposta.raise_for_status()
+    return resposta.text
+
+def extrair_produtos_html(html: str, url: str) -> List[Dict[str, str]]:
+    """
+    Extrai os produtos de popups nutricionais já presentes no HTML servido.
+    
+    Args:
+        html: HTML da página do menu
+        url: URL de origem, gravada no campo URL
+    
+    Returns:
+        Lista de registros no mesmo formato da coleta pelo navegador
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    produtos = []
+    
+    for popup, tabela in _popups_com_tabela(soup):
+        dados = criar_registro_vazio(url)
+        
+        # Categoria: último título de seção antes do popup no documento
+        titulo_secao = popup.find_previous(string=REGEX_TITULOS_SECOES)
+        if titulo_secao:
+            dados['CATEGORIA'] = REGEX_TITULOS_SECOES.search(titulo_secao).group(0)
+        else:
+            dados['CATEGORIA'] = 'PRODUTOS'
+        
+        preencher_dados_popup(
+            dados,
+            titulos=[(titulo.name, titulo.get_text(' ', strip=True)) for titulo in popup.find_all(['h1', 'h2', 'h3', 'h4', 'h5'])],
+            paragrafos=[p.get_text(' ', strip=True) for p in popup.find_all('p')],
+            cabecalhos=[th.get_text(' ', strip=True) for th in tabela.find_all('th')],
+            linhas=[(tr.get_text(' ', strip=True), [td.get_text(' ', strip=True) for td in tr.find_all('td')])
+                    for tr in tabela.find_all('tr')],
+        )
+        
+        if dados['NOME_PRODUTO']:
+            produtos.append(dados)
+    
+    return produtos
+
+def _popups_com_tabela(soup) -> List[Tuple[Any, Any]]:
+    """
+    Um popup por tabela nutricional, na ordem do documento.
+    
+    As classes styles_popup* também marcam os wrappers internos do popup, e
+    um contêiner pode agrupar vários popups. Para cada tabela fica o elemento
+    styles_popup mais externo que não contém outra tabela.
+    """
+    marcados = {id(elemento) for elemento in soup.select("[class*='styles_popup']")}
+    popups, vistos = [], set()
+    for tabela in soup.find_all('table'):
+        escolhido = None
+        for ancestral in tabela.parents:
+            if id(ancestral) not in marcados:
+                continue
+            if len(ancestral.find_all('table')) > 1:
+                break
+            escolhido = ancestral
+        if escolhido is not None and id(escolhido) not in vistos:
+            vistos.add(id(escolhido))
+            popups.append((escolhido, tabela))
+    return popups
+
+def _extrair_json_embutido(html: str) -> List[Any]:
+    """Retorna os objetos JSON embutidos na página (__NEXT_DATA__ e afins)"""
+    soup = BeautifulSoup(html, 'lxml')
+    objetos = []
+    
+    for script in soup.find_all('script', type=['application/json', 'application/ld+json']):
+        try:
+            objetos.append(json.loads(script.string or ''))
+        except ValueError:
+            continue
+    
+    return objetos
+
+def _texto_nutriente(item: Dict) -> str:
+    """Retorna o rótulo de um item de informação nutricional em JSON"""
+    for chave in ('name', 'nome', 'label', 'title', 'description', 'descricao'):
+        if isinstance(item.get(chave), str):
+            return item[chave]
+    return ''
+
+def _valor_nutriente(item: Any) -> Optional[str]:
+    """Retorna o valor por 100g/100ml de um item de informação nutricional em JSON"""
+    if isinstance(item, (int, float)):
+        return str(item)
+    if isinstance(item, str):
+        match = REGEX_NUMERO.search(item)
+        return match.group(1).replace(',', '.') if match else None
+    if isinstance(item, dict):
+        # Prefere campos explicitamente "por 100", depois qualquer campo de valor
+        chaves = sorted(item, key=lambda chave: '100' not in str(chave))
+        for chave in chaves:
+            if chave in ('name', 'nome', 'label', 'title', 'description', 'descricao'):
+                continue
+            valor = _valor_nutriente(item[chave])
+            if valor is not None:
+                return valor
+    return None
+
+def _registro_de_json(produto: Dict, url: str, categoria: str) -> Optional[Dict[str, str]]:
+    """Converte um objeto de produto do JSON embutido em registro, se ele tiver dados nutricionais"""
+    nome = produto.get('name') or produto.get('nome') or produto.get('title')
+    chave_nutricional = next((chave for chave in produto if 'nutri' in str(chave).lower()), None)
+    if not isinstance(nome, str) or chave_nutricional is None:
+        return None
+    
+    informacao = produto[chave_nutricional]
+    if isinstance(informacao, dict):
+        itens = [(str(rotulo), valor) for rotulo, valor in informacao.items()]
+    elif isinstance(informacao, list):
+        itens = [(_texto_nutriente(item), item) for item in informacao if isinstance(item, dict)]
+    else:
+        return None
+    
+    dados = criar_registro_vazio(url)
+    dados['NOME_PRODUTO'] = nome.strip()
+    dados['CATEGORIA'] = categoria
+    
+    encontrou = False
+    for rotulo, valor in itens:
+        rotulo_lower = rotulo.lower()
+        for nutriente_nome, chave_dados in NUTRIENTES_MAP.items():
+            nome_base = nutriente_nome.split(' (')[0].lower()
+            if nutriente_nome.lower() in rotulo_lower or rotulo_lower.startswith(nome_base):
+                valor_limpo = _valor_nutriente(valor)
+                if valor_limpo is not None:
+                    dados[chave_dados] = valor_limpo
+                    encontrou = True
+                break
+    
+    for chave, valor in produto.items():
+        if isinstance(valor, str) and any(parte in str(chave).lower() for parte in ('porc', 'portion', 'serving')):
+            dados['PORCAO (g)'] = valor.replace('Porção:', '').strip()
+            break
+    
+    return dados if encontrou else None
+
+def extrair_produtos_json(html: str, url: str) -> List[Dict[str, str]]:
+    """
+    Extrai os produtos dos dados JSON embutidos na página (ex: __NEXT_DATA__).
+    
+    Args:
+        html: HTML da página do menu
+        url: URL de origem, gravada no campo URL
+    
+    Returns:
+        Lista de registros no mesmo formato da coleta pelo navegador
+    """
+    produtos = []
+    vistos = set()
+    
+    def percorrer(objeto: Any, categoria: str) -> None:
+        if isinstance(objeto, dict):
+            # Um objeto cujo nome é um título de seção define a categoria dos filhos
+            for chave in ('name', 'nome', 'title', 'titulo'):
+                valor = objeto.get(chave)
+                if isinstance(valor, str) and valor.strip().upper() in TITULOS_SECOES:
+                    categoria = valor.strip().upper()
+                    break
+            
+            registro = _registro_de_json(objeto, url, categoria)
+            if registro and registro['NOME_PRODUTO'] not in vistos:
+                vistos.add(registro['NOME_PRODUTO'])
+                produtos.append(registro)
+                return
+            
+            for valor in objeto.values():
+                percorrer(valor, categoria)
+        elif isinstance(objeto, list):
+            for valor in objeto:
+                percorrer(valor, categoria)
+    
+    for objeto in _extrair_json_embutido(html):
+        percorrer(objeto, 'PRODUTOS')
+    
+    return produtos
+
+def coletar_produtos_http(url: str = URL_MENU_PADRAO, limite_produtos: int = None,
+                          fallback_navegador: bool = True, pool=None) -> List[Dict[str, str]]:
+    """
+    Coleta os produtos apenas com requisições HTTP, sem abrir um navegador.
+    
+    Procura os dados nos popups já renderizados no HTML e no JSON embutido
+    da página. Se nada for encontrado, usa a coleta pelo navegador.
+    
+    Args:
+        url: URL do menu do The Coffee
+        limite_produtos: Limite de produtos para coletar (None = todos)
+        fallback_navegador: Se True, usa coletar_produtos_the_coffee quando o HTML não tiver os dados
+        pool: PoolSessoes repassado à coleta pelo navegador no fallback
+    
+    Returns:
+        Lista de dicionários com dados dos produtos
+    """
+    produtos = []
+    
+    try:
+        log.info("🌐 Baixando menu via HTTP: %s", url)
+        html = baixar_pagina(url)
+        
+        produtos = extrair_produtos_html(html, url)
+        if produtos:
+            log.info("✅ %s produtos encontrados nos popups do HTML", len(produtos))
+        else:
+            produtos = extrair_produtos_json(html, url)
+            if produtos:
+                log.info("✅ %s produtos encontrados no JSON embutido", len(produtos))
+    except requests.RequestException as e:
+        log.error("Erro ao baixar o menu via HTTP: %s", e)
+    
+    if not produtos:
+        if not fallback_navegador:
+            log.error("❌ Dados nutricionais não encontrados no HTML servido")
+            return []
+        log.warning("⚠️  Dados nutricionais não encontrados no HTML, usando o navegador...")
+        return coletar_produtos_the_coffee(url, limite_produtos=limite_produtos, pool=pool)
+    
+    if limite_produtos:
+        produtos = produtos[:limite_produtos]
+    
+    return produtos
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import re
+import json
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.browser import CACHE_NAVEGADOR
+from config.urls import identificar_loja
+from config.porcoes import COLUNAS_NUTRIENTES, coluna_por_porcao, aplicar_porcoes
+from config.catalogo import EXTENSOES_DADOS, ler_registros
+from config.retencao import ARQUIVO_COMPACTADO, ler_arquivo_compactado
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Snapshots consolidados em um único Parquet, lido por colunas
+CACHE_CONSULTAS = os.path.join(os.path.dirname(CACHE_NAVEGADOR), 'consultas')
+
+# Snapshots gerados pela coleta (uma loja ou todas as lojas), em qualquer formato de config/saidas.py
+REGEX_SNAPSHOT = re.compile(r'^dados_nutricionais_the_coffee_(?:lojas_)?(\d{8}_\d{6})\.(%s)$'
+                            % '|'.join(extensao.lstrip('.') for extensao in EXTENSOES_DADOS))
+
+COLUNAS_TEXTO = ('NOME_PRODUTO', 'CATEGORIA', 'LOJA', 'PORCAO (g)')
+COLUNAS_NUMERICAS = COLUNAS_NUTRIENTES + tuple(coluna_por_porcao(coluna) for coluna in COLUNAS_NUTRIENTES)
+
+# Agregações aceitas no agrupamento por categoria
+AGREGACOES = ('max', 'min', 'mean', 'median', 'count')
+
+# Snapshots consolidados já lidos nesta execução: pasta -> (assinatura, DataFrame)
+_cache_memoria: Dict[str, tuple] = {}
+
+def listar_snapshots(pasta_dados: str = "dados") -> Dict[str, int]:
+    """
+    Lista os snapshots da pasta em uma única varredura, incluindo o arquivo
+    compactado com os snapshots expirados (config/retencao.py).
+    
+    Returns:
+        Dicionário nome do arquivo -> mtime em nanossegundos
+    """
+    if not os.path.isdir(pasta_dados):
+        return {}
+    with os.scandir(pasta_dados) as entradas:
+        return {entrada.name: entrada.stat().st_mtime_ns for entrada in entradas
+                if entrada.is_file() and (REGEX_SNAPSHOT.match(entrada.name) or entrada.name == ARQUIVO_COMPACTADO)}
+
+def _ler_snapshot(caminho: str) -> pd.DataFrame:
+    """Lê um snapshot (ou todos os do arquivo compactado) e o normaliza para as colunas de consulta"""
+    if os.path.basename(caminho) == ARQUIVO_COMPACTADO:
+        # Snapshots restaurados para a pasta são lidos do próprio arquivo
+        pasta = os.path.dirname(caminho)
+        partes = [_normalizar_snapshot(pd.DataFrame(registros, dtype=str), nome)
+                  for nome, registros in ler_arquivo_compactado(caminho)
+                  if REGEX_SNAPSHOT.match(nome) and not os.path.exists(os.path.join(pasta, nome))]
+        return pd.concat(partes, ignore_index=True) if partes else _normalizar_snapshot(pd.DataFrame(), '')
+    if caminho.endswith('.parquet'):
+        df = pd.read_parquet(caminho)
+    elif caminho.endswith('.csv'):
+        df = pd.read_csv(caminho, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    else:
+        df = pd.DataFrame(list(ler_registros(caminho)))
+    return _normalizar_snapshot(df, os.path.basename(caminho))
+
+def _normalizar_snapshot(df: pd.DataFrame, nome: str) -> pd.DataFrame:
+    """Colunas de consulta, tipos, ARQUIVO e DATA_COLETA de um snapshot"""
+    # Snapshots antigos não têm as colunas por porção
+    if 'PORCAO (g)' in df.columns and coluna_por_porcao(COLUNAS_NUTRIENTES[0]) not in df.columns:
+        df = aplicar_porcoes(df)
+    if 'LOJA' not in df.columns:
+        df['LOJA'] = df['URL'].astype(str).map(identificar_loja) if 'URL' in df.columns else ''
+    
+    df = df.reindex(columns=list(COLUNAS_TEXTO + COLUNAS_NUMERICAS))
+    for coluna in COLUNAS_TEXTO:
+        df[coluna] = df[coluna].fillna('').astype(str)
+    for coluna in COLUNAS_NUMERICAS:
+        df[coluna] = pd.to_numeric(df[coluna], errors='coerce').astype('float32')
+    
+    df['ARQUIVO'] = nome
+    df['DATA_COLETA'] = pd.to_datetime(REGEX_SNAPSHOT.match(nome).group(1), format='%Y%m%d_%H%M%S') if nome else pd.NaT
+    return df
+
+def _caminhos_cache(pasta_dados: str) -> tuple:
+    """Arquivos de cache (Parquet e índice de mtimes) de uma pasta de dados"""
+    chave = re.sub(r'[^A-Za-z0-9]+', '_', os.path.abspath(pasta_dados)).strip('_')
+    return (os.path.join(CACHE_CONSULTAS, f"{chave}.parquet"),
+            os.path.join(CACHE_CONSULTAS, f"{chave}.json"))
+
+def atualizar_cache(pasta_dados: str = "dados") -> str:
+    """
+    Atualiza o Parquet consolidado com os snapshots da pasta.
+    
+    Só os snapshots novos ou com mtime diferente do registrado no índice
+    são lidos; os removidos saem do consolidado.
+    
+    Args:
+        pasta_dados: Pasta dos snapshots
+    
+    Returns:
+        Caminho do Parquet consolidado ('' se não há snapshots)
+    """
+    caminho_parquet, caminho_indice = _caminhos_cache(pasta_dados)
+    atuais = listar_snapshots(pasta_dados)
+    
+    try:
+        with open(caminho_indice, 'r', encoding='utf-8') as arquivo:
+            indice = json.load(arquivo)
+    except (OSError, ValueError):
+        indice = {}
+    if not os.path.exists(caminho_parquet):
+        indice = {}
+    
+    if indice == atuais:
+        return caminho_parquet if atuais else ''
+    
+    mantidos = [nome for nome, mtime in indice.items() if atuais.get(nome) == mtime]
+    # O arquivo compactado omite os snapshots restaurados para a pasta: relê quando a lista muda
+    if ARQUIVO_COMPACTADO in mantidos and indice.keys() != atuais.keys():
+        mantidos.remove(ARQUIVO_COMPACTADO)
+    novos = [nome for nome in atuais if nome not in mantidos]
+    
+    # ORIGEM é o arquivo lido (o compactado contém vários snapshots); caches antigos só têm ARQUIVO
+    partes = []
+    if mantidos:
+        anterior = pd.read_parquet(caminho_parquet)
+        origem = 'ORIGEM' if 'ORIGEM' in anterior.columns else 'ARQUIVO'
+        partes.append(anterior[anterior[origem].isin(mantidos)].assign(ORIGEM=anterior[origem]))
+    for nome in sorted(novos):
+        try:
+            partes.append(_ler_snapshot(os.path.join(pasta_dados, nome)).assign(ORIGEM=nome))
+        except Exception as e:
+            log.warning("⚠️  Snapshot ignorado (%s): %s", nome, e)
+            atuais.pop(nome)
+    
+    os.makedirs(CACHE_CONSULTAS, exist_ok=True)
+    if not partes:
+        consolidado = pd.DataFrame(columns=list(COLUNAS_TEXTO + COLUNAS_NUMERICAS) + ['ARQUIVO', 'DATA_COLETA', 'ORIGEM'])
+    else:
+        consolidado = pd.concat(partes, ignore_index=True)
+    for coluna in ('CATEGORIA', 'LOJA', 'ARQUIVO', 'ORIGEM'):
+        consolidado[coluna] = consolidado[coluna].astype('category')
+    
+    temporario = caminho_parquet + '.tmp'
+    consolidado.to_parquet(temporario, index=False, compression='zstd')
+    os.replace(temporario, caminho_parquet)
+    with open(caminho_indice, 'w', encoding='utf-8') as arquivo:
+        json.dump(atuais, arquivo)
+    
+    log.info("🗂️  Cache de consultas atualizado: %s snapshots lidos, %s reaproveitados", len(novos), len(mantidos))
+    return caminho_parquet if atuais else ''
+
+def carregar_snapshots(colunas: Sequence[str], pasta_dados: str = "dados") -> pd.DataFrame:
+    """
+    Carrega apenas as colunas pedidas de todos os snapshots.
+    
+    Args:
+        colunas: Colunas necessárias para a consulta
+        pasta_dados: Pasta dos snapshots
+    
+    Returns:
+        DataFrame com as colunas pedidas, mais ARQUIVO e DATA_COLETA
+    """
+    caminho_parquet = atualizar_cache(pasta_dados)
+    if not caminho_parquet:
+        return pd.DataFrame(columns=list(colunas) + ['ARQUIVO', 'DATA_COLETA'])
+    
+    colunas = list(dict.fromkeys(list(colunas) + ['NOME_PRODUTO', 'LOJA', 'ARQUIVO', 'DATA_COLETA']))
+    assinatura = (os.stat(caminho_parquet).st_mtime_ns, tuple(colunas))
+    em_memoria = _cache_memoria.get(pasta_dados)
+    if em_memoria and em_memoria[0] == assinatura:
+        return em_memoria[1]
+    
+    import pyarrow.parquet as pq
+    df = pq.read_table(caminho_parquet, columns=colunas, memory_map=True).to_pandas()
+    _cache_memoria[pasta_dados] = (assinatura, df)
+    return df
+
+def resolver_coluna(nome: str) -> str:
+    """
+    Aceita o nome completo da coluna ou uma abreviação (ex: 'acucares', 'sodio_porcao').
+    
+    Raises:
+        ValueError: Se o nome não corresponder a nenhuma coluna numérica
+    """
+    for coluna in COLUNAS_NUMERICAS:
+        if nome == coluna or nome.lower() == coluna.split(' ')[0].lower():
+            return coluna
+    raise ValueError(f"Coluna desconhecida: {nome} (use {', '.join(coluna.split(' ')[0].lower() for coluna in COLUNAS_NUMERICAS)})")
+
+def consultar(ordenar_por: str = 'CALORIAS (kcal)', top: Optional[int] = 10, categoria: Optional[str] = None,
+              loja: Optional[str] = None, nome: Optional[str] = None, minimo: Optional[float] = None,
+              agrupar: bool = False, agregacao: str = 'max', todos_snapshots: bool = False,
+              pasta_dados: str = "dados") -> pd.DataFrame:
+    """
+    Consulta os snapshots da pasta de dados.
+    
+    Por padrão considera só a observação mais recente de cada produto em
+    cada loja; com todos_snapshots, cada snapshot conta separadamente.
+    
+    Args:
+        ordenar_por: Coluna numérica usada na ordenação/agregação (aceita abreviações)
+        top: Número de linhas retornadas (None = todas)
+        categoria: Filtra pela categoria exata (ex: 'BEBIDAS AUTORAIS')
+        loja: Filtra pelo identificador da loja (substring)
+        nome: Filtra pelo nome do produto (substring, sem diferenciar maiúsculas)
+        minimo: Mantém só as linhas com ordenar_por >= minimo
+        agrupar: Agrupa por categoria em vez de listar produtos
+        agregacao: Agregação do agrupamento (ver AGREGACOES)
+        todos_snapshots: Considera todas as observações, não só a mais recente
+        pasta_dados: Pasta dos snapshots
+    
+    Returns:
+        DataFrame com o resultado, já ordenado
+    """
+    coluna = resolver_coluna(ordenar_por)
+    if agregacao not in AGREGACOES:
+        raise ValueError(f"Agregação desconhecida: {agregacao} (use {', '.join(AGREGACOES)})")
+    
+    df = carregar_snapshots(['CATEGORIA', coluna], pasta_dados)
+    
+    if not todos_snapshots and not df.empty:
+        df = df.sort_values('DATA_COLETA').drop_duplicates(['NOME_PRODUTO', 'LOJA'], keep='last')
+    
+    mascara = pd.Series(True, index=df.index)
+    if categoria:
+        mascara &= df['CATEGORIA'] == categoria.upper()
+    if loja:
+        mascara &= df['LOJA'].astype(str).str.contains(loja, case=False, regex=False)
+    if nome:
+        mascara &= df['NOME_PRODUTO'].str.contains(nome, case=False, regex=False)
+    if minimo is not None:
+        mascara &= df[coluna] >= minimo
+    df = df[mascara]
+    
+    if agrupar:
+        resultado = (df.groupby('CATEGORIA', observed=True)[coluna].agg(agregacao)
+                     .sort_values(ascending=False).reset_index())
+    else:
+        resultado = (df.sort_values(coluna, ascending=False)
+                     [['NOME_PRODUTO', 'CATEGORIA', 'LOJA', coluna, 'DATA_COLETA']])
+    
+    return resultado.head(top) if top else resultado
+
+def criar_parser(parser: Optional[argparse.ArgumentParser] = None) -> argparse.ArgumentParser:
+    """Adiciona os argumentos da consulta a um parser (ou cria um novo)"""
+    parser = parser or argparse.ArgumentParser(description="Consulta os snapshots da pasta dados/")
+    parser.add_argument('--ordenar', default='calorias', help="coluna numérica (ex: acucares, sodio_porcao)")
+    parser.add_argument('--top', type=int, default=10, help="número de linhas (0 = todas)")
+    parser.add_argument('--categoria', help="categoria exata (ex: 'BEBIDAS AUTORAIS')")
+    parser.add_argument('--loja', help="trecho do identificador da loja")
+    parser.add_argument('--nome', help="trecho do nome do produto")
+    parser.add_argument('--minimo', type=float, help="valor mínimo da coluna ordenada")
+    parser.add_argument('--agrupar', action='store_true', help="agrupa por categoria")
+    parser.add_argument('--agregacao', choices=AGREGACOES, default='max', help="agregação do agrupamento")
+    parser.add_argument('--todos-snapshots', action='store_true', help="não reduz à observação mais recente")
+    parser.add_argument('--pasta', default='dados', help="pasta dos snapshots")
+    return parser
+
+def executar(argumentos: argparse.Namespace) -> pd.DataFrame:
+    """Executa a consulta descrita pelos argumentos e imprime o resultado"""
+    resultado = consultar(ordenar_por=argumentos.ordenar, top=argumentos.top, categoria=argumentos.categoria,
+                          loja=argumentos.loja, nome=argumentos.nome, minimo=argumentos.minimo,
+                          agrupar=argumentos.agrupar, agregacao=argumentos.agregacao,
+                          todos_snapshots=argumentos.todos_snapshots, pasta_dados=argumentos.pasta)
+    if resultado.empty:
+        print("Nenhum resultado.")
+    else:
+        print(resultado.to_string(index=False))
+    return resultado
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Ponto de entrada da consulta pela linha de comando"""
+    try:
+        executar(criar_parser().parse_args(argv))
+    except ValueError as e:
+        print(f"❌ {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Timeouts padrão (segundos) de cada etapa da coleta
+TIMEOUTS_PADRAO = {
+    'pagina': 20.0,
+    'scroll': 2.0,
+    'popup': 10.0,
+    'popup_fechado': 5.0,
+}
+
+# Seletores usados pelas condições de espera
+SELETOR_POPUP = ".styles_popup__nejKE, [class*='popup'], [class*='modal'], [class*='dialog']"
+SELETOR_BOTOES = ".styles_btNutritionalInfo__3QtQz, [class*='btNutritionalInfo']"
+
+# Base dos scripts assíncronos: resolve assim que a condição for verdadeira,
+# observando mudanças no DOM com MutationObserver, ou ao fim do timeout
+_SCRIPT_BASE_ESPERA = """
+const concluir = arguments[arguments.length - 1];
+const timeoutMs = arguments[0];
+const seletorPopup = arguments[1];
+const seletorBotoes = arguments[2];
+const visivel = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const popupAberto = () => Array.from(document.querySelectorAll(seletorPopup)).find(
+    (el) => visivel(el) && el.querySelectorAll('table tr td').length > 0
+);
+const condicao = () => { %s };
+
+if (condicao()) { concluir(true); return; }
+
+let timer = null;
+const observador = new MutationObserver(() => {
+    if (condicao()) {
+        observador.disconnect();
+        clearTimeout(timer);
+        concluir(true);
+    }
+});
+observador.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+document.addEventListener('readystatechange', () => {
+    if (condicao()) {
+        observador.disconnect();
+        clearTimeout(timer);
+        concluir(true);
+    }
+});
+timer = setTimeout(() => { observador.disconnect(); concluir(condicao()); }, timeoutMs);
+"""
+
+# Página pronta: documento carregado e botões "info nutricional" renderizados
+SCRIPT_PAGINA_PRONTA = _SCRIPT_BASE_ESPERA % (
+    "return document.readyState === 'complete' && document.querySelectorAll(seletorBotoes).length > 0;"
+)
+
+# Popup aberto e com a tabela nutricional preenchida
+SCRIPT_POPUP_PRONTO = _SCRIPT_BASE_ESPERA % "return !!popupAberto();"
+
+# Popup fechado (removido do DOM ou escondido)
+SCRIPT_POPUP_FECHADO = _SCRIPT_BASE_ESPERA % "return !popupAberto();"
+
+# Aguarda dois quadros de animação para o scroll ser aplicado
+SCRIPT_APOS_SCROLL = """
+const concluir = arguments[arguments.length - 1];
+requestAnimationFrame(() => requestAnimationFrame(() => concluir(true)));
+"""
+
+class RegistroEsperas:
+    """Acumula quanto tempo cada etapa realmente esperou durante a coleta"""
+    
+    def __init__(self):
+        self.tempos: Dict[str, list] = defaultdict(list)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+    
+    def registrar(self, etapa: str, segundos: float, sucesso: bool) -> None:
+        """
+        Registra uma espera.
+        
+        Args:
+            etapa: Nome da etapa (ex: 'popup')
+            segundos: Tempo efetivamente esperado
+            sucesso: False se a condição não foi atingida dentro do timeout
+        """
+        self.tempos[etapa].append(segundos)
+        if not sucesso:
+            self.timeouts[etapa] += 1
+    
+    def resumo(self) -> Dict[str, Dict[str, float]]:
+        """
+        Retorna estatísticas por etapa.
+        
+        Returns:
+            Dicionário etapa -> {'esperas', 'total', 'media', 'maximo', 'timeouts'}
+        """
+        resumo = {}
+        for etapa, tempos in self.tempos.items():
+            resumo[etapa] = {
+                'esperas': len(tempos),
+                'total': sum(tempos),
+                'media': sum(tempos) / len(tempos),
+                'maximo': max(tempos),
+                'timeouts': self.timeouts[etapa],
+            }
+        return resumo
+    
+    def imprimir_resumo(self) -> None:
+        """Exibe o tempo gasto em espera por etapa"""
+        resumo = self.resumo()
+        if not resumo:
+            return
+        
+        log.info("\n⏱️  RESUMO DAS ESPERAS:")
+        for etapa, estatisticas in resumo.items():
+            log.info("   • %s: %sx, total %.1fs, média %.2fs, máx %.2fs, timeouts %s", etapa,
+                     estatisticas['esperas'], estatisticas['total'], estatisticas['media'],
+                     estatisticas['maximo'], estatisticas['timeouts'])
+
+class Esperas:
+    """
+    Esperas baseadas em condições da página, no lugar de time.sleep fixos.
+    
+    Cada espera é um único execute_async_script que retorna assim que a
+    condição é satisfeita (ou quando o timeout da etapa expira).
+    """
+    
+    def __init__(self, driver, timeouts: Optional[Dict[str, float]] = None,
+                 registro: Optional[RegistroEsperas] = None):
+        """
+        Args:
+            driver: Instância do WebDriver
+            timeouts: Timeouts por etapa, sobrepondo TIMEOUTS_PADRAO
+            registro: RegistroEsperas onde acumular os tempos (um novo é criado se None)
+        """
+        self.driver = driver
+        self.timeouts = dict(TIMEOUTS_PADRAO, **(timeouts or {}))
+        self.registro = registro or RegistroEsperas()
+        
+        # O timeout de scripts assíncronos precisa cobrir a maior espera
+        try:
+            driver.set_script_timeout(max(self.timeouts.values()) + 5)
+        except Exception:
+            pass
+    
+    def pagina_pronta(self) -> bool:
+        """Aguarda o documento carregar e os botões "info nutricional" aparecerem"""
+        return self._aguardar('pagina', SCRIPT_PAGINA_PRONTA)
+    
+    def apos_scroll(self) -> bool:
+        """Aguarda o navegador aplicar o scroll"""
+        return self._aguardar('scroll', SCRIPT_APOS_SCROLL)
+    
+    def popup_pronto(self) -> bool:
+        """Aguarda o popup abrir com a tabela nutricional preenchida"""
+        return self._aguardar('popup', SCRIPT_POPUP_PRONTO)
+    
+    def popup_fechado(self) -> bool:
+        """Aguarda o popup sair da página depois de fechado"""
+        return self._aguardar('popup_fechado', SCRIPT_POPUP_FECHADO)
+    
+    def _aguardar(self, etapa: str, script: str) -> bool:
+        """Executa um script de espera e registra o tempo gasto"""
+        timeout = self.timeouts[etapa]
+        inicio = time.perf_counter()
+        try:
+            sucesso = bool(self.driver.execute_async_script(
+                script, int(timeout * 1000), SELETOR_POPUP, SELETOR_BOTOES
+            ))
+        except Exception as e:
+            log.warning("Erro na espera '%s': %s", etapa, e)
+            sucesso = False
+        
+        decorrido = time.perf_counter() - inicio
+        self.registro.registrar(etapa, decorrido, sucesso)
+        
+        if not sucesso:
+            log.warning("⚠️  Timeout na espera '%s' após %.1fs", etapa, decorrido)
+        
+        return sucesso
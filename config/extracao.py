@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import re
+import json
+import glob
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from lxml import etree, html as lxml_html
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import criar_registro_vazio, preencher_dados_popup
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Consultas compiladas uma vez por processo
+XPATH_POPUP = etree.XPath("descendant-or-self::*[contains(@class, 'styles_popup')][.//table][1]")
+XPATH_TITULOS = etree.XPath(".//*[self::h1 or self::h2 or self::h3 or self::h4 or self::h5]")
+XPATH_PARAGRAFOS = etree.XPath(".//p")
+XPATH_TABELA = etree.XPath("(.//table)[1]")
+XPATH_CABECALHOS = etree.XPath(".//th")
+XPATH_LINHAS = etree.XPath(".//tr")
+XPATH_CELULAS = etree.XPath("./th | ./td")
+
+# Nós que o innerText do navegador não inclui: scripts, estilos e elementos
+# ocultos pelo atributo hidden ou por display:none/visibility:hidden inline
+XPATH_INVISIVEIS = etree.XPath(
+    ".//*[self::script or self::style or self::noscript or self::template or @hidden"
+    " or contains(translate(@style, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ ', 'abcdefghijklmnopqrstuvwxyz'), 'display:none')"
+    " or contains(translate(@style, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ ', 'abcdefghijklmnopqrstuvwxyz'), 'visibility:hidden')]"
+)
+
+REGEX_ESPACOS = re.compile(r'\s+')
+
+# Popups por tarefa enviada a cada processo, na divisão do modo em lote
+POPUPS_POR_TAREFA = 64
+
+def _texto(elemento) -> str:
+    """Texto do elemento com os espaços normalizados, como o innerText lido no navegador"""
+    return REGEX_ESPACOS.sub(' ', elemento.text_content()).strip()
+
+def extrair_dados_popup_html(html: str, url: str = '', categoria: str = 'N/A') -> Optional[Dict[str, str]]:
+    """
+    Extrai o registro de um produto do HTML do popup nutricional, sem navegador.
+    
+    Aceita o outerHTML do popup (como os arquivos popups/NNNN.html de uma
+    gravação) ou uma página que o contenha, e aplica as mesmas regras da
+    coleta (preencher_dados_popup).
+    
+    Args:
+        html: HTML do popup
+        url: URL de origem, gravada no campo URL
+        categoria: Categoria do produto
+    
+    Returns:
+        Dicionário com os dados nutricionais ou None se não há tabela nutricional
+    """
+    if not html or not html.strip():
+        return None
+    try:
+        raiz = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+    
+    popups = XPATH_POPUP(raiz)
+    popup = popups[0] if popups else raiz
+    # O texto deve ser o que a coleta lê no navegador (innerText); ocultação por
+    # classes CSS não aparece no HTML e não é detectada
+    for elemento in XPATH_INVISIVEIS(popup):
+        elemento.drop_tree()
+    tabelas = XPATH_TABELA(popup)
+    if not tabelas:
+        return None
+    tabela = tabelas[0]
+    
+    dados = criar_registro_vazio(url)
+    dados['CATEGORIA'] = categoria
+    # O texto da linha junta as células com espaço (text_content as colaria)
+    return preencher_dados_popup(
+        dados,
+        titulos=[(elemento.tag, _texto(elemento)) for elemento in XPATH_TITULOS(popup)],
+        paragrafos=[_texto(elemento) for elemento in XPATH_PARAGRAFOS(popup)],
+        cabecalhos=[_texto(elemento) for elemento in XPATH_CABECALHOS(tabela)],
+        linhas=[(' '.join(_texto(celula) for celula in XPATH_CELULAS(linha)),
+                 [_texto(celula) for celula in linha if celula.tag == 'td'])
+                for linha in XPATH_LINHAS(tabela)],
+    )
+
+def extrair_arquivo_popup(caminho: str, url: str = '', categoria: str = 'N/A') -> Optional[Dict[str, str]]:
+    """Lê um arquivo HTML de popup e extrai o registro (executada nos processos do modo em lote)"""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return extrair_dados_popup_html(arquivo.read(), url, categoria)
+
+def _extrair_lote(tarefa) -> List[Optional[Dict[str, str]]]:
+    caminhos, url, categorias = tarefa
+    return [extrair_arquivo_popup(caminho, url, categoria) for caminho, categoria in zip(caminhos, categorias)]
+
+def extrair_em_lote(caminhos: List[str], url: str = '', categoria: str = 'N/A',
+                    num_processos: Optional[int] = None,
+                    categorias: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+    """
+    Extrai os registros de muitos arquivos de popup, divididos entre processos.
+    
+    Os arquivos vão em tarefas de POPUPS_POR_TAREFA para cada processo, o
+    que mantém baixo o custo de comunicação com milhares de arquivos pequenos.
+    
+    Args:
+        caminhos: Arquivos HTML de popups
+        url: URL de origem dos registros
+        categoria: Categoria dos arquivos ausentes em categorias
+        num_processos: Processos usados (None = número de CPUs; 1 = sem processos)
+        categorias: Categoria de cada arquivo (ex: a gravada no manifesto, ver listar_popups)
+    
+    Returns:
+        Registros extraídos, na ordem dos arquivos (arquivos sem tabela são ignorados)
+    """
+    categorias = categorias or {}
+    por_arquivo = [categorias.get(os.path.normpath(caminho), categoria) for caminho in caminhos]
+    tarefas = [(caminhos[inicio:inicio + POPUPS_POR_TAREFA], url, por_arquivo[inicio:inicio + POPUPS_POR_TAREFA])
+               for inicio in range(0, len(caminhos), POPUPS_POR_TAREFA)]
+    num_processos = num_processos or os.cpu_count() or 1
+    
+    if num_processos == 1 or len(tarefas) <= 1:
+        lotes = map(_extrair_lote, tarefas)
+    else:
+        with ProcessPoolExecutor(max_workers=min(num_processos, len(tarefas))) as executor:
+            lotes = list(executor.map(_extrair_lote, tarefas))
+    return [registro for lote in lotes for registro in lote if registro is not None]
+
+def listar_popups(origens: Iterable[str]) -> Tuple[List[str], str, Dict[str, str]]:
+    """
+    Arquivos de popup de uma lista de arquivos e pastas.
+    
+    Uma pasta de gravação (config/gravacao.py) contribui com popups/*.html,
+    com a URL do seu manifesto e com a categoria gravada para cada popup.
+    
+    Returns:
+        (lista de arquivos em ordem, URL da gravação ou '', categoria por arquivo)
+    """
+    caminhos, url, categorias = [], '', {}
+    for origem in origens:
+        if not os.path.exists(origem):
+            log.warning("⚠️  Não encontrado: %s", origem)
+            continue
+        if not os.path.isdir(origem):
+            caminhos.append(origem)
+            continue
+        manifesto = os.path.join(origem, 'manifesto.json')
+        if os.path.exists(manifesto):
+            with open(manifesto, 'r', encoding='utf-8') as arquivo:
+                dados_manifesto = json.load(arquivo)
+            url = url or dados_manifesto.get('url', '')
+            for rota in dados_manifesto.get('rotas', {}).values():
+                if rota.get('categoria'):
+                    categorias[os.path.normpath(os.path.join(origem, rota['arquivo']))] = rota['categoria']
+        pasta = os.path.join(origem, 'popups') if os.path.isdir(os.path.join(origem, 'popups')) else origem
+        caminhos.extend(sorted(glob.glob(os.path.join(pasta, '*.html'))))
+    return caminhos, url, categorias
+
+def main(argv=None) -> int:
+    """Linha de comando: reprocessa popups gravados sem navegador"""
+    parser = argparse.ArgumentParser(description="Extrai os dados nutricionais de popups HTML gravados, sem navegador")
+    parser.add_argument('origens', nargs='+', help="arquivos .html ou pastas (ex: uma gravação de config/gravacao.py)")
+    parser.add_argument('--saida', help="arquivo de saída (padrão: um novo snapshot em dados/)")
+    parser.add_argument('--formato', choices=['csv', 'jsonl', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--processos', type=int, help="processos usados (padrão: número de CPUs)")
+    parser.add_argument('--url', help="URL de origem gravada nos registros (padrão: a do manifesto)")
+    parser.add_argument('--categoria', default='N/A',
+                        help="categoria dos popups sem categoria no manifesto (padrão: N/A)")
+    argumentos = parser.parse_args(argv)
+    
+    caminhos, url, categorias = listar_popups(argumentos.origens)
+    if not caminhos:
+        print("❌ Nenhum arquivo de popup encontrado")
+        return 1
+    
+    inicio = time.perf_counter()
+    registros = extrair_em_lote(caminhos, argumentos.url or url, argumentos.categoria, argumentos.processos,
+                                categorias)
+    duracao = time.perf_counter() - inicio
+    print(f"🧩 {len(registros)} produtos extraídos de {len(caminhos)} popups em {duracao:.2f}s")
+    if not registros:
+        return 1
+    
+    from config.catalogo import registrar_saida
+    from config.coleta import gerar_caminho_arquivo
+    from config.saidas import criar_saida, consumir
+    caminho = argumentos.saida or gerar_caminho_arquivo(extensao=argumentos.formato)
+    with criar_saida(argumentos.formato, caminho) as saida:
+        consumir(registros, [saida])
+    registrar_saida(saida, duracao)
+    print(f"💾 {caminho}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
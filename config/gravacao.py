@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.esperas import SELETOR_POPUP, SELETOR_BOTOES
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Prefixo local dos recursos de outros domínios (CDNs, fontes...)
+PREFIXO_EXTERNO = "/__externo"
+
+# Tipos de conteúdo reescritos para apontar para o servidor local
+TIPOS_TEXTO = ('text/css', 'text/html', 'image/svg+xml')
+
+# DOM do menu renderizado (sem popup aberto) e URLs dos recursos carregados
+SCRIPT_CAPTURAR_PAGINA = """
+const recursos = performance.getEntriesByType('resource').map((entrada) => entrada.name);
+return {html: '<!DOCTYPE html>' + document.documentElement.outerHTML, recursos: recursos};
+"""
+
+# DOM do popup aberto e posição do botão que o abriu
+SCRIPT_CAPTURAR_POPUP = """
+const botao = arguments[0];
+const visivel = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const popup = Array.from(document.querySelectorAll(arguments[1])).find(
+    (el) => visivel(el) && el.querySelectorAll('table tr td').length > 0
+);
+const indice = Array.from(document.querySelectorAll(arguments[2])).indexOf(botao);
+return {indice: indice, html: popup ? popup.outerHTML : null};
+"""
+
+# Injetado na página reproduzida: abre o popup gravado do botão clicado e o
+# fecha pelo botão de fechar, pela tecla ESC ou por um clique fora dele
+SCRIPT_REPRODUCAO = """
+<script>
+(function () {
+    const seletorBotoes = %s;
+    const popups = %s;
+    let aberto = null;
+    const fechar = () => { if (aberto) { aberto.remove(); aberto = null; } };
+    
+    document.addEventListener('click', (evento) => {
+        const botao = evento.target.closest(seletorBotoes);
+        if (botao) {
+            const indice = Array.from(document.querySelectorAll(seletorBotoes)).indexOf(botao);
+            if (!popups[indice]) { return; }
+            fechar();
+            fetch(popups[indice]).then((resposta) => resposta.text()).then((html) => {
+                const modelo = document.createElement('template');
+                modelo.innerHTML = html.trim();
+                aberto = modelo.content.firstElementChild;
+                document.body.appendChild(aberto);
+            });
+            return;
+        }
+        if (!aberto) { return; }
+        if (!aberto.contains(evento.target) || evento.target.closest("[class*='close'], .close, .modal-close, button[aria-label='Close']")) {
+            fechar();
+        }
+    });
+    document.addEventListener('keydown', (evento) => { if (evento.key === 'Escape') { fechar(); } });
+})();
+</script>
+"""
+
+def caminho_local(url_recurso: str, url_pagina: str) -> str:
+    """
+    Caminho do recurso no servidor de reprodução.
+    
+    Recursos do mesmo domínio da página mantêm o caminho (e a query);
+    os de outros domínios ficam sob PREFIXO_EXTERNO/<domínio>.
+    """
+    recurso = urlparse(url_recurso)
+    caminho = recurso.path or '/'
+    if recurso.query:
+        caminho += '?' + recurso.query
+    if recurso.netloc == urlparse(url_pagina).netloc:
+        return caminho
+    return f"{PREFIXO_EXTERNO}/{recurso.netloc}{caminho}"
+
+def reescrever_urls(texto: str, url_pagina: str, dominios: set) -> str:
+    """Troca as URLs absolutas dos domínios gravados por caminhos locais"""
+    pagina = urlparse(url_pagina)
+    for dominio in sorted(dominios, key=len, reverse=True):
+        destino = '' if dominio == pagina.netloc else f"{PREFIXO_EXTERNO}/{dominio}"
+        for esquema in ('https://', 'http://', '//'):
+            texto = texto.replace(f"{esquema}{dominio}", destino)
+    return texto
+
+class Gravador:
+    """
+    Grava uma execução real: o menu renderizado, seus recursos e o DOM de
+    cada popup, para reprodução local com servir_gravacao.
+    
+    Estrutura da pasta:
+        manifesto.json  URL original e mapa caminho local -> arquivo/tipo
+                        (e a categoria, nas rotas de popup)
+        menu.html       DOM do menu, sem scripts
+        popups/NNNN.html
+        recursos/<sha1>
+    """
+    
+    def __init__(self, pasta: str):
+        """
+        Args:
+            pasta: Pasta da gravação (criada se não existir)
+        """
+        self.pasta = pasta
+        self.url: Optional[str] = None
+        self.rotas: Dict[str, Dict[str, str]] = {}
+        self.popups: Dict[int, str] = {}
+        self._html_menu: Optional[str] = None
+        self._dominios = set()
+        os.makedirs(os.path.join(pasta, 'popups'), exist_ok=True)
+        os.makedirs(os.path.join(pasta, 'recursos'), exist_ok=True)
+    
+    def gravar_pagina(self, driver, url: str) -> None:
+        """
+        Grava o menu já renderizado e baixa os recursos que ele carregou.
+        
+        Args:
+            driver: WebDriver com o menu carregado e sem popup aberto
+            url: URL do menu
+        """
+        from config.coleta_http import get_sessao_http
+        
+        captura = driver.execute_script(SCRIPT_CAPTURAR_PAGINA)
+        if not captura or not captura.get('html'):
+            log.warning("⚠️  Menu não gravado: a página não retornou o DOM")
+            return
+        self._dominios.add(urlparse(url).netloc)
+        
+        sessao = get_sessao_http()
+        baixados = 0
+        for url_recurso in dict.fromkeys(captura['recursos']):
+            if not url_recurso.startswith('http') or url_recurso.endswith('.js') or '.js?' in url_recurso:
+                continue
+            try:
+                resposta = sessao.get(url_recurso, timeout=20)
+                resposta.raise_for_status()
+            except requests.RequestException as e:
+                log.warning("⚠️  Recurso não gravado (%s): %s", url_recurso, e)
+                continue
+            self._dominios.add(urlparse(url_recurso).netloc)
+            self._salvar_rota(caminho_local(url_recurso, url), resposta.content,
+                              resposta.headers.get('Content-Type', 'application/octet-stream'))
+            baixados += 1
+        
+        self._html_menu = captura['html']
+        self.url = url
+        log.info("📼 Menu gravado com %s recursos", baixados)
+    
+    def gravar_popup(self, driver, botao, categoria: str = 'N/A') -> None:
+        """
+        Grava o DOM do popup aberto pelo botão.
+        
+        Args:
+            driver: WebDriver com o popup aberto
+            botao: WebElement do botão que abriu o popup
+            categoria: Categoria do produto, guardada no manifesto para a extração em lote
+        """
+        captura = driver.execute_script(SCRIPT_CAPTURAR_POPUP, botao, SELETOR_POPUP, SELETOR_BOTOES)
+        if not captura or captura['indice'] < 0 or not captura['html']:
+            return
+        rota = f"/__popups/{captura['indice']:04d}.html"
+        arquivo = os.path.join('popups', f"{captura['indice']:04d}.html")
+        with open(os.path.join(self.pasta, arquivo), 'w', encoding='utf-8') as saida:
+            saida.write(captura['html'])
+        self.rotas[rota] = {'arquivo': arquivo, 'tipo': 'text/html; charset=utf-8', 'categoria': categoria}
+        self.popups[captura['indice']] = rota
+    
+    def concluir(self) -> None:
+        """Grava o menu com o script de reprodução e o manifesto"""
+        if self._html_menu is None:
+            log.warning("⚠️  Gravação em %s não concluída: o menu não foi capturado", self.pasta)
+            return
+        
+        # O menu é servido sem os scripts do site, para o DOM gravado não mudar
+        html = _remover_scripts(reescrever_urls(self._html_menu, self.url, self._dominios))
+        popups = [self.popups.get(indice) for indice in range(max(self.popups, default=-1) + 1)]
+        injetado = SCRIPT_REPRODUCAO % (json.dumps(SELETOR_BOTOES), json.dumps(popups))
+        html = html.replace('</body>', injetado + '</body>') if '</body>' in html else html + injetado
+        with open(os.path.join(self.pasta, 'menu.html'), 'w', encoding='utf-8') as saida:
+            saida.write(html)
+        
+        # Recursos de texto também apontam para o servidor local
+        for rota in self.rotas.values():
+            if rota['tipo'].split(';')[0] in TIPOS_TEXTO and rota['arquivo'].startswith('recursos'):
+                caminho = os.path.join(self.pasta, rota['arquivo'])
+                with open(caminho, 'r', encoding='utf-8', errors='replace') as entrada:
+                    texto = reescrever_urls(entrada.read(), self.url, self._dominios)
+                with open(caminho, 'w', encoding='utf-8') as saida:
+                    saida.write(texto)
+        
+        manifesto = {'url': self.url, 'caminho_menu': urlparse(self.url).path, 'rotas': self.rotas}
+        with open(os.path.join(self.pasta, 'manifesto.json'), 'w', encoding='utf-8') as saida:
+            json.dump(manifesto, saida, ensure_ascii=False, indent=2)
+        log.info("📼 Gravação salva em %s: %s popups, %s rotas", self.pasta, len(self.popups), len(self.rotas))
+    
+    def _salvar_rota(self, rota: str, conteudo: bytes, tipo: str) -> None:
+        arquivo = os.path.join('recursos', hashlib.sha1(rota.encode('utf-8')).hexdigest())
+        with open(os.path.join(self.pasta, arquivo), 'wb') as saida:
+            saida.write(conteudo)
+        self.rotas[rota] = {'arquivo': arquivo, 'tipo': tipo}
+
+def _remover_scripts(html: str) -> str:
+    """Remove as tags <script> (exceto JSON embutido) do HTML gravado"""
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html, 'lxml')
+    for script in soup.find_all('script'):
+        if script.get('type') not in ('application/json', 'application/ld+json'):
+            script.decompose()
+    for link in soup.find_all('link', rel=['preload', 'modulepreload', 'prefetch']):
+        link.decompose()
+    return str(soup)
+
+def carregar_manifesto(pasta: str) -> Dict:
+    """Lê o manifesto de uma gravação"""
+    with open(os.path.join(pasta, 'manifesto.json'), 'r', encoding='utf-8') as entrada:
+        return json.load(entrada)
+
+def servir_gravacao(pasta: str, host: str = '127.0.0.1', porta: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Sobe um servidor HTTP local que reproduz uma gravação, em uma thread própria.
+    
+    Args:
+        pasta: Pasta da gravação
+        host: Endereço de escuta
+        porta: Porta (0 = escolhe uma livre)
+    
+    Returns:
+        Tupla (servidor, URL do menu reproduzido); encerre com servidor.shutdown()
+    """
+    manifesto = carregar_manifesto(pasta)
+    rotas = dict(manifesto['rotas'])
+    rota_menu = {'arquivo': 'menu.html', 'tipo': 'text/html; charset=utf-8'}
+    rotas[manifesto['caminho_menu']] = rota_menu
+    rotas['/'] = rota_menu
+    
+    class ManipuladorReproducao(BaseHTTPRequestHandler):
+        def do_GET(self):
+            rota = rotas.get(self.path) or rotas.get(self.path.split('?')[0])
+            if rota is None:
+                self.send_error(404)
+                return
+            with open(os.path.join(pasta, rota['arquivo']), 'rb') as entrada:
+                conteudo = entrada.read()
+            self.send_response(200)
+            self.send_header('Content-Type', rota['tipo'])
+            self.send_header('Content-Length', str(len(conteudo)))
+            self.end_headers()
+            self.wfile.write(conteudo)
+        
+        def log_message(self, formato, *args):
+            pass
+    
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorReproducao)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://{host}:{servidor.server_address[1]}{manifesto['caminho_menu']}"
+    log.info("▶️  Reproduzindo %s em %s", pasta, url)
+    return servidor, url
+
+def main(argv=None) -> None:
+    """Linha de comando: gravar uma execução real ou servir uma gravação"""
+    parser = argparse.ArgumentParser(description="Grava e reproduz o menu do The Coffee localmente")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    gravar = subcomandos.add_parser('gravar', help="coleta no site real gravando menu, recursos e popups")
+    gravar.add_argument('pasta', help="pasta da gravação")
+    gravar.add_argument('--url', help="URL do menu (padrão: loja Vila Olímpia)")
+    gravar.add_argument('--limite', type=int, help="número de popups a gravar")
+    
+    servir = subcomandos.add_parser('servir', help="serve uma gravação em localhost")
+    servir.add_argument('pasta', help="pasta da gravação")
+    servir.add_argument('--porta', type=int, default=8000)
+    
+    argumentos = parser.parse_args(argv)
+    
+    if argumentos.comando == 'gravar':
+        from config.coleta import coletar_produtos_the_coffee, URL_MENU_PADRAO
+        gravador = Gravador(argumentos.pasta)
+        coletar_produtos_the_coffee(argumentos.url or URL_MENU_PADRAO, limite_produtos=argumentos.limite,
+                                    perfil_enxuto=False, gravador=gravador)
+    else:
+        servidor, _ = servir_gravacao(argumentos.pasta, porta=argumentos.porta)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            servidor.shutdown()
+
+if __name__ == "__main__":
+    main()
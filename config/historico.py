@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.urls import identificar_loja
+from config.porcoes import COLUNAS_NUTRIENTES
+from config.saidas import Saida, TAMANHO_LOTE_PADRAO
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Banco com o histórico de todas as execuções
+BANCO_HISTORICO = os.path.join("dados", "historico.sqlite")
+
+ESQUEMA_HISTORICO = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY,
+    inicio TEXT NOT NULL,
+    fim TEXT,
+    arquivo TEXT,
+    total INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS produtos (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    loja TEXT NOT NULL,
+    categoria TEXT,
+    url TEXT,
+    UNIQUE (nome, loja)
+);
+
+CREATE TABLE IF NOT EXISTS observacoes (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes (id),
+    produto_id INTEGER NOT NULL REFERENCES produtos (id),
+    loja TEXT NOT NULL,
+    momento TEXT NOT NULL,
+    nutriente TEXT NOT NULL,
+    valor REAL,
+    PRIMARY KEY (execucao_id, produto_id, nutriente)
+);
+
+CREATE INDEX IF NOT EXISTS idx_observacoes_produto_momento ON observacoes (produto_id, momento);
+CREATE INDEX IF NOT EXISTS idx_observacoes_loja_momento ON observacoes (loja, momento);
+
+-- Valor mais recente de cada nutriente de cada produto
+CREATE VIEW IF NOT EXISTS ultimas_observacoes AS
+SELECT p.nome, p.loja, p.categoria, o.nutriente, o.valor, o.momento
+FROM observacoes o
+JOIN produtos p ON p.id = o.produto_id
+WHERE o.momento = (SELECT MAX(momento) FROM observacoes WHERE produto_id = o.produto_id);
+"""
+
+def conectar_historico(caminho: str = BANCO_HISTORICO) -> sqlite3.Connection:
+    """
+    Abre o banco de histórico, criando as tabelas se necessário.
+    
+    Args:
+        caminho: Arquivo SQLite
+    
+    Returns:
+        Conexão SQLite
+    """
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.executescript(ESQUEMA_HISTORICO)
+    return conexao
+
+class SaidaHistorico(Saida):
+    """
+    Acrescenta os registros de uma execução ao banco de histórico.
+    
+    Diferente das outras saídas, o banco não é sobrescrito: cada execução
+    ganha uma linha em execucoes e cada lote é gravado em uma transação.
+    Registros sem nome são ignorados; se o mesmo produto (nome e loja)
+    aparece mais de uma vez na execução, vale a primeira ocorrência.
+    """
+    
+    def __init__(self, caminho: str = BANCO_HISTORICO, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 data_coleta: Optional[datetime] = None, arquivo: Optional[str] = None):
+        """
+        Args:
+            caminho: Arquivo SQLite do histórico
+            tamanho_lote: Registros por transação
+            data_coleta: Momento da execução (padrão: agora)
+            arquivo: Snapshot gravado na mesma execução, para referência
+        """
+        super().__init__(caminho, tamanho_lote)
+        self.momento = (data_coleta or datetime.now()).replace(microsecond=0).isoformat()
+        self.arquivo = arquivo
+        self._conexao: Optional[sqlite3.Connection] = None
+        self._execucao_id: Optional[int] = None
+        self._vistos: Set[Tuple[str, str]] = set()
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        if self._conexao is None:
+            self._conexao = conectar_historico(self.caminho)
+            with self._conexao:
+                cursor = self._conexao.execute(
+                    "INSERT INTO execucoes (inicio, arquivo) VALUES (?, ?)", (self.momento, self.arquivo))
+                self._execucao_id = cursor.lastrowid
+        
+        nomes = df['NOME_PRODUTO'].fillna('').astype(str).str.strip()
+        if 'LOJA' in df.columns:
+            lojas = df['LOJA'].astype(str)
+        else:
+            lojas = df['URL'].astype(str).map(identificar_loja)
+        
+        # Uma observação por produto e execução: sem nome não há produto, e repetições são descartadas
+        manter = []
+        for nome, loja in zip(nomes, lojas):
+            if not nome:
+                manter.append(False)
+            elif (nome, loja) in self._vistos:
+                log.warning("⚠️  Produto repetido na execução, mantida a primeira ocorrência: %s (%s)", nome, loja)
+                manter.append(False)
+            else:
+                self._vistos.add((nome, loja))
+                manter.append(True)
+        df, nomes, lojas = df[manter], nomes[manter], lojas[manter]
+        if df.empty:
+            return
+        
+        produtos = list(zip(nomes, lojas, df['CATEGORIA'].astype(str), df['URL'].astype(str)))
+        nutrientes = [coluna for coluna in COLUNAS_NUTRIENTES if coluna in df.columns]
+        valores = df[nutrientes].apply(pd.to_numeric, errors='coerce')
+        
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO produtos (nome, loja, categoria, url) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (nome, loja) DO UPDATE SET categoria = excluded.categoria, url = excluded.url",
+                produtos)
+            ids = {}
+            for nome, loja, _, _ in produtos:
+                if (nome, loja) not in ids:
+                    ids[(nome, loja)] = self._conexao.execute(
+                        "SELECT id FROM produtos WHERE nome = ? AND loja = ?", (nome, loja)).fetchone()[0]
+            
+            observacoes = []
+            for (nome, loja, _, _), linha in zip(produtos, valores.itertuples(index=False)):
+                for nutriente, valor in zip(nutrientes, linha):
+                    observacoes.append((self._execucao_id, ids[(nome, loja)], loja, self.momento, nutriente,
+                                        None if pd.isna(valor) else float(valor)))
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO observacoes (execucao_id, produto_id, loja, momento, nutriente, valor) "
+                "VALUES (?, ?, ?, ?, ?, ?)", observacoes)
+    
+    def fechar(self) -> None:
+        super().fechar()
+        if self._conexao is not None:
+            with self._conexao:
+                self._conexao.execute("UPDATE execucoes SET fim = ?, total = ? WHERE id = ?",
+                                      (datetime.now().replace(microsecond=0).isoformat(), self.total, self._execucao_id))
+            self._conexao.close()
+            self._conexao = None
+
+def serie_produto(nome: str, nutriente: str, loja: Optional[str] = None,
+                  caminho: str = BANCO_HISTORICO) -> List[Tuple[str, str, Optional[float]]]:
+    """
+    Retorna a série temporal de um nutriente de um produto.
+    
+    Args:
+        nome: NOME_PRODUTO
+        nutriente: Coluna do nutriente (ex: 'ACUCARES (g)')
+        loja: Identificador da loja (None = todas)
+        caminho: Arquivo SQLite do histórico
+    
+    Returns:
+        Lista de tuplas (momento, loja, valor) em ordem cronológica
+    """
+    conexao = conectar_historico(caminho)
+    try:
+        consulta = ("SELECT o.momento, o.loja, o.valor FROM produtos p "
+                    "JOIN observacoes o ON o.produto_id = p.id "
+                    "WHERE p.nome = ? AND o.nutriente = ?")
+        parametros = [nome, nutriente]
+        if loja:
+            consulta += " AND p.loja = ?"
+            parametros.append(loja)
+        return conexao.execute(consulta + " ORDER BY o.momento", parametros).fetchall()
+    finally:
+        conexao.close()
+
+def ultimos_valores(caminho: str = BANCO_HISTORICO) -> pd.DataFrame:
+    """
+    Retorna o valor mais recente de cada nutriente por produto, um produto por linha.
+    
+    Args:
+        caminho: Arquivo SQLite do histórico
+    
+    Returns:
+        DataFrame com nome, loja, categoria, momento e uma coluna por nutriente
+    """
+    conexao = conectar_historico(caminho)
+    try:
+        df = pd.read_sql_query("SELECT * FROM ultimas_observacoes", conexao)
+    finally:
+        conexao.close()
+    
+    if df.empty:
+        return df
+    return df.pivot_table(index=['nome', 'loja', 'categoria', 'momento'], columns='nutriente',
+                          values='valor', aggfunc='first').reset_index()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import math
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.browser import load_browser_cache, save_browser_cache
+from config.catalogo import Catalogo, ler_registros
+from config.retencao import COLUNAS_IGNORADAS, data_snapshot
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Impressões digitais da última execução, por URL do menu
+ARQUIVO_IMPRESSOES = "impressoes_produtos.json"
+
+# Lê as informações do cartão de cada produto, visíveis sem abrir o popup.
+# O cartão é o maior ancestral do botão que não contém outro botão.
+SCRIPT_LER_CARTOES = """
+const botoes = arguments[0];
+const seletorBotoes = arguments[1];
+const texto = (el) => el ? (el.innerText || el.textContent || '').trim() : '';
+
+return botoes.map((botao) => {
+    let cartao = botao;
+    while (cartao.parentElement && cartao.parentElement !== document.body
+           && cartao.parentElement.querySelectorAll(seletorBotoes).length <= 1) {
+        cartao = cartao.parentElement;
+    }
+    
+    const nome = cartao.querySelector("h1, h2, h3, h4, h5, [class*='name'], [class*='title']");
+    const descricao = cartao.querySelector("[class*='desc'], p");
+    const imagem = cartao.querySelector('img');
+    let urlImagem = imagem ? (imagem.getAttribute('src') || imagem.getAttribute('data-src') || '') : '';
+    if (!urlImagem) {
+        const fundo = cartao.querySelector("[style*='background-image']");
+        urlImagem = fundo ? fundo.style.backgroundImage : '';
+    }
+    return {nome: texto(nome), descricao: texto(descricao), imagem: urlImagem};
+});
+"""
+
+def ler_cartoes(driver, botoes: List, seletor_botoes: str) -> List[Dict[str, str]]:
+    """
+    Lê nome, descrição e imagem do cartão de cada produto em uma única chamada.
+    
+    Args:
+        driver: Instância do WebDriver com o menu carregado
+        botoes: WebElements dos botões "info nutricional"
+        seletor_botoes: Seletor CSS dos botões, usado para delimitar cada cartão
+    
+    Returns:
+        Lista de dicionários {'nome', 'descricao', 'imagem'} alinhada com botoes
+    """
+    try:
+        return driver.execute_script(SCRIPT_LER_CARTOES, botoes, seletor_botoes)
+    except Exception as e:
+        log.error("Erro ao ler os cartões dos produtos: %s", e)
+        return [{'nome': '', 'descricao': '', 'imagem': ''} for _ in botoes]
+
+def calcular_impressao(cartao: Dict[str, str], categoria: str) -> Optional[str]:
+    """
+    Calcula a impressão digital de um produto a partir do seu cartão.
+    
+    Args:
+        cartao: Informações do cartão (ver ler_cartoes)
+        categoria: Categoria do produto
+    
+    Returns:
+        Hash SHA-1 em hexadecimal, ou None se o cartão não tiver nome
+        (sem nome não há como reconhecer o produto com segurança)
+    """
+    if not cartao.get('nome'):
+        return None
+    partes = [categoria, cartao.get('nome', ''), cartao.get('descricao', ''), cartao.get('imagem', '')]
+    return hashlib.sha1('\x1f'.join(' '.join(parte.split()) for parte in partes).encode('utf-8')).hexdigest()
+
+def carregar_impressoes(url: str, pasta_dados: str = "dados") -> Dict:
+    """
+    Retorna as impressões da última execução para a URL do menu.
+    
+    Returns:
+        Dicionário com 'impressoes' (impressão -> NOME_PRODUTO do registro coletado)
+        e 'urls_registros' (valores do campo URL gravados nos registros desse menu)
+    """
+    entrada = load_browser_cache(os.path.join(pasta_dados, ARQUIVO_IMPRESSOES)).get(url, {})
+    if 'impressoes' not in entrada:
+        # Formato antigo: só as impressões, com os registros gravados sob a própria URL do menu
+        entrada = {'impressoes': entrada, 'urls_registros': [url]}
+    return entrada
+
+def salvar_impressoes(url: str, impressoes: Dict[str, str], urls_registros: Iterable[str],
+                      pasta_dados: str = "dados") -> None:
+    """Grava as impressões desta execução e as URLs dos seus registros para a URL do menu"""
+    caminho = os.path.join(pasta_dados, ARQUIVO_IMPRESSOES)
+    todas = load_browser_cache(caminho)
+    todas[url] = {'impressoes': impressoes, 'urls_registros': sorted(urls_registros)}
+    save_browser_cache(todas, caminho)
+
+def listar_snapshots(pasta_dados: str = "dados") -> List[str]:
+    """Snapshots da pasta em qualquer formato (pelo catálogo), do mais recente ao mais antigo"""
+    nomes = []
+    for entrada in Catalogo(pasta_dados).reconciliar():
+        try:
+            nomes.append((data_snapshot(entrada['arquivo']), entrada['arquivo']))
+        except ValueError:
+            continue
+    return [os.path.join(pasta_dados, nome) for _, nome in sorted(nomes, reverse=True)]
+
+def _como_texto(valor) -> str:
+    """Valor lido de JSONL, SQLite ou Parquet no formato textual do CSV"""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return ''
+    if isinstance(valor, float):
+        # Parquet guarda os nutrientes em float32: 7 dígitos significativos
+        return f"{valor:.7g}"
+    return str(valor)
+
+def carregar_registros_anteriores(urls_registros: Iterable[str], pasta_dados: str = "dados") -> Dict[str, Dict[str, str]]:
+    """
+    Carrega os registros do snapshot mais recente que tenha produtos do menu,
+    indexados pelo nome do produto.
+    
+    Args:
+        urls_registros: Valores do campo URL dos registros do menu (ver carregar_impressoes)
+        pasta_dados: Pasta dos snapshots
+    
+    Returns:
+        Dicionário NOME_PRODUTO -> registro (valores como texto)
+    """
+    urls_registros = set(urls_registros)
+    for caminho in listar_snapshots(pasta_dados):
+        try:
+            # DATA_COLETA é da execução anterior; a saída desta execução grava a sua
+            registros = [{coluna: _como_texto(valor) for coluna, valor in registro.items()
+                          if coluna not in COLUNAS_IGNORADAS}
+                         for registro in ler_registros(caminho) if registro.get('URL') in urls_registros]
+        except Exception as e:
+            log.error("Erro ao ler o snapshot anterior %s: %s", caminho, e)
+            continue
+        if registros:
+            log.info("📂 Snapshot anterior: %s (%s produtos)", caminho, len(registros))
+            return {registro['NOME_PRODUTO']: registro for registro in registros}
+    return {}
+
+class ColetaIncremental:
+    """
+    Decide quais produtos precisam ter o popup aberto em uma coleta incremental.
+    
+    Um produto cuja impressão (categoria, nome, descrição e imagem do cartão)
+    já existia na execução anterior tem seu registro copiado do último
+    snapshot; os demais são coletados normalmente.
+    """
+    
+    def __init__(self, url: str, pasta_dados: str = "dados"):
+        self.url = url
+        self.pasta_dados = pasta_dados
+        anteriores = carregar_impressoes(url, pasta_dados)
+        self.impressoes_anteriores = anteriores['impressoes']
+        self.registros_anteriores = (carregar_registros_anteriores(anteriores['urls_registros'], pasta_dados)
+                                     if self.impressoes_anteriores else {})
+        self.impressoes: Dict[str, str] = {}
+        # O campo URL dos registros vem da página do popup, que pode diferir da URL do menu
+        self.urls_registros = set()
+        self.reaproveitados = 0
+        self.coletados = 0
+    
+    def registro_anterior(self, impressao: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        Retorna uma cópia do registro anterior do produto, se ele não mudou.
+        
+        Args:
+            impressao: Impressão atual do produto (None = sempre coletar)
+        
+        Returns:
+            Registro do snapshot anterior, ou None se o popup precisa ser aberto
+        """
+        if impressao is None:
+            return None
+        nome = self.impressoes_anteriores.get(impressao)
+        if nome is None or nome not in self.registros_anteriores:
+            return None
+        
+        self.impressoes[impressao] = nome
+        self.reaproveitados += 1
+        registro = dict(self.registros_anteriores[nome])
+        self.urls_registros.add(registro.get('URL', ''))
+        return registro
+    
+    def registrar(self, impressao: Optional[str], dados: Dict[str, str]) -> None:
+        """Associa a impressão ao registro recém-coletado"""
+        self.coletados += 1
+        if impressao is not None and dados.get('NOME_PRODUTO'):
+            self.impressoes[impressao] = dados['NOME_PRODUTO']
+            self.urls_registros.add(dados.get('URL', ''))
+    
+    def concluir(self) -> None:
+        """Grava as impressões desta execução e exibe o resumo"""
+        salvar_impressoes(self.url, self.impressoes, self.urls_registros, self.pasta_dados)
+        log.info("\n♻️  COLETA INCREMENTAL: %s produtos sem mudança reaproveitados, %s coletados",
+                 self.reaproveitados, self.coletados)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import glob
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.arquivos import gravar_atomico
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Limites (segundos) dos buckets dos histogramas de latência
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites dos buckets do histograma de comandos WebDriver por produto
+BUCKETS_COMANDOS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Pasta do textfile collector do node_exporter (padrão: <pasta_dados>/metricas)
+VARIAVEL_PASTA_PROMETHEUS = "THE_COFFEE_PROMETHEUS_DIR"
+
+PREFIXO_METRICAS = "the_coffee"
+
+# JSONs de métricas mantidos por loja em <pasta_dados>/metricas (os mais antigos são apagados)
+MANTER_METRICAS_JSON = 30
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus"""
+    
+    def __init__(self, limites=BUCKETS_SEGUNDOS):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+    
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+        self.maximo = max(self.maximo, valor)
+    
+    def mesclar(self, outro: 'Histograma') -> None:
+        """Acrescenta as observações de outro histograma com os mesmos limites"""
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.soma += outro.soma
+        self.total += outro.total
+        self.maximo = max(self.maximo, outro.maximo)
+    
+    def percentil(self, fracao: float) -> float:
+        """Estimativa do percentil pelo limite superior do bucket (o máximo no último)"""
+        alvo = fracao * self.total
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+    
+    def para_dict(self) -> Dict:
+        return {
+            'total': self.total,
+            'soma': round(self.soma, 6),
+            'media': round(self.soma / self.total, 6) if self.total else 0.0,
+            'p50': self.percentil(0.5),
+            'p95': self.percentil(0.95),
+            'p99': self.percentil(0.99),
+            'maximo': round(self.maximo, 6),
+            'buckets': {str(limite): contagem for limite, contagem in zip(self.limites, self.contagens)},
+        }
+
+class Instrumentacao:
+    """
+    Mede uma execução da coleta: cada comando WebDriver enviado ao driver
+    (contagem e latência por comando) e, por produto, o tempo de cada etapa
+    (scroll, clique, espera, extração, fechamento) e o número de comandos.
+    
+    Os comandos são medidos envolvendo command_executor.execute do driver,
+    por onde passam todas as chamadas (find_element, execute_script, click...).
+    """
+    
+    def __init__(self, loja: str = "padrao"):
+        """
+        Args:
+            loja: Identificador da loja, usado como label e no nome dos arquivos
+        """
+        self.loja = loja or "padrao"
+        self.inicio = datetime.now().replace(microsecond=0)
+        self.comandos: Dict[str, Histograma] = {}
+        self.etapas: Dict[str, Histograma] = {}
+        self.comandos_por_produto = Histograma(BUCKETS_COMANDOS)
+        self.produtos: List[Dict] = []
+        self.total_comandos = 0
+        self._span: Optional[Dict] = None
+        self._executor = None
+        self._trava = threading.Lock()
+    
+    def instrumentar(self, driver):
+        """
+        Passa a medir os comandos do driver.
+        
+        Args:
+            driver: WebDriver (ex: retornado por get_webdriver)
+        
+        Returns:
+            O próprio driver
+        """
+        executor = driver.command_executor
+        if 'execute' in vars(executor):
+            return driver  # já instrumentado
+        original = executor.execute
+        
+        def execute(comando, parametros):
+            inicio = time.perf_counter()
+            try:
+                return original(comando, parametros)
+            finally:
+                self._registrar_comando(comando, time.perf_counter() - inicio)
+        
+        executor.execute = execute
+        self._executor = executor
+        return driver
+    
+    def desinstrumentar(self) -> None:
+        """Restaura o driver original (necessário antes de devolvê-lo ao pool)"""
+        if self._executor is not None:
+            vars(self._executor).pop('execute', None)
+            self._executor = None
+    
+    def __getstate__(self):
+        # Enviada entre processos (coleta paralela) sem a trava e o driver
+        estado = dict(self.__dict__)
+        estado.update(_trava=None, _executor=None, _span=None)
+        return estado
+    
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+    
+    def mesclar(self, outra: 'Instrumentacao') -> None:
+        """
+        Soma as medições de outra execução (ex: de um worker da coleta paralela).
+        
+        Args:
+            outra: Instrumentacao cujos comandos, etapas e spans são acrescentados
+        """
+        with self._trava:
+            for destino, origem in ((self.comandos, outra.comandos), (self.etapas, outra.etapas)):
+                for nome, histograma in origem.items():
+                    destino.setdefault(nome, Histograma(histograma.limites)).mesclar(histograma)
+            self.comandos_por_produto.mesclar(outra.comandos_por_produto)
+            self.produtos.extend(outra.produtos)
+            self.total_comandos += outra.total_comandos
+            self.inicio = min(self.inicio, outra.inicio)
+    
+    def _registrar_comando(self, comando: str, segundos: float) -> None:
+        with self._trava:
+            if comando not in self.comandos:
+                self.comandos[comando] = Histograma()
+            self.comandos[comando].observar(segundos)
+            self.total_comandos += 1
+    
+    @contextmanager
+    def produto(self, indice: int):
+        """Span de um produto; as etapas medidas dentro dele são atribuídas a ele"""
+        self._span = {'indice': indice, 'etapas': {}, 'sucesso': False}
+        comandos_antes = self.total_comandos
+        inicio = time.perf_counter()
+        try:
+            yield self._span
+            self._span['sucesso'] = True
+        finally:
+            span, self._span = self._span, None
+            span['duracao'] = round(time.perf_counter() - inicio, 6)
+            span['comandos'] = self.total_comandos - comandos_antes
+            self.comandos_por_produto.observar(span['comandos'])
+            self.produtos.append(span)
+    
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede uma etapa (ex: 'scroll'), dentro ou fora de um produto"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            if nome not in self.etapas:
+                self.etapas[nome] = Histograma()
+            self.etapas[nome].observar(duracao)
+            if self._span is not None:
+                self._span['etapas'][nome] = round(self._span['etapas'].get(nome, 0.0) + duracao, 6)
+    
+    def para_dict(self) -> Dict:
+        """Resumo da execução, no formato exportado em JSON"""
+        produtos_medidos = len(self.produtos)
+        return {
+            'loja': self.loja,
+            'inicio': self.inicio.isoformat(),
+            'fim': datetime.now().replace(microsecond=0).isoformat(),
+            'produtos': produtos_medidos,
+            'falhas': sum(1 for span in self.produtos if not span['sucesso']),
+            'total_comandos': self.total_comandos,
+            'comandos_por_produto': self.comandos_por_produto.para_dict(),
+            'comandos': {comando: histograma.para_dict() for comando, histograma in sorted(self.comandos.items())},
+            'etapas': {etapa: histograma.para_dict() for etapa, histograma in self.etapas.items()},
+            'spans': self.produtos,
+        }
+    
+    def exportar_json(self, caminho: str) -> str:
+        """Grava o resumo e os spans de cada produto em JSON"""
+        gravar_atomico(caminho, json.dumps(self.para_dict(), ensure_ascii=False, indent=2))
+        return caminho
+    
+    def exportar_prometheus(self, caminho: str) -> str:
+        """
+        Grava as métricas no formato de texto do Prometheus, para o textfile
+        collector do node_exporter. A troca do arquivo é atômica, então o
+        collector nunca lê um arquivo pela metade.
+        """
+        linhas = []
+        loja = _escapar(self.loja)
+        
+        nome = f"{PREFIXO_METRICAS}_webdriver_comando_segundos"
+        linhas += [f"# HELP {nome} Latência dos comandos WebDriver por comando.", f"# TYPE {nome} histogram"]
+        for comando, histograma in sorted(self.comandos.items()):
+            linhas += _linhas_histograma(nome, histograma, f'loja="{loja}",comando="{_escapar(comando)}"')
+        
+        nome = f"{PREFIXO_METRICAS}_etapa_segundos"
+        linhas += [f"# HELP {nome} Duração de cada etapa por produto.", f"# TYPE {nome} histogram"]
+        for etapa, histograma in self.etapas.items():
+            linhas += _linhas_histograma(nome, histograma, f'loja="{loja}",etapa="{_escapar(etapa)}"')
+        
+        nome = f"{PREFIXO_METRICAS}_comandos_por_produto"
+        linhas += [f"# HELP {nome} Comandos WebDriver (round trips) por produto.", f"# TYPE {nome} histogram"]
+        linhas += _linhas_histograma(nome, self.comandos_por_produto, f'loja="{loja}"')
+        
+        for metrica, ajuda, valor in (
+            ('produtos', 'Produtos processados na última execução.', len(self.produtos)),
+            ('produtos_falhas', 'Produtos com erro na última execução.',
+             sum(1 for span in self.produtos if not span['sucesso'])),
+            ('ultima_execucao_timestamp_segundos', 'Fim da última execução (epoch).', int(time.time())),
+        ):
+            nome = f"{PREFIXO_METRICAS}_{metrica}"
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} gauge", f'{nome}{{loja="{loja}"}} {valor}']
+        
+        gravar_atomico(caminho, '\n'.join(linhas) + '\n')
+        return caminho
+    
+    def exportar(self, pasta_dados: str = "dados", manter: int = MANTER_METRICAS_JSON) -> None:
+        """
+        Exporta a execução: JSON em <pasta_dados>/metricas e o arquivo .prom na
+        pasta de THE_COFFEE_PROMETHEUS_DIR (padrão: a mesma pasta).
+        
+        Args:
+            pasta_dados: Pasta de dados
+            manter: JSONs mantidos para a loja; os mais antigos são apagados
+        """
+        pasta = os.path.join(pasta_dados, 'metricas')
+        arquivo = self.loja.replace('/', '_')
+        timestamp = self.inicio.strftime("%Y%m%d_%H%M%S")
+        caminho_json = self.exportar_json(os.path.join(pasta, f"metricas_{arquivo}_{timestamp}.json"))
+        # O timestamp no nome ordena os arquivos da loja do mais antigo ao mais recente
+        for antigo in sorted(glob.glob(os.path.join(pasta, f"metricas_{glob.escape(arquivo)}_*.json")))[:-max(1, manter)]:
+            os.remove(antigo)
+        pasta_prometheus = os.environ.get(VARIAVEL_PASTA_PROMETHEUS) or pasta
+        caminho_prom = self.exportar_prometheus(os.path.join(pasta_prometheus, f"{PREFIXO_METRICAS}_{arquivo}.prom"))
+        log.info("📈 Métricas salvas em %s e %s", caminho_json, caminho_prom)
+    
+    def imprimir_resumo(self) -> None:
+        """Exibe comandos por produto e as etapas e comandos mais lentos"""
+        if not self.produtos:
+            return
+        por_produto = self.comandos_por_produto
+        log.info("\n📈 INSTRUMENTAÇÃO: %s comandos WebDriver, %.1f por produto (p95 ≤ %g)",
+                 self.total_comandos, por_produto.soma / por_produto.total, por_produto.percentil(0.95))
+        for etapa, histograma in self.etapas.items():
+            log.info("   • %s: média %.0fms, p95 ≤ %.0fms, máx %.0fms", etapa, histograma.soma / histograma.total * 1000,
+                     histograma.percentil(0.95) * 1000, histograma.maximo * 1000)
+        mais_lentos = sorted(self.comandos.items(), key=lambda item: item[1].soma, reverse=True)[:3]
+        for comando, histograma in mais_lentos:
+            log.info("   • comando %s: %sx, total %.1fs", comando, histograma.total, histograma.soma)
+
+def _linhas_histograma(nome: str, histograma: Histograma, labels: str) -> List[str]:
+    linhas = []
+    acumulado = 0
+    for limite, contagem in zip(histograma.limites, histograma.contagens):
+        acumulado += contagem
+        linhas.append(f'{nome}_bucket{{{labels},le="{limite:g}"}} {acumulado}')
+    linhas.append(f'{nome}_bucket{{{labels},le="+Inf"}} {histograma.total}')
+    linhas.append(f'{nome}_sum{{{labels}}} {histograma.soma:.6f}')
+    linhas.append(f'{nome}_count{{{labels}}} {histograma.total}')
+    return linhas
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
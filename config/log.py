@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+# Logger raiz do projeto; os módulos usam obter_log(__name__)
+NOME_LOGGER = "the_coffee"
+
+# Registros mantidos em memória para o despejo quando um produto falha
+TAMANHO_BUFFER = 300
+
+# Variáveis de ambiente lidas na configuração padrão
+VARIAVEL_NIVEL = "THE_COFFEE_LOG_NIVEL"      # DEBUG, INFO, WARNING, ERROR
+VARIAVEL_SILENCIOSO = "THE_COFFEE_SILENCIOSO"  # 1 = só avisos e erros no terminal
+VARIAVEL_JSONL = "THE_COFFEE_LOG_JSONL"        # arquivo JSON-lines opcional
+
+class BufferCircular(logging.Handler):
+    """
+    Guarda os últimos registros (de qualquer nível) sem formatá-los.
+    
+    A mensagem só é montada se o buffer for despejado, ou seja, quando um
+    produto falha; no caminho normal os registros de depuração custam apenas
+    a criação do LogRecord.
+    """
+    
+    def __init__(self, capacidade: int = TAMANHO_BUFFER):
+        super().__init__(logging.DEBUG)
+        self.registros = deque(maxlen=capacidade)
+    
+    def handle(self, record: logging.LogRecord) -> bool:
+        # deque.append já é thread-safe: dispensa o lock e os filtros do Handler
+        self.registros.append(record)
+        return True
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        self.registros.append(record)
+    
+    def limpar(self) -> None:
+        self.registros.clear()
+
+class FormatadorJSON(logging.Formatter):
+    """Um objeto JSON por registro, com os campos extras passados em extra={'campos': {...}}"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            'momento': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+        }
+        registro.update(getattr(record, 'campos', {}))
+        if record.exc_info:
+            registro['excecao'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+class TerminalAtual(logging.StreamHandler):
+    """StreamHandler que escreve sempre no sys.stdout atual (respeita redirect_stdout)"""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, valor):
+        pass
+
+_buffer: Optional[BufferCircular] = None
+_console: Optional[logging.Handler] = None
+
+def configurar_log(nivel: str = "INFO", silencioso: bool = False, arquivo_jsonl: Optional[str] = None,
+                   tamanho_buffer: int = TAMANHO_BUFFER) -> logging.Logger:
+    """
+    Configura o log do projeto (pode ser chamada de novo para trocar a configuração).
+    
+    Args:
+        nivel: Nível mínimo exibido no terminal ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+        silencioso: Se True, o terminal mostra apenas avisos e erros
+        arquivo_jsonl: Arquivo JSON-lines que recebe os registros a partir de nivel
+        tamanho_buffer: Registros mantidos para o despejo de falhas (0 = sem buffer)
+    
+    Returns:
+        O logger raiz do projeto
+    """
+    global _buffer, _console
+    
+    logger = logging.getLogger(NOME_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+    
+    nivel_console = logging.WARNING if silencioso else logging.getLevelName(nivel.upper())
+    _console = TerminalAtual()
+    _console.setLevel(nivel_console)
+    _console.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_console)
+    
+    niveis = [nivel_console]
+    if arquivo_jsonl:
+        os.makedirs(os.path.dirname(arquivo_jsonl) or '.', exist_ok=True)
+        sink = logging.FileHandler(arquivo_jsonl, encoding='utf-8')
+        sink.setLevel(logging.getLevelName(nivel.upper()))
+        sink.setFormatter(FormatadorJSON())
+        logger.addHandler(sink)
+        niveis.append(sink.level)
+    
+    _buffer = None
+    if tamanho_buffer:
+        _buffer = BufferCircular(tamanho_buffer)
+        logger.addHandler(_buffer)
+        niveis.append(logging.DEBUG)
+    
+    # Chamadas abaixo do menor nível em uso retornam sem criar o registro
+    logger.setLevel(min(niveis))
+    
+    # Processos filhos iniciados por spawn (coleta paralela) configuram o log por obter_log
+    os.environ[VARIAVEL_NIVEL] = nivel.upper()
+    os.environ[VARIAVEL_SILENCIOSO] = "1" if silencioso else ""
+    os.environ[VARIAVEL_JSONL] = arquivo_jsonl or ""
+    return logger
+
+def obter_log(nome: Optional[str] = None) -> logging.Logger:
+    """
+    Logger de um módulo do projeto, configurado pelas variáveis de ambiente na primeira chamada.
+    
+    Args:
+        nome: Nome do módulo (ex: __name__)
+    
+    Returns:
+        logging.Logger filho de NOME_LOGGER
+    """
+    if not logging.getLogger(NOME_LOGGER).handlers:
+        configurar_log(nivel=os.environ.get(VARIAVEL_NIVEL, "INFO"),
+                       silencioso=os.environ.get(VARIAVEL_SILENCIOSO, "").lower() in ("1", "true", "sim", "yes"),
+                       arquivo_jsonl=os.environ.get(VARIAVEL_JSONL) or None)
+    return logging.getLogger(f"{NOME_LOGGER}.{nome}" if nome else NOME_LOGGER)
+
+def terminal_exibe(nivel: int = logging.INFO) -> bool:
+    """Indica se o terminal mostra mensagens do nível (False no modo silencioso para INFO)"""
+    return _console is None or nivel >= _console.level
+
+def iniciar_produto() -> None:
+    """Descarta o buffer do produto anterior"""
+    if _buffer is not None:
+        _buffer.limpar()
+
+def despejar_falha(descricao: str) -> None:
+    """
+    Exibe os registros guardados que o terminal ainda não mostrou, para
+    diagnosticar um produto que falhou, e esvazia o buffer.
+    
+    Args:
+        descricao: Identificação do produto (ex: 'produto 12/61')
+    """
+    if _buffer is None or _console is None:
+        return
+    ocultos = [registro for registro in _buffer.registros if registro.levelno < _console.level]
+    _buffer.limpar()
+    if not ocultos:
+        return
+    _console.stream.write(f"🔎 Últimos {len(ocultos)} registros de {descricao}:\n")
+    for registro in ocultos:
+        _console.stream.write(f"   [{registro.levelname}] {registro.getMessage()}\n")
+    _console.flush()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import coletar_produtos_the_coffee, get_webdriver
+from config.coleta_http import baixar_pagina, coletar_produtos_http
+from config.pool import PoolSessoes
+from config.saidas import criar_saida, consumir
+from config.catalogo import registrar_saida
+from config.urls import URL_RAIZ_LOJAS, REGEX_CAMINHO_SHORTCUT, SEGMENTOS_LOJA, identificar_loja
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+def _extrair_caminhos(html: str) -> List[str]:
+    """Retorna os caminhos /shortcut/... citados no HTML (links e JSON embutido)"""
+    return list(dict.fromkeys(match.group(0).rstrip('/') for match in REGEX_CAMINHO_SHORTCUT.finditer(html)))
+
+def _html_pelo_navegador(url: str, timeout: float = 10) -> str:
+    """Renderiza uma página no navegador e retorna o HTML resultante"""
+    driver = get_webdriver()
+    if not driver:
+        return ''
+    try:
+        driver.get(url)
+        # Aguarda o app renderizar os links da hierarquia de atalhos
+        try:
+            WebDriverWait(driver, timeout).until(lambda d: '/shortcut/' in d.page_source)
+        except TimeoutException:
+            pass
+        return driver.page_source
+    finally:
+        driver.quit()
+
+def descobrir_lojas(url_raiz: str = URL_RAIZ_LOJAS, usar_navegador: bool = True) -> List[str]:
+    """
+    Lista as URLs de menu de todas as lojas a partir da hierarquia de atalhos do site.
+    
+    Percorre em largura as páginas /shortcut/<país> e /shortcut/<país>/<cidade>
+    e transforma cada caminho de loja em sua URL de menu.
+    
+    Args:
+        url_raiz: Página inicial da hierarquia (ex: .../shortcut/brasil)
+        usar_navegador: Se True, renderiza no navegador as páginas cujo HTML
+                        servido não traz nenhum link de atalho
+    
+    Returns:
+        URLs de menu das lojas, ordenadas
+    """
+    prefixo = urlparse(url_raiz).path.rstrip('/')
+    visitadas = set()
+    fila = deque([url_raiz])
+    menus = set()
+    
+    while fila:
+        url = fila.popleft()
+        if url in visitadas:
+            continue
+        visitadas.add(url)
+        
+        try:
+            html = baixar_pagina(url)
+        except requests.RequestException as e:
+            log.error("Erro ao baixar %s: %s", url, e)
+            html = ''
+        
+        caminhos = _extrair_caminhos(html)
+        if not caminhos and usar_navegador:
+            log.info("Nenhum atalho no HTML servido, renderizando no navegador: %s", url)
+            caminhos = _extrair_caminhos(_html_pelo_navegador(url))
+        
+        for caminho in caminhos:
+            if not caminho.startswith(prefixo):
+                continue
+            
+            segmentos = [segmento for segmento in caminho.split('/') if segmento]
+            if segmentos[-1] == 'menu':
+                segmentos = segmentos[:-1]
+            
+            if len(segmentos) == SEGMENTOS_LOJA:
+                menus.add(urljoin(url, '/' + '/'.join(segmentos) + '/menu'))
+            elif len(segmentos) < SEGMENTOS_LOJA:
+                fila.append(urljoin(url, caminho))
+    
+    log.info("🏪 %s lojas encontradas em %s páginas", len(menus), len(visitadas))
+    return sorted(menus)
+
+def coletar_lojas(urls_menu: List[str], max_simultaneas: int = 4, motor: str = 'navegador',
+                  limite_produtos: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Coleta várias lojas ao mesmo tempo, com no máximo max_simultaneas em andamento.
+    
+    Os navegadores vêm de um PoolSessoes do mesmo tamanho e são reaproveitados
+    entre lojas. Os registros são entregues loja a loja, conforme cada uma
+    termina, então a memória depende só do número de lojas simultâneas.
+    
+    Args:
+        urls_menu: URLs de menu das lojas (ver descobrir_lojas)
+        max_simultaneas: Número máximo de lojas em coleta ao mesmo tempo
+        motor: 'navegador', 'http' ou 'auto' (ver config.coleta.main)
+        limite_produtos: Limite de produtos por loja (None = todos)
+    
+    Yields:
+        Registros dos produtos com a coluna LOJA preenchida
+    """
+    pool = PoolSessoes(max_sessoes=max_simultaneas)
+    
+    def coletar_loja(url_menu: str) -> List[Dict[str, str]]:
+        if motor in ('http', 'auto'):
+            return coletar_produtos_http(url_menu, limite_produtos=limite_produtos,
+                                         fallback_navegador=(motor == 'auto'), pool=pool)
+        return coletar_produtos_the_coffee(url_menu, limite_produtos=limite_produtos, pool=pool)
+    
+    pendentes = iter(urls_menu)
+    em_andamento = {}
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_simultaneas) as executor:
+            while True:
+                # Mantém no máximo max_simultaneas lojas em andamento
+                while len(em_andamento) < max_simultaneas:
+                    url_menu = next(pendentes, None)
+                    if url_menu is None:
+                        break
+                    em_andamento[executor.submit(coletar_loja, url_menu)] = url_menu
+                
+                if not em_andamento:
+                    break
+                
+                concluidos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    url_menu = em_andamento.pop(futuro)
+                    loja = identificar_loja(url_menu)
+                    try:
+                        registros = futuro.result()
+                    except Exception as e:
+                        log.error("❌ Erro ao coletar a loja %s: %s", loja, e)
+                        continue
+                    
+                    log.info("✅ Loja %s: %s produtos", loja, len(registros))
+                    for dados in registros:
+                        yield adicionar_loja(dados, loja)
+    finally:
+        pool.encerrar()
+
+def adicionar_loja(dados: Dict[str, str], loja: str) -> Dict[str, str]:
+    """
+    Insere a coluna LOJA logo após a coluna URL de um registro.
+    
+    Args:
+        dados: Registro de um produto
+        loja: Identificador da loja
+    
+    Returns:
+        Novo dicionário com a coluna LOJA
+    """
+    registro = {}
+    for chave, valor in dados.items():
+        registro[chave] = valor
+        if chave == 'URL':
+            registro['LOJA'] = loja
+    registro.setdefault('LOJA', loja)
+    return registro
+
+def coletar_todas_lojas(pasta_dados: str = "dados", max_simultaneas: int = 4, motor: str = 'navegador',
+                        limite_produtos: Optional[int] = None, limite_lojas: Optional[int] = None,
+                        historico: bool = True, formato_saida: str = 'csv') -> str:
+    """
+    Descobre todas as lojas, coleta seus menus e grava tudo em um único arquivo.
+    
+    O arquivo é gravado em lotes conforme as lojas terminam, sem acumular o
+    crawl inteiro em memória.
+    
+    Args:
+        pasta_dados: Pasta onde salvar o arquivo
+        max_simultaneas: Número máximo de lojas em coleta ao mesmo tempo
+        motor: 'navegador', 'http' ou 'auto'
+        limite_produtos: Limite de produtos por loja (None = todos)
+        limite_lojas: Limite de lojas (None = todas)
+        historico: Se True, acrescenta a execução ao banco de histórico
+        formato_saida: 'csv', 'jsonl', 'sqlite' ou 'parquet' (ver config.saidas)
+    
+    Returns:
+        Caminho do arquivo salvo (vazio se nada foi coletado)
+    """
+    urls_menu = descobrir_lojas()
+    if limite_lojas:
+        urls_menu = urls_menu[:limite_lojas]
+    if not urls_menu:
+        log.error("❌ Nenhuma loja encontrada")
+        return ""
+    
+    inicio = time.perf_counter()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    caminho_arquivo = os.path.join(pasta_dados, f"dados_nutricionais_the_coffee_lojas_{timestamp}.{formato_saida}")
+    
+    saidas = [criar_saida(formato_saida, caminho_arquivo)]
+    if historico:
+        from config.historico import SaidaHistorico
+        saidas.append(SaidaHistorico(arquivo=caminho_arquivo))
+    
+    try:
+        total = consumir(coletar_lojas(urls_menu, max_simultaneas, motor, limite_produtos), saidas)
+    finally:
+        for saida in saidas:
+            saida.fechar()
+    registrar_saida(saidas[0], time.perf_counter() - inicio)
+    
+    log.info("🏪 %s produtos de %s lojas salvos em %s", total, len(urls_menu), caminho_arquivo)
+    return caminho_arquivo if total else ""
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import (URL_MENU_PADRAO, get_webdriver, encontrar_botoes_info, indexar_categorias,
+                           processar_produto)
+from config.esperas import Esperas
+from config.instrumentacao import Instrumentacao
+from config.urls import identificar_loja
+from config.log import obter_log, terminal_exibe
+
+log = obter_log(__name__)
+
+# Estratégias de divisão dos botões entre os workers
+ESTRATEGIAS_FATIA = ('indice', 'bloco', 'categoria')
+
+def selecionar_fatia(total: int, num_workers: int, id_worker: int, estrategia: str = 'indice',
+                     categorias: Optional[List[str]] = None) -> List[int]:
+    """
+    Retorna os índices dos produtos atribuídos a um worker.
+    
+    A divisão depende apenas do total de botões (e das categorias), então
+    todos os workers chegam à mesma partição sem precisar se comunicar.
+    
+    Args:
+        total: Número total de botões "info nutricional" na página
+        num_workers: Número de workers
+        id_worker: Índice do worker (0 a num_workers - 1)
+        estrategia: 'indice' (intercalado: 0, N, 2N...), 'bloco' (faixas contíguas)
+                    ou 'categoria' (categorias inteiras por worker)
+        categorias: Categoria de cada botão (obrigatório para 'categoria')
+    
+    Returns:
+        Lista de índices (base 0) dos botões que o worker deve processar
+    """
+    if estrategia == 'indice':
+        return list(range(id_worker, total, num_workers))
+    
+    if estrategia == 'bloco':
+        tamanho, resto = divmod(total, num_workers)
+        inicio = id_worker * tamanho + min(id_worker, resto)
+        fim = inicio + tamanho + (1 if id_worker < resto else 0)
+        return list(range(inicio, fim))
+    
+    if estrategia == 'categoria':
+        if categorias is None or len(categorias) != total:
+            raise ValueError("A estratégia 'categoria' precisa da categoria de cada botão")
+        
+        indices_por_categoria: Dict[str, List[int]] = {}
+        for indice, categoria in enumerate(categorias):
+            indices_por_categoria.setdefault(categoria, []).append(indice)
+        
+        # Distribui as maiores categorias primeiro para o worker menos carregado
+        carga = [0] * num_workers
+        atribuidos: List[List[int]] = [[] for _ in range(num_workers)]
+        ordem = sorted(indices_por_categoria.items(), key=lambda item: (-len(item[1]), item[0]))
+        for _, indices in ordem:
+            destino = min(range(num_workers), key=lambda worker: (carga[worker], worker))
+            carga[destino] += len(indices)
+            atribuidos[destino].extend(indices)
+        
+        return sorted(atribuidos[id_worker])
+    
+    raise ValueError(f"Estratégia de divisão desconhecida: {estrategia} (use {', '.join(ESTRATEGIAS_FATIA)})")
+
+def coletar_fatia(url: str, num_workers: int, id_worker: int, estrategia: str = 'indice',
+                  limite_produtos: Optional[int] = None,
+                  perfil_enxuto: Optional[bool] = None) -> Tuple[List[Tuple[int, Dict[str, str]]], Instrumentacao]:
+    """
+    Executa a coleta de uma fatia dos produtos em um navegador próprio.
+    
+    Roda dentro de um processo do pool; cada worker abre seu navegador,
+    carrega o menu e processa somente os botões da sua fatia, medindo os
+    comandos e as etapas como a coleta sequencial.
+    
+    Args:
+        url: URL do menu do The Coffee
+        num_workers: Número total de workers
+        id_worker: Índice deste worker
+        estrategia: Estratégia de divisão (ver selecionar_fatia)
+        limite_produtos: Limite global de produtos (None = todos)
+        perfil_enxuto: Bloqueia recursos pesados no navegador do worker
+    
+    Returns:
+        (lista de tuplas (índice do botão, dados do produto), medições do worker)
+    """
+    instrumentacao = Instrumentacao(identificar_loja(url))
+    driver = get_webdriver(perfil_enxuto=perfil_enxuto)
+    if not driver:
+        return [], instrumentacao
+    
+    resultados = []
+    instrumentacao.instrumentar(driver)
+    
+    try:
+        # Aguarda a página carregar e os botões aparecerem
+        with instrumentacao.etapa('pagina'):
+            driver.get(url)
+            esperas = Esperas(driver)
+            esperas.pagina_pronta()
+        
+        botoes_info = encontrar_botoes_info(driver)
+        if limite_produtos:
+            botoes_info = botoes_info[:limite_produtos]
+        
+        categorias = indexar_categorias(driver, botoes_info)
+        indices = selecionar_fatia(len(botoes_info), num_workers, id_worker, estrategia, categorias)
+        log.info("[worker %s] %s de %s produtos atribuídos", id_worker, len(indices), len(botoes_info))
+        
+        for posicao, indice in enumerate(indices, 1):
+            try:
+                log.info("[worker %s] Processando produto %s/%s (#%s)", id_worker, posicao, len(indices), indice + 1)
+                with instrumentacao.produto(indice):
+                    dados = processar_produto(driver, botoes_info[indice], esperas, categorias[indice],
+                                              instrumentacao=instrumentacao)
+                resultados.append((indice, dados))
+            except Exception as e:
+                log.error("[worker %s] Erro ao processar produto #%s: %s", id_worker, indice + 1, e)
+                continue
+    
+    except Exception as e:
+        log.error("[worker %s] Erro durante a coleta: %s", id_worker, e)
+    
+    finally:
+        instrumentacao.desinstrumentar()
+        driver.quit()
+    
+    return resultados, instrumentacao
+
+def mesclar_resultados(fatias: List[List[Tuple[int, Dict[str, str]]]]) -> List[Dict[str, str]]:
+    """
+    Junta as fatias dos workers em uma lista única, na ordem da página.
+    
+    Args:
+        fatias: Resultados de cada worker (tuplas índice, dados)
+    
+    Returns:
+        Lista de produtos ordenada pelo índice do botão, sem duplicatas
+    """
+    por_indice = {}
+    for fatia in fatias:
+        for indice, dados in fatia:
+            por_indice.setdefault(indice, dados)
+    
+    return [por_indice[indice] for indice in sorted(por_indice)]
+
+def coletar_produtos_paralelo(url: str = URL_MENU_PADRAO, limite_produtos: int = None,
+                              num_workers: Optional[int] = None, estrategia: str = 'indice',
+                              perfil_enxuto: Optional[bool] = None, pasta_dados: str = "dados") -> List[Dict[str, str]]:
+    """
+    Coleta os produtos dividindo os botões entre vários processos, cada um com seu navegador.
+    
+    As medições dos workers são somadas e exportadas como as da coleta
+    sequencial (config/instrumentacao.py).
+    
+    Args:
+        url: URL do menu do The Coffee
+        limite_produtos: Limite de produtos para coletar (None = todos)
+        num_workers: Número de processos (None = número de CPUs)
+        estrategia: 'indice', 'bloco' ou 'categoria' (ver selecionar_fatia)
+        perfil_enxuto: Bloqueia recursos pesados nos navegadores dos workers
+        pasta_dados: Pasta onde as métricas são exportadas
+    
+    Returns:
+        Lista de dicionários com dados dos produtos, na mesma ordem da coleta sequencial
+    """
+    if estrategia not in ESTRATEGIAS_FATIA:
+        raise ValueError(f"Estratégia de divisão desconhecida: {estrategia} (use {', '.join(ESTRATEGIAS_FATIA)})")
+    
+    num_workers = max(1, num_workers or os.cpu_count() or 1)
+    if limite_produtos:
+        num_workers = min(num_workers, limite_produtos)
+    
+    log.info("⚡ Coleta paralela: %s workers, divisão por '%s'", num_workers, estrategia)
+    
+    fatias = []
+    instrumentacao = Instrumentacao(identificar_loja(url))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futuros = {
+            executor.submit(coletar_fatia, url, num_workers, id_worker, estrategia, limite_produtos, perfil_enxuto): id_worker
+            for id_worker in range(num_workers)
+        }
+        for futuro in as_completed(futuros):
+            id_worker = futuros[futuro]
+            try:
+                fatia, medicoes = futuro.result()
+                instrumentacao.mesclar(medicoes)
+                log.info("✅ Worker %s concluído: %s produtos", id_worker, len(fatia))
+                fatias.append(fatia)
+            except Exception as e:
+                log.error("❌ Worker %s falhou: %s", id_worker, e)
+    
+    if terminal_exibe() and instrumentacao.produtos:
+        instrumentacao.imprimir_resumo()
+    try:
+        instrumentacao.exportar(pasta_dados)
+    except OSError as e:
+        log.warning("⚠️  Não foi possível salvar as métricas: %s", e)
+    
+    return mesclar_resultados(fatias)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import get_webdriver
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Script que limpa o estado da página atual antes de navegar para about:blank
+SCRIPT_LIMPAR_ARMAZENAMENTO = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+class PoolSessoes:
+    """
+    Pool de sessões do WebDriver já iniciadas, reaproveitadas entre coletas.
+    
+    Cada sessão devolvida tem cookies, armazenamento e janelas extras limpos
+    antes de ser entregue de novo. O pool nunca mantém mais que max_sessoes
+    navegadores abertos ao mesmo tempo.
+    """
+    
+    def __init__(self, max_sessoes: int = 1, fabrica: Optional[Callable] = None):
+        """
+        Args:
+            max_sessoes: Número máximo de navegadores abertos pelo pool
+            fabrica: Função que cria um WebDriver (padrão: get_webdriver)
+        """
+        self.max_sessoes = max(1, max_sessoes)
+        self._fabrica = fabrica or get_webdriver
+        self._livres: List = []
+        self._total = 0
+        self._aquecendo = 0
+        self._threads: List[threading.Thread] = []
+        self._condicao = threading.Condition()
+        self._encerrado = False
+    
+    def adquirir(self, timeout: Optional[float] = None):
+        """
+        Retorna um WebDriver pronto para uso, criando um novo se houver espaço no pool.
+        
+        Args:
+            timeout: Tempo máximo de espera por uma sessão livre (None = sem limite)
+        
+        Returns:
+            Instância do WebDriver ou None se não for possível obter uma sessão
+        """
+        while True:
+            with self._condicao:
+                # Espera uma sessão livre; se houver pré-aquecimento em andamento,
+                # aguarda por ele em vez de abrir outro navegador
+                while not self._livres and (self._aquecendo or self._total >= self.max_sessoes):
+                    if self._encerrado or not self._condicao.wait(timeout):
+                        return None
+                
+                if self._livres:
+                    driver = self._livres.pop()
+                else:
+                    self._total += 1
+                    driver = None
+            
+            if driver is None:
+                return self._criar_sessao()
+            
+            if self._sessao_ativa(driver):
+                return driver
+            
+            # Sessão morreu enquanto estava livre: descarta e tenta outra
+            self.descartar(driver)
+    
+    def devolver(self, driver) -> None:
+        """
+        Devolve um WebDriver ao pool, limpando seu estado para o próximo uso.
+        
+        Args:
+            driver: Instância obtida por adquirir()
+        """
+        if driver is None:
+            return
+        
+        if self._encerrado or not self._resetar_sessao(driver):
+            self.descartar(driver)
+            return
+        
+        with self._condicao:
+            self._livres.append(driver)
+            self._condicao.notify()
+    
+    def descartar(self, driver) -> None:
+        """
+        Fecha um WebDriver e libera sua vaga no pool.
+        
+        Args:
+            driver: Instância a ser descartada
+        """
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        
+        with self._condicao:
+            self._total = max(0, self._total - 1)
+            self._condicao.notify()
+    
+    @contextmanager
+    def sessao(self, timeout: Optional[float] = None):
+        """
+        Context manager que adquire uma sessão e a devolve ao final.
+        
+        Args:
+            timeout: Tempo máximo de espera por uma sessão livre
+        """
+        driver = self.adquirir(timeout)
+        try:
+            yield driver
+        finally:
+            self.devolver(driver)
+    
+    def pre_aquecer(self, quantidade: int = 1) -> None:
+        """
+        Inicia sessões em segundo plano para que a próxima coleta comece imediatamente.
+        
+        Args:
+            quantidade: Número de sessões a iniciar (limitado por max_sessoes)
+        """
+        with self._condicao:
+            vagas = self.max_sessoes - self._total
+            quantidade = min(quantidade, vagas)
+            self._total += max(0, quantidade)
+            self._aquecendo += max(0, quantidade)
+        
+        for _ in range(quantidade):
+            thread = threading.Thread(target=self._aquecer, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def encerrar(self) -> None:
+        """Fecha todas as sessões livres e impede novos usos do pool"""
+        with self._condicao:
+            self._encerrado = True
+            self._condicao.notify_all()
+        
+        for thread in self._threads:
+            thread.join()
+        
+        with self._condicao:
+            livres, self._livres = self._livres, []
+        
+        for driver in livres:
+            self.descartar(driver)
+    
+    def _aquecer(self) -> None:
+        """Cria uma sessão em segundo plano e a disponibiliza no pool"""
+        driver = None
+        try:
+            driver = self._fabrica()
+        except Exception as e:
+            log.error("Erro ao pré-aquecer sessão do WebDriver: %s", e)
+        
+        with self._condicao:
+            self._aquecendo -= 1
+            if driver is None:
+                self._total -= 1
+            elif not self._encerrado:
+                self._livres.append(driver)
+                driver = None
+            self._condicao.notify_all()
+        
+        # Pool encerrado durante o pré-aquecimento
+        if driver is not None:
+            self.descartar(driver)
+    
+    def _criar_sessao(self):
+        """Cria uma nova sessão, liberando a vaga reservada em caso de falha"""
+        driver = None
+        try:
+            driver = self._fabrica()
+        except Exception as e:
+            log.error("Erro ao criar sessão do WebDriver: %s", e)
+        
+        if driver is None:
+            with self._condicao:
+                self._total -= 1
+                self._condicao.notify()
+        
+        return driver
+    
+    @staticmethod
+    def _sessao_ativa(driver) -> bool:
+        """Verifica se o navegador da sessão ainda responde"""
+        try:
+            _ = driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _resetar_sessao(driver) -> bool:
+        """
+        Limpa cookies, armazenamento e janelas/popups abertos de uma sessão.
+        
+        Returns:
+            True se a sessão pode ser reaproveitada
+        """
+        try:
+            # Fecha janelas extras abertas pelo site
+            janelas = driver.window_handles
+            for janela in janelas[1:]:
+                driver.switch_to.window(janela)
+                driver.close()
+            driver.switch_to.window(janelas[0])
+            
+            driver.execute_script(SCRIPT_LIMPAR_ARMAZENAMENTO)
+            driver.delete_all_cookies()
+            
+            # Chrome/Edge: limpa cookies de todos os domínios, não só do atual
+            if hasattr(driver, 'execute_cdp_cmd'):
+                try:
+                    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                except Exception:
+                    pass
+            
+            # Sair da página descarta popups e modais abertos
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            log.warning("Sessão descartada ao limpar estado: %s", e)
+            return False
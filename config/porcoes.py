@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+# numpy e pandas só são carregados em aplicar_porcoes: as constantes e
+# interpretar_porcao são usadas também por quem não monta DataFrames
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Capacidade de cada recipiente, usada quando o texto da porção não traz a quantidade
+CAPACIDADES = {
+    'copo grande': (330.0, 'ml'),
+    'copo médio': (220.0, 'ml'),
+    'copo pequeno': (180.0, 'ml'),
+    'unidade': (50.0, 'g'),
+    'fatia': (60.0, 'g'),
+}
+
+# Colunas de nutrientes (valores por 100g/100ml) que ganham uma versão por porção
+COLUNAS_NUTRIENTES = (
+    'CALORIAS (kcal)', 'CARBOIDRATOS (g)', 'PROTEINAS (g)', 'GORDURAS_TOTAIS (g)',
+    'GORDURAS_SATURADAS (g)', 'GORDURAS_TRANS (g)', 'FIBRAS (g)', 'ACUCARES (g)', 'SODIO (mg)',
+)
+
+# Fator de conversão para g/ml de cada unidade aceita
+FATORES_UNIDADE = {'g': (1.0, 'g'), 'kg': (1000.0, 'g'), 'ml': (1.0, 'ml'), 'l': (1000.0, 'ml')}
+
+REGEX_QUANTIDADE_PORCAO = re.compile(r'(\d+(?:[.,]\d+)?)\s*(kg|ml|g|l)\b', re.IGNORECASE)
+REGEX_FRACAO = re.compile(r'^\s*(\d+)\s*/\s*(\d+)')
+REGEX_INTEIRO = re.compile(r'^\s*(\d+(?:[.,]\d+)?)(?![\d.,])(?!\s*(?:kg|ml|g|l)\b)', re.IGNORECASE)
+REGEX_PARENTESES = re.compile(r'\([^)]*\)')
+REGEX_CONECTIVO = re.compile(r'^(?:de|da|do)\s+', re.IGNORECASE)
+
+class Porcao(NamedTuple):
+    """Porção interpretada a partir do texto do popup"""
+    texto: str                  # texto normalizado, com a quantidade entre parênteses
+    fracao: Optional[float]     # ex: 0.5 para "1/2 copo médio"
+    recipiente: str             # ex: 'copo médio', 'unidade' ('' se desconhecido)
+    quantidade: Optional[float] # quantidade em g ou ml
+    unidade: str                # 'g', 'ml' ou ''
+
+def coluna_por_porcao(coluna: str) -> str:
+    """Nome da coluna por porção de um nutriente (ex: 'CALORIAS (kcal)' → 'CALORIAS_PORCAO (kcal)')"""
+    nome, _, unidade = coluna.partition(' ')
+    return f"{nome}_PORCAO {unidade}".strip()
+
+@lru_cache(maxsize=None)
+def interpretar_porcao(texto: str) -> Porcao:
+    """
+    Interpreta o texto de uma porção, como "1/2 copo médio (160ml)" ou "3/4 de unidade".
+    
+    A quantidade escrita no texto tem prioridade; sem ela, é calculada pela
+    fração e pela capacidade do recipiente (CAPACIDADES). O resultado é
+    memorizado por texto distinto.
+    
+    Args:
+        texto: Texto da coluna PORCAO (g)
+    
+    Returns:
+        Porcao com fração, recipiente, quantidade e unidade
+    """
+    original = ' '.join(str(texto).split())
+    
+    fracao = None
+    resto = original
+    match = REGEX_FRACAO.match(resto)
+    if match and int(match.group(2)):
+        fracao = int(match.group(1)) / int(match.group(2))
+        resto = resto[match.end():]
+    else:
+        match = REGEX_INTEIRO.match(resto)
+        if match:
+            fracao = float(match.group(1).replace(',', '.'))
+            resto = resto[match.end():]
+    
+    recipiente = REGEX_CONECTIVO.sub('', REGEX_PARENTESES.sub('', resto).strip()).strip().lower()
+    recipiente = recipiente if recipiente in CAPACIDADES else ''
+    
+    quantidade, unidade = None, ''
+    match = REGEX_QUANTIDADE_PORCAO.search(original)
+    if match:
+        fator, unidade = FATORES_UNIDADE[match.group(2).lower()]
+        quantidade = float(match.group(1).replace(',', '.')) * fator
+    elif recipiente and fracao:
+        capacidade, unidade = CAPACIDADES[recipiente]
+        quantidade = float(round(fracao * capacidade))
+        original = f"{original} ({quantidade:g}{unidade})"
+    
+    if quantidade == 0:
+        quantidade, unidade = None, ''
+    
+    return Porcao(original, fracao, recipiente, quantidade, unidade)
+
+def aplicar_porcoes(df: pd.DataFrame, coluna: str = 'PORCAO (g)') -> pd.DataFrame:
+    """
+    Interpreta a coluna de porções e adiciona os valores nutricionais por porção.
+    
+    Cada texto distinto é interpretado uma única vez e o resultado é
+    espalhado para todas as linhas por índice, então o custo depende do
+    número de porções distintas e não do número de linhas.
+    
+    Adiciona PORCAO_FRACAO, PORCAO_RECIPIENTE, PORCAO_QUANTIDADE e
+    PORCAO_UNIDADE, além de uma coluna por porção para cada nutriente
+    presente (ex: CALORIAS_PORCAO (kcal)), vazia quando a quantidade é
+    desconhecida.
+    
+    Args:
+        df: DataFrame com a coluna de porções
+        coluna: Nome da coluna de porções
+    
+    Returns:
+        O próprio DataFrame, com a coluna de porções normalizada
+    """
+    import numpy as np
+    import pandas as pd
+    
+    codigos, distintos = pd.factorize(df[coluna].fillna('').astype(str))
+    porcoes = [interpretar_porcao(texto) for texto in distintos]
+    
+    df[coluna] = np.array([porcao.texto for porcao in porcoes], dtype=object)[codigos]
+    df['PORCAO_FRACAO'] = np.array([porcao.fracao for porcao in porcoes], dtype=float)[codigos]
+    df['PORCAO_RECIPIENTE'] = np.array([porcao.recipiente for porcao in porcoes], dtype=object)[codigos]
+    df['PORCAO_QUANTIDADE'] = np.array([porcao.quantidade for porcao in porcoes], dtype=float)[codigos]
+    df['PORCAO_UNIDADE'] = np.array([porcao.unidade for porcao in porcoes], dtype=object)[codigos]
+    
+    # Valores da tabela são por 100g/100ml
+    fator = df['PORCAO_QUANTIDADE'] / 100
+    for nutriente in COLUNAS_NUTRIENTES:
+        if nutriente in df.columns:
+            df[coluna_por_porcao(nutriente)] = (pd.to_numeric(df[nutriente], errors='coerce') * fator).round(2)
+    
+    return df
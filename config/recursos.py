@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+from typing import Dict, Iterable, List, Optional
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.browser import CACHE_NAVEGADOR, load_browser_cache, save_browser_cache
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Medições de recursos por URL, usadas para calcular a economia do perfil enxuto
+CACHE_RECURSOS = os.path.join(os.path.dirname(CACHE_NAVEGADOR), 'recursos.json')
+
+# Padrões de URL bloqueados por tipo de recurso (sintaxe de Network.setBlockedURLs)
+PADROES_BLOQUEIO = {
+    'imagens': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+                '*/_next/image*'],
+    'midia': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.m3u8', '*.mov'],
+    'fontes': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*',
+               '*fonts.gstatic.com*'],
+    'rastreadores': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                     '*connect.facebook.net*', '*facebook.com/tr*', '*hotjar.com*',
+                     '*clarity.ms*', '*analytics.tiktok.com*', '*segment.io*'],
+}
+
+# Tipos bloqueados quando o perfil enxuto é ativado sem especificar tipos
+TIPOS_PADRAO = ('imagens', 'midia', 'fontes', 'rastreadores')
+
+# Preferências do Firefox equivalentes a cada tipo de recurso
+PREFERENCIAS_FIREFOX = {
+    'imagens': {'permissions.default.image': 2},
+    'midia': {'media.autoplay.default': 5, 'media.autoplay.blocking_policy': 2},
+    'fontes': {'gfx.downloadable_fonts.enabled': False, 'browser.display.use_document_fonts': 0},
+    'rastreadores': {'privacy.trackingprotection.enabled': True,
+                     'privacy.trackingprotection.socialtracking.enabled': True,
+                     'privacy.trackingprotection.cryptomining.enabled': True},
+}
+
+# Soma requisições e bytes transferidos pela página via Resource Timing
+SCRIPT_MEDIR_RECURSOS = """
+const entradas = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const entrada of entradas) {
+    bytes += entrada.transferSize || entrada.encodedBodySize || 0;
+}
+return {requisicoes: entradas.length, bytes: bytes};
+"""
+
+# Aumenta o buffer do Resource Timing (padrão: 250 entradas) em cada documento novo
+SCRIPT_BUFFER_RECURSOS = "performance.setResourceTimingBufferSize(10000);"
+
+def is_perfil_enxuto() -> bool:
+    """
+    Indica se o perfil enxuto foi ativado pela variável THE_COFFEE_PERFIL_ENXUTO.
+    
+    Returns:
+        True se recursos pesados devem ser bloqueados por padrão
+    """
+    return os.environ.get('THE_COFFEE_PERFIL_ENXUTO', '').lower() in ('1', 'true', 'sim', 'yes')
+
+def padroes_bloqueio(tipos: Optional[Iterable[str]] = None, extras: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Monta a lista de padrões de URL a bloquear.
+    
+    Args:
+        tipos: Tipos de recurso (chaves de PADROES_BLOQUEIO); None = TIPOS_PADRAO
+        extras: Padrões adicionais (ex: '*cdn.exemplo.com/banner*')
+    
+    Returns:
+        Lista de padrões sem duplicatas
+    """
+    padroes = []
+    for tipo in (tipos or TIPOS_PADRAO):
+        if tipo not in PADROES_BLOQUEIO:
+            raise ValueError(f"Tipo de recurso desconhecido: {tipo} (use {', '.join(PADROES_BLOQUEIO)})")
+        padroes.extend(PADROES_BLOQUEIO[tipo])
+    padroes.extend(extras or [])
+    return list(dict.fromkeys(padroes))
+
+def configurar_opcoes_chromium(opcoes, tipos: Optional[Iterable[str]] = None) -> None:
+    """
+    Ajusta as opções de Chrome/Chromium/Edge para o perfil enxuto.
+    
+    Args:
+        opcoes: Options do Chrome ou do Edge
+        tipos: Tipos de recurso bloqueados
+    """
+    tipos = tuple(tipos or TIPOS_PADRAO)
+    if 'imagens' in tipos:
+        opcoes.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        opcoes.add_argument("--blink-settings=imagesEnabled=false")
+    if 'midia' in tipos:
+        opcoes.add_argument("--autoplay-policy=user-gesture-required")
+    
+    # Log de performance só com eventos de rede, para contar as requisições bloqueadas;
+    # drenado a cada produto por drenar_bloqueadas para não acumular no chromedriver
+    opcoes.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    opcoes.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+def ativar_bloqueio_cdp(driver, tipos: Optional[Iterable[str]] = None, extras: Optional[Iterable[str]] = None) -> None:
+    """
+    Bloqueia recursos por padrão de URL via CDP (Chrome/Chromium/Edge).
+    
+    Args:
+        driver: WebDriver do Chrome ou do Edge
+        tipos: Tipos de recurso bloqueados
+        extras: Padrões de URL adicionais
+    """
+    padroes = padroes_bloqueio(tipos, extras)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': padroes})
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': SCRIPT_BUFFER_RECURSOS})
+    driver.tipos_bloqueados = tuple(tipos or TIPOS_PADRAO)
+    log.info("🪶 Perfil enxuto ativo: %s padrões de URL bloqueados", len(padroes))
+
+def configurar_preferencias_firefox(opcoes, tipos: Optional[Iterable[str]] = None) -> None:
+    """
+    Ajusta as preferências do Firefox para o perfil enxuto.
+    
+    Args:
+        opcoes: Options do Firefox
+        tipos: Tipos de recurso bloqueados
+    """
+    for tipo in (tipos or TIPOS_PADRAO):
+        for preferencia, valor in PREFERENCIAS_FIREFOX.get(tipo, {}).items():
+            opcoes.set_preference(preferencia, valor)
+
+def drenar_bloqueadas(driver, zerar: bool = False) -> None:
+    """
+    Esvazia o log de performance do navegador, acumulando as requisições bloqueadas.
+    
+    O chromedriver guarda os eventos até serem lidos; drenar após cada etapa da
+    coleta mantém o buffer limitado aos eventos de um produto. A contagem fica em
+    driver.requisicoes_bloqueadas (None se o log não estiver disponível).
+    
+    Args:
+        driver: WebDriver do Chrome ou do Edge com o perfil enxuto
+        zerar: Se True, descarta os eventos pendentes e reinicia a contagem
+    """
+    if not getattr(driver, 'tipos_bloqueados', None):
+        return
+    try:
+        entradas = driver.get_log('performance')
+    except Exception:
+        driver.requisicoes_bloqueadas = None
+        return
+    if zerar:
+        driver.requisicoes_bloqueadas = 0
+        return
+    if getattr(driver, 'requisicoes_bloqueadas', 0) is None:
+        return
+    
+    bloqueadas = 0
+    for entrada in entradas:
+        try:
+            mensagem = json.loads(entrada['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        if mensagem.get('method') == 'Network.loadingFailed' and mensagem.get('params', {}).get('blockedReason'):
+            bloqueadas += 1
+    driver.requisicoes_bloqueadas = getattr(driver, 'requisicoes_bloqueadas', 0) + bloqueadas
+
+def medir_recursos(driver, url: str) -> Dict:
+    """
+    Mede as requisições e os bytes da execução e calcula a economia do perfil enxuto.
+    
+    A economia é a diferença para a última medição sem bloqueio da mesma URL,
+    guardada em CACHE_RECURSOS. Bytes de recursos de outros domínios sem
+    Timing-Allow-Origin não são reportados pelo navegador, então os valores
+    são estimativas.
+    
+    Args:
+        driver: WebDriver ainda na página do menu
+        url: URL do menu (chave da medição de referência)
+    
+    Returns:
+        Dicionário com 'perfil', 'requisicoes', 'bytes', 'bloqueadas',
+        'requisicoes_economizadas' e 'bytes_economizados'
+    """
+    tipos = getattr(driver, 'tipos_bloqueados', None)
+    perfil = 'enxuto' if tipos else 'completo'
+    
+    try:
+        medicao = driver.execute_script(SCRIPT_MEDIR_RECURSOS) or {}
+    except Exception as e:
+        log.error("Erro ao medir recursos da página: %s", e)
+        medicao = {}
+    
+    if tipos:
+        drenar_bloqueadas(driver)
+    relatorio = {
+        'perfil': perfil,
+        'requisicoes': int(medicao.get('requisicoes', 0)),
+        'bytes': int(medicao.get('bytes', 0)),
+        'bloqueadas': getattr(driver, 'requisicoes_bloqueadas', None) if tipos else 0,
+        'requisicoes_economizadas': None,
+        'bytes_economizados': None,
+    }
+    
+    referencias = load_browser_cache(CACHE_RECURSOS)
+    if perfil == 'completo':
+        referencias[url] = {'requisicoes': relatorio['requisicoes'], 'bytes': relatorio['bytes']}
+        save_browser_cache(referencias, CACHE_RECURSOS)
+    elif url in referencias:
+        relatorio['requisicoes_economizadas'] = referencias[url]['requisicoes'] - relatorio['requisicoes']
+        relatorio['bytes_economizados'] = referencias[url]['bytes'] - relatorio['bytes']
+    
+    return relatorio
+
+def imprimir_relatorio_recursos(relatorio: Dict) -> None:
+    """Exibe o relatório de recursos de uma execução"""
+    log.info("\n📦 RECURSOS DA PÁGINA (perfil %s):", relatorio['perfil'])
+    log.info("   • Requisições: %s", relatorio['requisicoes'])
+    log.info("   • Transferido: %.1f KB", relatorio['bytes'] / 1024)
+    if relatorio['perfil'] == 'enxuto':
+        if relatorio['bloqueadas'] is not None:
+            log.info("   • Requisições bloqueadas: %s", relatorio['bloqueadas'])
+        if relatorio['bytes_economizados'] is not None:
+            log.info("   • Economia vs. perfil completo: %s requisições, %.1f KB",
+                     relatorio['requisicoes_economizadas'], relatorio['bytes_economizados'] / 1024)
+        else:
+            log.info("   • Economia: sem medição de referência (execute uma vez sem o perfil enxuto)")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import re
+import csv
+import gzip
+import json
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.catalogo import Catalogo, ler_registros
+from config.log import obter_log
+
+log = obter_log(__name__)
+
+# Arquivo com o histórico dos snapshots expirados, dentro da pasta de dados
+ARQUIVO_COMPACTADO = "arquivo_snapshots.jsonl.gz"
+
+# Política padrão: últimos N snapshots, o mais recente de cada uma das últimas
+# semanas e o mais recente de cada um dos últimos meses
+MANTER_ULTIMOS = 7
+MANTER_SEMANAS = 4
+MANTER_MESES = 12
+
+# Colunas que identificam um produto entre snapshots
+COLUNAS_CHAVE = ('LOJA', 'URL', 'NOME_PRODUTO')
+
+# Colunas derivadas do nome do snapshot, que mudariam a cada execução
+COLUNAS_IGNORADAS = ('DATA_COLETA',)
+
+REGEX_DATA_SNAPSHOT = re.compile(r'_(\d{8}_\d{6})\.[a-z]+$')
+
+class Plano(NamedTuple):
+    """Resultado da política de retenção: snapshots mantidos e expirados (mais recentes primeiro)"""
+    mantidos: List[str]
+    expirados: List[str]
+
+def data_snapshot(nome: str) -> datetime:
+    """Momento da coleta pelo timestamp no nome do arquivo"""
+    encontrado = REGEX_DATA_SNAPSHOT.search(nome)
+    if not encontrado:
+        raise ValueError(f"Nome de snapshot sem timestamp: {nome}")
+    return datetime.strptime(encontrado.group(1), "%Y%m%d_%H%M%S")
+
+def grupo_snapshot(nome: str) -> str:
+    """
+    Grupo de retenção de um snapshot: conjunto de lojas e formato.
+    
+    Coletas de todas as lojas ('_lojas_' no nome) e de uma loja, e formatos
+    diferentes, são séries independentes: cada uma tem sua própria política
+    de retenção e sua própria cadeia de diferenças no arquivo compactado.
+    
+    Returns:
+        Ex: 'loja.csv' ou 'lojas.parquet'
+    """
+    lojas = 'lojas' if '_lojas_' in nome else 'loja'
+    return f"{lojas}{os.path.splitext(nome)[1]}"
+
+def planejar_retencao(nomes: List[str], ultimos: int = MANTER_ULTIMOS, semanas: int = MANTER_SEMANAS,
+                      meses: int = MANTER_MESES) -> Plano:
+    """
+    Aplica a política de retenção a uma lista de snapshots.
+    
+    Um snapshot é mantido se estiver entre os `ultimos` mais recentes, se for
+    o mais recente de uma das `semanas` semanas mais recentes com coleta ou o
+    mais recente de um dos `meses` meses mais recentes com coleta.
+    
+    Args:
+        nomes: Nomes dos snapshots (com timestamp no nome)
+        ultimos: Snapshots mais recentes mantidos
+        semanas: Semanas (ISO) com um snapshot mantido
+        meses: Meses com um snapshot mantido
+    
+    Returns:
+        Plano com os snapshots mantidos e expirados
+    """
+    ordenados = sorted(nomes, key=data_snapshot, reverse=True)
+    manter = set(ordenados[:max(0, ultimos)])
+    
+    for periodo, limite in ((lambda data: data.isocalendar()[:2], semanas), (lambda data: (data.year, data.month), meses)):
+        vistos = set()
+        for nome in ordenados:
+            chave = periodo(data_snapshot(nome))
+            if chave in vistos:
+                continue
+            if len(vistos) >= limite:
+                break
+            vistos.add(chave)
+            manter.add(nome)
+    
+    return Plano([nome for nome in ordenados if nome in manter], [nome for nome in ordenados if nome not in manter])
+
+def _chaves(registros: List[Dict]) -> List[Tuple]:
+    """Chave de cada registro; repetições do mesmo produto são numeradas"""
+    ocorrencias: Dict[Tuple, int] = {}
+    chaves = []
+    for registro in registros:
+        chave = tuple(str(registro.get(coluna) or '') for coluna in COLUNAS_CHAVE)
+        ocorrencias[chave] = ocorrencias.get(chave, 0) + 1
+        chaves.append(chave + (ocorrencias[chave],))
+    return chaves
+
+def ler_arquivo_compactado(caminho: str) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Reconstrói os snapshots guardados no arquivo compactado.
+    
+    Args:
+        caminho: Arquivo .jsonl.gz gerado por compactar
+    
+    Yields:
+        (nome do snapshot, registros), do mais antigo ao mais recente
+    """
+    # Estado de cada cadeia de diferenças (arquivos antigos têm uma só, sem 'cadeia')
+    cadeias: Dict[str, Dict[Tuple, Dict]] = {}
+    estado: Dict[Tuple, Dict] = {}
+    atual = None
+    with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            item = json.loads(linha)
+            if 'snapshot' in item:
+                if atual is not None:
+                    yield atual['snapshot'], [{coluna: registro.get(coluna, '') for coluna in atual['colunas']}
+                                              for registro in estado.values()]
+                atual = item
+                estado = cadeias.setdefault(item.get('cadeia', ''), {})
+            elif '+' in item:
+                estado[tuple(item['k'])] = item['+']
+            elif '-' in item:
+                estado.pop(tuple(item['-']), None)
+    if atual is not None:
+        yield atual['snapshot'], [{coluna: registro.get(coluna, '') for coluna in atual['colunas']}
+                                  for registro in estado.values()]
+
+def _gravar_compactado(caminho: str, snapshots: List[Tuple[str, List[Dict]]]) -> Tuple[int, int]:
+    """
+    Grava os snapshots (do mais antigo ao mais recente) como diferenças sucessivas.
+    
+    Cada snapshot ocupa uma linha de cabeçalho seguida apenas dos registros
+    novos ou alterados ('+') e das chaves que deixaram de existir ('-') em
+    relação ao snapshot anterior do mesmo grupo (ver grupo_snapshot).
+    
+    Returns:
+        (registros nos snapshots, linhas de diferença gravadas)
+    """
+    temporario = caminho + '.part'
+    anteriores: Dict[str, Dict[Tuple, Dict]] = {}
+    total = diferencas = 0
+    try:
+        with gzip.open(temporario, 'wt', encoding='utf-8', compresslevel=9) as arquivo:
+            for nome, registros in snapshots:
+                registros = [{coluna: valor for coluna, valor in registro.items() if coluna not in COLUNAS_IGNORADAS}
+                             for registro in registros]
+                colunas = list(dict.fromkeys(coluna for registro in registros for coluna in registro))
+                cadeia = grupo_snapshot(nome)
+                arquivo.write(json.dumps({'snapshot': nome, 'cadeia': cadeia, 'colunas': colunas,
+                                          'linhas': len(registros)}, ensure_ascii=False) + '\n')
+                anterior = anteriores.get(cadeia, {})
+                atual = dict(zip(_chaves(registros), registros))
+                for chave, registro in atual.items():
+                    if anterior.get(chave) != registro:
+                        arquivo.write(json.dumps({'k': chave, '+': registro}, ensure_ascii=False, default=str) + '\n')
+                        diferencas += 1
+                for chave in anterior.keys() - atual.keys():
+                    arquivo.write(json.dumps({'-': chave}, ensure_ascii=False) + '\n')
+                    diferencas += 1
+                anteriores[cadeia] = atual
+                total += len(registros)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return total, diferencas
+
+def compactar(pasta_dados: str = "dados", ultimos: int = MANTER_ULTIMOS, semanas: int = MANTER_SEMANAS,
+              meses: int = MANTER_MESES, simular: bool = False) -> Plano:
+    """
+    Move os snapshots expirados pela política de retenção para o arquivo compactado.
+    
+    A política é aplicada a cada grupo (ver grupo_snapshot) separadamente;
+    arquivos sem timestamp no nome são mantidos. O arquivo é regravado com
+    os snapshots que já continha mais os expirados, em ordem cronológica; os
+    originais só são apagados depois que o novo arquivo foi gravado e relido
+    com sucesso.
+    
+    Args:
+        pasta_dados: Pasta dos snapshots
+        ultimos, semanas, meses: Política de retenção (ver planejar_retencao)
+        simular: Se True, só calcula e exibe o plano
+    
+    Returns:
+        Plano aplicado
+    """
+    catalogo = Catalogo(pasta_dados)
+    entradas = {entrada['arquivo']: entrada for entrada in catalogo.reconciliar()}
+    
+    grupos: Dict[str, List[str]] = {}
+    sem_data = []
+    for nome in entradas:
+        if REGEX_DATA_SNAPSHOT.search(nome):
+            grupos.setdefault(grupo_snapshot(nome), []).append(nome)
+        else:
+            log.warning("⚠️  %s sem timestamp no nome: fora da política de retenção", nome)
+            sem_data.append(nome)
+    
+    mantidos, expirados = [], []
+    for nomes in grupos.values():
+        plano_grupo = planejar_retencao(nomes, ultimos, semanas, meses)
+        mantidos.extend(plano_grupo.mantidos)
+        expirados.extend(plano_grupo.expirados)
+    plano = Plano(sorted(mantidos, key=data_snapshot, reverse=True) + sem_data,
+                  sorted(expirados, key=data_snapshot, reverse=True))
+    
+    log.info("🗂️  %s snapshots mantidos, %s expirados", len(plano.mantidos), len(plano.expirados))
+    if simular or not plano.expirados:
+        return plano
+    
+    caminho = os.path.join(pasta_dados, ARQUIVO_COMPACTADO)
+    tamanho_antes = sum(entradas[nome]['tamanho'] for nome in plano.expirados)
+    anteriores = []
+    if os.path.exists(caminho):
+        tamanho_antes += os.path.getsize(caminho)
+        # Um snapshot restaurado e expirado de novo substitui a versão já arquivada
+        anteriores = [item for item in ler_arquivo_compactado(caminho) if item[0] not in plano.expirados]
+    
+    novos = [(nome, list(ler_registros(os.path.join(pasta_dados, nome)))) for nome in plano.expirados]
+    snapshots = sorted(anteriores + novos, key=lambda item: data_snapshot(item[0]))
+    total, diferencas = _gravar_compactado(caminho, snapshots)
+    
+    # Confere o arquivo antes de apagar os originais
+    contagens = {nome: len(registros) for nome, registros in ler_arquivo_compactado(caminho)}
+    for nome, registros in novos:
+        if contagens.get(nome) != len(registros):
+            raise RuntimeError(f"Arquivo compactado inconsistente para {nome}; nenhum snapshot foi apagado")
+    
+    for nome in plano.expirados:
+        os.remove(os.path.join(pasta_dados, nome))
+    catalogo.marcar_compactados(plano.expirados, ARQUIVO_COMPACTADO)
+    
+    tamanho_depois = os.path.getsize(caminho)
+    log.info("🗜️  %s snapshots em %s: %s de %s registros gravados (%.1f KB → %.1f KB)",
+             len(snapshots), caminho, diferencas, total, tamanho_antes / 1024, tamanho_depois / 1024)
+    return plano
+
+def _gravar_registros(destino: str, registros: List[Dict], data_coleta: datetime) -> None:
+    """Grava os registros no formato indicado pela extensão do destino, como as saídas de config/saidas.py"""
+    extensao = os.path.splitext(destino)[1]
+    colunas = list(dict.fromkeys(coluna for registro in registros for coluna in registro))
+    if extensao == '.csv':
+        with open(destino, 'w', encoding='utf-8-sig', newline='') as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+            escritor.writeheader()
+            escritor.writerows(registros)
+    elif extensao == '.jsonl':
+        with open(destino, 'w', encoding='utf-8') as arquivo:
+            for registro in registros:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+    elif extensao == '.sqlite':
+        import sqlite3
+        import pandas as pd
+        if os.path.exists(destino):
+            os.remove(destino)
+        conexao = sqlite3.connect(destino)
+        try:
+            with conexao:
+                pd.DataFrame(registros, columns=colunas).to_sql('produtos', conexao, index=False)
+        finally:
+            conexao.close()
+    elif extensao == '.parquet':
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from config.saidas import esquema_arrow
+        # DATA_COLETA não é guardada no arquivo compactado: vem do nome do snapshot
+        esquema = esquema_arrow(colunas)
+        df = pd.DataFrame(registros, columns=colunas)
+        for coluna in colunas:
+            if pa.types.is_floating(esquema.field(coluna).type):
+                df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+        df['DATA_COLETA'] = pd.Timestamp(data_coleta)
+        pq.write_table(pa.Table.from_pandas(df, schema=esquema, preserve_index=False), destino, compression='zstd')
+    else:
+        raise ValueError(f"Formato de destino desconhecido: {destino}")
+
+def restaurar_snapshot(nome: str, pasta_dados: str = "dados", destino: Optional[str] = None) -> str:
+    """
+    Regrava um snapshot do arquivo compactado com o nome e o formato originais.
+    
+    Args:
+        nome: Nome original do snapshot
+        pasta_dados: Pasta do arquivo compactado
+        destino: Arquivo de saída, no formato da sua extensão (padrão: <pasta_dados>/<nome>)
+    
+    Returns:
+        Caminho do arquivo gravado
+    """
+    for snapshot, registros in ler_arquivo_compactado(os.path.join(pasta_dados, ARQUIVO_COMPACTADO)):
+        if snapshot != nome:
+            continue
+        destino = destino or os.path.join(pasta_dados, nome)
+        _gravar_registros(destino, registros, data_snapshot(nome))
+        return destino
+    raise ValueError(f"Snapshot não encontrado no arquivo compactado: {nome}")
+
+def main(argv=None) -> int:
+    """Linha de comando: compactar os snapshots expirados ou restaurar um snapshot"""
+    parser = argparse.ArgumentParser(description="Retenção e compactação dos snapshots de dados/")
+    parser.add_argument('--pasta', default='dados', help="pasta dos snapshots")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    compactacao = subcomandos.add_parser('compactar', help="move os snapshots expirados para o arquivo compactado")
+    compactacao.add_argument('--ultimos', type=int, default=MANTER_ULTIMOS, help="snapshots mais recentes mantidos")
+    compactacao.add_argument('--semanas', type=int, default=MANTER_SEMANAS, help="semanas com um snapshot mantido")
+    compactacao.add_argument('--meses', type=int, default=MANTER_MESES, help="meses com um snapshot mantido")
+    compactacao.add_argument('--simular', action='store_true', help="só mostra o que seria compactado")
+    
+    restauracao = subcomandos.add_parser('restaurar', help="regrava um snapshot compactado com o nome e o formato originais")
+    restauracao.add_argument('nome', help="nome original do snapshot")
+    restauracao.add_argument('--destino', help="arquivo de saída (o formato segue a extensão)")
+    
+    argumentos = parser.parse_args(argv)
+    try:
+        if argumentos.comando == 'compactar':
+            plano = compactar(argumentos.pasta, argumentos.ultimos, argumentos.semanas, argumentos.meses,
+                              simular=argumentos.simular)
+            if argumentos.simular:
+                for nome in plano.expirados:
+                    print(f"   • {nome}")
+        else:
+            print(f"✅ {restaurar_snapshot(argumentos.nome, argumentos.pasta, argumentos.destino)}")
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
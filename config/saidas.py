@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Adiciona o diretório raiz ao path para importação
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.coleta import processar_porcoes_conhecidas
+from config.log import obter_log
+from config.porcoes import COLUNAS_NUTRIENTES, coluna_por_porcao
+
+log = obter_log(__name__)
+
+# Registros mantidos em memória antes de cada gravação
+TAMANHO_LOTE_PADRAO = 50
+
+# No Parquet cada lote é um row group, então os lotes são maiores
+TAMANHO_LOTE_PARQUET = 5000
+
+# Tipos declarados das colunas no Parquet (as demais são texto)
+COLUNAS_CATEGORICAS = ('CATEGORIA', 'LOJA')
+COLUNAS_FLOAT = (COLUNAS_NUTRIENTES + tuple(coluna_por_porcao(coluna) for coluna in COLUNAS_NUTRIENTES)
+                 + ('PORCAO_FRACAO', 'PORCAO_QUANTIDADE'))
+
+class Saida:
+    """
+    Destino de um fluxo de registros, gravados em lotes de tamanho limitado.
+    
+    Subclasses implementam _gravar_lote; o arquivo só é criado na primeira
+    gravação, então uma coleta sem produtos não deixa arquivo vazio.
+    """
+    
+    def __init__(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        """
+        Args:
+            caminho: Arquivo de destino (sobrescrito se já existir)
+            tamanho_lote: Máximo de registros mantidos em memória
+        """
+        self.caminho = caminho
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.total = 0
+        self.categorias: Counter = Counter()
+        self.lojas: Counter = Counter()
+        self._lote: List[Dict[str, str]] = []
+        self._iniciada = False
+    
+    def escrever(self, registro: Dict[str, str]) -> None:
+        """Acrescenta um registro, gravando o lote quando ele enche"""
+        self._lote.append(registro)
+        # Contagens para o catálogo (config/catalogo.py), sem reler o arquivo
+        self.categorias[registro.get('CATEGORIA') or 'N/A'] += 1
+        if registro.get('LOJA'):
+            self.lojas[registro['LOJA']] += 1
+        if len(self._lote) >= self.tamanho_lote:
+            self.descarregar()
+    
+    def descarregar(self) -> None:
+        """Grava os registros pendentes"""
+        if not self._lote:
+            return
+        
+        if not self._iniciada:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        
+        df = processar_porcoes_conhecidas(pd.DataFrame(self._lote))
+        self._gravar_lote(df, primeiro=not self._iniciada)
+        self._iniciada = True
+        self.total += len(self._lote)
+        self._lote = []
+    
+    def fechar(self) -> None:
+        """Grava o que falta e libera o destino"""
+        self.descarregar()
+        if self.total:
+            log.info("Dados salvos em: %s", self.caminho)
+            log.info("Total de produtos coletados: %d", self.total)
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        raise NotImplementedError
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+class SaidaCSV(Saida):
+    """CSV com BOM UTF-8 e cabeçalho, como salvar_dados_csv"""
+    
+    def __init__(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        super().__init__(caminho, tamanho_lote)
+        self._colunas = None
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        if primeiro:
+            self._colunas = df.columns
+            df.to_csv(self.caminho, index=False, encoding='utf-8-sig')
+        else:
+            df.reindex(columns=self._colunas).to_csv(self.caminho, mode='a', header=False, index=False, encoding='utf-8')
+
+class SaidaJSONL(Saida):
+    """Um objeto JSON por linha"""
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        # Valores ausentes (ex: porção sem quantidade) viram null: NaN não é JSON válido
+        df = df.astype(object).where(df.notna(), None)
+        with open(self.caminho, 'w' if primeiro else 'a', encoding='utf-8') as arquivo:
+            for registro in df.to_dict('records'):
+                arquivo.write(json.dumps(registro, ensure_ascii=False, allow_nan=False) + '\n')
+
+class SaidaSQLite(Saida):
+    """Tabela SQLite, com uma transação por lote"""
+    
+    def __init__(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO, tabela: str = 'produtos'):
+        super().__init__(caminho, tamanho_lote)
+        self.tabela = tabela
+        self._conexao: Optional[sqlite3.Connection] = None
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho)
+        with self._conexao:
+            df.to_sql(self.tabela, self._conexao, if_exists='replace' if primeiro else 'append', index=False)
+    
+    def fechar(self) -> None:
+        super().fechar()
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+class SaidaParquet(Saida):
+    """
+    Parquet com esquema declarado: nutrientes em float32, CATEGORIA e LOJA
+    categóricas e a data da execução em DATA_COLETA. Cada lote vira um row group.
+    """
+    
+    def __init__(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE_PARQUET,
+                 data_coleta: Optional[datetime] = None, compressao: str = 'zstd'):
+        """
+        Args:
+            caminho: Arquivo de destino (sobrescrito se já existir)
+            tamanho_lote: Registros por row group
+            data_coleta: Momento da execução (padrão: agora)
+            compressao: Codec do Parquet ('zstd', 'snappy', 'gzip'...)
+        """
+        super().__init__(caminho, tamanho_lote)
+        self.data_coleta = (data_coleta or datetime.now()).replace(microsecond=0)
+        self.compressao = compressao
+        self._esquema = None
+        self._escritor = None
+    
+    def _gravar_lote(self, df: pd.DataFrame, primeiro: bool) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if self._esquema is None:
+            self._esquema = esquema_arrow(df.columns)
+            self._escritor = pq.ParquetWriter(self.caminho, self._esquema, compression=self.compressao)
+        
+        df = df.reindex(columns=[campo.name for campo in self._esquema if campo.name != 'DATA_COLETA'])
+        for coluna in df.columns:
+            if pa.types.is_floating(self._esquema.field(coluna).type):
+                df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+        df['DATA_COLETA'] = pd.Timestamp(self.data_coleta)
+        
+        self._escritor.write_table(pa.Table.from_pandas(df, schema=self._esquema, preserve_index=False))
+    
+    def fechar(self) -> None:
+        super().fechar()
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+def esquema_arrow(colunas: Iterable[str]):
+    """
+    Monta o esquema Arrow dos registros de produtos.
+    
+    Args:
+        colunas: Colunas do DataFrame, na ordem de gravação
+    
+    Returns:
+        pyarrow.Schema com DATA_COLETA ao final
+    """
+    import pyarrow as pa
+    
+    campos = []
+    for coluna in colunas:
+        if coluna in COLUNAS_CATEGORICAS:
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        elif coluna in COLUNAS_FLOAT:
+            tipo = pa.float32()
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(coluna, tipo))
+    campos.append(pa.field('DATA_COLETA', pa.timestamp('s')))
+    return pa.schema(campos)
+
+# Formatos de saída disponíveis
+SAIDAS = {
+    'csv': SaidaCSV,
+    'jsonl': SaidaJSONL,
+    'sqlite': SaidaSQLite,
+    'parquet': SaidaParquet,
+}
+
+def criar_saida(formato: str, caminho: str, tamanho_lote: Optional[int] = None) -> Saida:
+    """
+    Cria a saída de um formato.
+    
+    Args:
+        formato: Chave de SAIDAS ('csv', 'jsonl', 'sqlite' ou 'parquet')
+        caminho: Arquivo de destino
+        tamanho_lote: Máximo de registros mantidos em memória (None = padrão da saída)
+    
+    Returns:
+        Instância de Saida
+    """
+    if formato not in SAIDAS:
+        raise ValueError(f"Formato de saída desconhecido: {formato} (use {', '.join(SAIDAS)})")
+    if tamanho_lote is None:
+        return SAIDAS[formato](caminho)
+    return SAIDAS[formato](caminho, tamanho_lote)
+
+def consumir(registros: Iterable[Dict[str, str]], saidas: List[Saida],
+             progresso: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Envia cada registro do fluxo a todas as saídas, assim que ele chega.
+    
+    Args:
+        registros: Fluxo de registros (ex: iterar_produtos_the_coffee)
+        saidas: Saídas abertas; fechá-las continua a cargo de quem as criou
+        progresso: Função chamada com o número de registros já consumidos, a cada registro
+    
+    Returns:
+        Número de registros consumidos
+    """
+    total = 0
+    for registro in registros:
+        for saida in saidas:
+            saida.escrever(registro)
+        total += 1
+        if progresso:
+            progresso(total)
+    return total
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+from urllib.parse import urlparse
+
+# Só biblioteca padrão: importado pelo histórico, pelas consultas e pelo catálogo
+# sem carregar o Selenium (ver config/lojas.py para a descoberta das lojas)
+
+URL_RAIZ_LOJAS = "https://thecoffee.jp/shortcut/brasil"
+
+# Caminhos da hierarquia de atalhos: /shortcut/<país>/<cidade>/<loja>[/menu]
+REGEX_CAMINHO_SHORTCUT = re.compile(r'/shortcut/[a-z0-9-]+(?:/[a-z0-9-]+){0,3}', re.IGNORECASE)
+
+# Número de segmentos de /shortcut/<país>/<cidade>/<loja>
+SEGMENTOS_LOJA = 4
+
+def identificar_loja(url_menu: str) -> str:
+    """
+    Retorna o identificador da loja a partir da URL do menu.
+    
+    Args:
+        url_menu: URL como https://thecoffee.jp/shortcut/brasil/sao-paulo/the-coffee-vila-olimpia/menu
+    
+    Returns:
+        Identificador no formato país/cidade/loja (ex: brasil/sao-paulo/the-coffee-vila-olimpia)
+    """
+    segmentos = [segmento for segmento in urlparse(url_menu).path.split('/') if segmento]
+    if segmentos and segmentos[0] == 'shortcut':
+        segmentos = segmentos[1:]
+    if segmentos and segmentos[-1] == 'menu':
+        segmentos = segmentos[:-1]
+    return '/'.join(segmentos)
@@ -11,13 +11,20 @@ Desenvolvido para extrair informações completas de todos os produtos
 import os
 import sys
 import time
-import glob
+import argparse
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # Adiciona o diretório config ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config.coleta import main as executar_coleta
+from config.pool import PoolSessoes
+from config.checkpoint import Checkpoint
+from config.benchmark import estimar_duracao
+from config.catalogo import Catalogo
+
+# Pool com uma sessão do navegador, pré-aquecida enquanto o menu é exibido
+pool_sessoes = PoolSessoes(max_sessoes=1)
 
 # Cores ANSI para terminal
 class Cores:
@@ -31,6 +38,13 @@ class Cores:
     MAGENTA = '\033[95m'
     BRANCO = '\033[97m'
 
+def formatar_estimativa(num_produtos: int, padrao: str) -> str:
+    """Tempo estimado pela baseline do benchmark, ou o texto padrão se não houver baseline"""
+    segundos = estimar_duracao(num_produtos)
+    if segundos is None:
+        return padrao
+    return f"~{segundos / 60:.1f} minutos (baseline local do benchmark)"
+
 def limpar_terminal():
     """Limpa o terminal"""
     os.system('clear' if os.name == 'posix' else 'cls')
@@ -51,17 +65,15 @@ def mostrar_banner():
 {Cores.RESET}"""
     print(banner)
 
-def mostrar_barra_progresso(texto: str, duracao: float = 2.0):
-    """Exibe uma barra de progresso animada"""
-    print(f"\n{Cores.AMARELO}⏳ {texto}...{Cores.RESET}")
+def mostrar_progresso(concluidos: int, total: Optional[int] = None):
+    """Exibe o progresso pelo número real de produtos concluídos"""
+    if not total:
+        print(f"{Cores.VERDE}📦 {concluidos} produtos concluídos{Cores.RESET}", flush=True)
+        return
     barra_tamanho = 40
-    for i in range(barra_tamanho + 1):
-        progresso = i / barra_tamanho
-        barra = "█" * i + "░" * (barra_tamanho - i)
-        porcentagem = int(progresso * 100)
-        print(f"\r{Cores.VERDE}[{barra}] {porcentagem}%{Cores.RESET}", end="", flush=True)
-        time.sleep(duracao / barra_tamanho)
-    print()
+    preenchido = min(barra_tamanho, concluidos * barra_tamanho // total)
+    barra = "█" * preenchido + "░" * (barra_tamanho - preenchido)
+    print(f"{Cores.VERDE}[{barra}] {concluidos}/{total} ({min(100, concluidos * 100 // total)}%){Cores.RESET}", flush=True)
 
 def mostrar_menu():
     """Exibe o menu principal"""
@@ -75,7 +87,7 @@ def mostrar_menu():
 
 {Cores.VERDE}📁 GERENCIAR DADOS:{Cores.RESET}
   {Cores.AMARELO}4.{Cores.RESET} 📋 {Cores.BRANCO}Ver Arquivos Gerados{Cores.RESET} - Lista arquivos CSV criados
-  {Cores.AMARELO}5.{Cores.RESET} 🗑️  {Cores.BRANCO}Limpar Dados Antigos{Cores.RESET} - Remove arquivos antigos
+  {Cores.AMARELO}5.{Cores.RESET} 🗑️  {Cores.BRANCO}Compactar Dados Antigos{Cores.RESET} - Arquiva snapshots antigos
 
 {Cores.VERDE}ℹ️  INFORMAÇÕES:{Cores.RESET}
   {Cores.AMARELO}6.{Cores.RESET} 📖 {Cores.BRANCO}Sobre o Programa{Cores.RESET} - Informações e estatísticas
@@ -99,8 +111,6 @@ def executar_teste_rapido():
     print(f"\n{Cores.CIANO}{Cores.BOLD}🧪 INICIANDO TESTE RÁPIDO{Cores.RESET}")
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
-    mostrar_barra_progresso("Preparando ambiente", 1.5)
-    
     print(f"\n{Cores.VERDE}✅ Configurações:{Cores.RESET}")
     print(f"   📊 Produtos: {Cores.AMARELO}3 produtos{Cores.RESET}")
     print(f"   📁 Destino: {Cores.AMARELO}pasta dados/{Cores.RESET}")
@@ -111,7 +121,7 @@ def executar_teste_rapido():
     if confirmar in ['s', 'sim', 'y', 'yes']:
         try:
             print(f"\n{Cores.VERDE}🚀 Iniciando coleta...{Cores.RESET}")
-            executar_coleta(modo_teste=True)
+            executar_coleta(modo_teste=True, pool=pool_sessoes, progresso=lambda concluidos: mostrar_progresso(concluidos, 3))
             print(f"\n{Cores.VERDE}✅ Teste concluído com sucesso!{Cores.RESET}")
         except Exception as e:
             print(f"\n{Cores.VERMELHO}❌ Erro durante o teste: {e}{Cores.RESET}")
@@ -124,7 +134,7 @@ def executar_coleta_completa():
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
     print(f"\n{Cores.AMARELO}⚠️  ATENÇÃO:{Cores.RESET}")
-    print(f"   • Este processo pode demorar {Cores.VERMELHO}15-30 minutos{Cores.RESET}")
+    print(f"   • Este processo pode demorar {Cores.VERMELHO}{formatar_estimativa(61, '15-30 minutos')}{Cores.RESET}")
     print(f"   • Será coletado dados de {Cores.AMARELO}~61 produtos{Cores.RESET}")
     print(f"   • O navegador rodará em modo headless (sem interface gráfica)")
     print(f"   • {Cores.VERDE}NÃO interrompa o processo manualmente{Cores.RESET}")
@@ -133,11 +143,15 @@ def executar_coleta_completa():
     
     if confirmar in ['s', 'sim', 'y', 'yes']:
         try:
-            mostrar_barra_progresso("Preparando para coleta completa", 2.0)
             print(f"\n{Cores.VERDE}🚀 Iniciando coleta completa...{Cores.RESET}")
             print(f"{Cores.CIANO}📱 Acompanhe o progresso no terminal{Cores.RESET}")
             
-            executar_coleta(modo_teste=False)
+            retomar = False
+            if Checkpoint().existe():
+                resposta = input(f"{Cores.MAGENTA}♻️  Há uma coleta interrompida. Retomar de onde parou? (S/n): {Cores.RESET}").lower()
+                retomar = resposta not in ['n', 'nao', 'não', 'no']
+            
+            executar_coleta(modo_teste=False, pool=pool_sessoes, retomar=retomar, progresso=mostrar_progresso)
             
             print(f"\n{Cores.VERDE}🎉 COLETA COMPLETA FINALIZADA COM SUCESSO!{Cores.RESET}")
             mostrar_estatisticas_coleta()
@@ -168,16 +182,17 @@ def executar_coleta_personalizada():
         
         print(f"\n{Cores.VERDE}✅ Configuração:{Cores.RESET}")
         print(f"   📊 Produtos: {Cores.AMARELO}{num} produtos{Cores.RESET}")
-        print(f"   ⏱️  Tempo estimado: {Cores.AMARELO}~{num * 0.5:.1f} minutos{Cores.RESET}")
+        print(f"   ⏱️  Tempo estimado: {Cores.AMARELO}{formatar_estimativa(num, f'~{num * 0.5:.1f} minutos')}{Cores.RESET}")
         
         confirmar = input(f"\n{Cores.MAGENTA}🤔 Continuar? (s/N): {Cores.RESET}").lower()
         
         if confirmar in ['s', 'sim', 'y', 'yes']:
             try:
                 print(f"\n{Cores.VERDE}🚀 Iniciando coleta de {num} produtos...{Cores.RESET}")
-                # Aqui você pode modificar a função para aceitar limite personalizado
-                # executar_coleta_com_limite(num)
-                print(f"{Cores.AMARELO}⚠️  Funcionalidade em desenvolvimento{Cores.RESET}")
+                executar_coleta(pool=pool_sessoes, limite_produtos=num,
+                                progresso=lambda concluidos: mostrar_progresso(concluidos, num))
+                print(f"\n{Cores.VERDE}✅ Coleta de {num} produtos concluída!{Cores.RESET}")
+                mostrar_estatisticas_coleta()
             except Exception as e:
                 print(f"\n{Cores.VERMELHO}❌ Erro durante a coleta: {e}{Cores.RESET}")
         else:
@@ -186,8 +201,16 @@ def executar_coleta_personalizada():
     except ValueError:
         print(f"{Cores.VERMELHO}❌ Por favor, digite um número válido{Cores.RESET}")
 
+def formatar_tamanho(tamanho: int) -> str:
+    """Tamanho em bytes em formato legível"""
+    if tamanho < 1024:
+        return f"{tamanho} B"
+    if tamanho < 1024 * 1024:
+        return f"{tamanho / 1024:.1f} KB"
+    return f"{tamanho / (1024 * 1024):.1f} MB"
+
 def listar_arquivos_gerados():
-    """Lista todos os arquivos CSV gerados"""
+    """Lista os arquivos de dados a partir do catálogo (dados/catalogo.json)"""
     print(f"\n{Cores.CIANO}{Cores.BOLD}📋 ARQUIVOS GERADOS{Cores.RESET}")
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
@@ -195,60 +218,71 @@ def listar_arquivos_gerados():
         print(f"{Cores.AMARELO}📁 Pasta 'dados' não encontrada{Cores.RESET}")
         return
     
-    arquivos = glob.glob("dados/*.csv")
+    catalogo = Catalogo("dados")
+    arquivos = catalogo.reconciliar()
+    compactados = catalogo.compactados()
+    
+    if compactados:
+        produtos = sum(entrada.get('linhas') or 0 for entrada in compactados.values())
+        print(f"\n{Cores.VERDE}🗜️  {len(compactados)} snapshots antigos compactados ({produtos} produtos){Cores.RESET}")
     
     if not arquivos:
-        print(f"{Cores.AMARELO}📄 Nenhum arquivo CSV encontrado na pasta 'dados'{Cores.RESET}")
+        print(f"{Cores.AMARELO}📄 Nenhum arquivo de dados encontrado na pasta 'dados'{Cores.RESET}")
         return
     
     print(f"\n{Cores.VERDE}📊 Total de arquivos: {len(arquivos)}{Cores.RESET}\n")
     
-    for i, arquivo in enumerate(sorted(arquivos, reverse=True), 1):
-        nome_arquivo = os.path.basename(arquivo)
-        tamanho = os.path.getsize(arquivo)
-        data_modificacao = datetime.fromtimestamp(os.path.getmtime(arquivo))
-        
-        # Calcula o tamanho em formato legível
-        if tamanho < 1024:
-            tamanho_str = f"{tamanho} B"
-        elif tamanho < 1024 * 1024:
-            tamanho_str = f"{tamanho / 1024:.1f} KB"
-        else:
-            tamanho_str = f"{tamanho / (1024 * 1024):.1f} MB"
+    for i, entrada in enumerate(arquivos, 1):
+        data_modificacao = datetime.fromtimestamp(entrada['modificado'] / 1e9)
         
-        print(f"{Cores.AMARELO}{i:2d}.{Cores.RESET} {Cores.BRANCO}{nome_arquivo}{Cores.RESET}")
+        print(f"{Cores.AMARELO}{i:2d}.{Cores.RESET} {Cores.BRANCO}{entrada['arquivo']}{Cores.RESET}")
         print(f"     📅 {data_modificacao.strftime('%d/%m/%Y %H:%M:%S')}")
-        print(f"     📏 {tamanho_str}")
+        print(f"     📏 {formatar_tamanho(entrada['tamanho'])}")
+        if entrada['linhas'] is not None:
+            print(f"     🧾 {entrada['linhas']} produtos em {len(entrada['categorias'])} categorias")
+        if entrada['lojas']:
+            lojas = list(entrada['lojas'])
+            print(f"     🏪 {lojas[0] if len(lojas) == 1 else f'{len(lojas)} lojas'}")
+        if entrada['duracao'] is not None:
+            print(f"     ⏱️  {entrada['duracao']:.0f}s de coleta")
         print()
 
 def limpar_dados_antigos():
-    """Remove arquivos CSV antigos"""
-    print(f"\n{Cores.CIANO}{Cores.BOLD}🗑️  LIMPAR DADOS ANTIGOS{Cores.RESET}")
+    """Compacta os snapshots expirados pela política de retenção (config/retencao.py)"""
+    from config.retencao import compactar, MANTER_ULTIMOS, MANTER_SEMANAS, MANTER_MESES, ARQUIVO_COMPACTADO
+    
+    print(f"\n{Cores.CIANO}{Cores.BOLD}🗜️  COMPACTAR DADOS ANTIGOS{Cores.RESET}")
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
     if not os.path.exists("dados"):
         print(f"{Cores.AMARELO}📁 Pasta 'dados' não encontrada{Cores.RESET}")
         return
     
-    arquivos = glob.glob("dados/*.csv")
+    print(f"\n{Cores.VERDE}📋 Política de retenção:{Cores.RESET}")
+    print(f"   • Os {MANTER_ULTIMOS} snapshots mais recentes")
+    print(f"   • O mais recente de cada uma das últimas {MANTER_SEMANAS} semanas")
+    print(f"   • O mais recente de cada um dos últimos {MANTER_MESES} meses\n")
     
-    if not arquivos:
-        print(f"{Cores.VERDE}✅ Nenhum arquivo para limpar{Cores.RESET}")
+    plano = compactar("dados", simular=True)
+    if not plano.expirados:
+        print(f"{Cores.VERDE}✅ Nenhum snapshot para compactar{Cores.RESET}")
         return
     
-    print(f"\n{Cores.AMARELO}⚠️  ATENÇÃO:{Cores.RESET}")
-    print(f"   • Serão removidos {Cores.VERMELHO}{len(arquivos)} arquivos{Cores.RESET}")
-    print(f"   • Esta ação {Cores.VERMELHO}NÃO PODE ser desfeita{Cores.RESET}")
+    for nome in plano.expirados:
+        print(f"   • {nome}")
+    print(f"\n{Cores.AMARELO}⚠️  Os snapshots acima serão movidos para dados/{ARQUIVO_COMPACTADO}{Cores.RESET}")
+    print(f"   • Só as linhas que mudaram entre as coletas são guardadas")
+    print(f"   • As consultas continuam lendo esses snapshots")
+    print(f"   • Restaurar um snapshot: python config/retencao.py restaurar <nome>")
     
-    confirmar = input(f"\n{Cores.MAGENTA}🤔 Tem certeza? Digite 'CONFIRMAR' para prosseguir: {Cores.RESET}")
+    confirmar = input(f"\n{Cores.MAGENTA}🤔 Compactar agora? (s/N): {Cores.RESET}").strip().lower()
     
-    if confirmar == "CONFIRMAR":
+    if confirmar in ['s', 'sim', 'y', 'yes']:
         try:
-            for arquivo in arquivos:
-                os.remove(arquivo)
-            print(f"\n{Cores.VERDE}✅ {len(arquivos)} arquivos removidos com sucesso!{Cores.RESET}")
+            compactar("dados")
+            print(f"\n{Cores.VERDE}✅ {len(plano.expirados)} snapshots compactados com sucesso!{Cores.RESET}")
         except Exception as e:
-            print(f"\n{Cores.VERMELHO}❌ Erro ao remover arquivos: {e}{Cores.RESET}")
+            print(f"\n{Cores.VERMELHO}❌ Erro ao compactar os snapshots: {e}{Cores.RESET}")
     else:
         print(f"{Cores.AMARELO}⏭️  Operação cancelada{Cores.RESET}")
 
@@ -306,15 +340,20 @@ def mostrar_sobre():
     print(sobre)
 
 def mostrar_estatisticas_coleta():
-    """Mostra estatísticas da última coleta"""
-    arquivos = glob.glob("dados/*.csv")
+    """Mostra estatísticas da última coleta, lidas do catálogo"""
+    arquivos = Catalogo("dados").reconciliar()
     if arquivos:
-        arquivo_mais_recente = max(arquivos, key=os.path.getctime)
-        tamanho = os.path.getsize(arquivo_mais_recente)
+        entrada = arquivos[0]
         
         print(f"\n{Cores.VERDE}📈 ESTATÍSTICAS DA COLETA:{Cores.RESET}")
-        print(f"   📁 Arquivo: {Cores.AMARELO}{os.path.basename(arquivo_mais_recente)}{Cores.RESET}")
-        print(f"   📏 Tamanho: {Cores.AMARELO}{tamanho / 1024:.1f} KB{Cores.RESET}")
+        print(f"   📁 Arquivo: {Cores.AMARELO}{entrada['arquivo']}{Cores.RESET}")
+        print(f"   📏 Tamanho: {Cores.AMARELO}{formatar_tamanho(entrada['tamanho'])}{Cores.RESET}")
+        if entrada['linhas'] is not None:
+            print(f"   🧾 Produtos: {Cores.AMARELO}{entrada['linhas']}{Cores.RESET}")
+            for categoria, quantidade in sorted(entrada['categorias'].items(), key=lambda item: -item[1]):
+                print(f"      • {categoria}: {quantidade}")
+        if entrada['duracao'] is not None:
+            print(f"   ⏱️  Duração: {Cores.AMARELO}{entrada['duracao']:.0f}s{Cores.RESET}")
         print(f"   💾 Local: {Cores.AMARELO}dados/{Cores.RESET}")
 
 def pausar():
@@ -323,6 +362,9 @@ def pausar():
 
 def main():
     """Função principal do programa"""
+    # Inicia o navegador em segundo plano para as opções 1 e 2 começarem na hora
+    pool_sessoes.pre_aquecer()
+    
     try:
         while True:
             limpar_terminal()
@@ -368,6 +410,77 @@ def main():
         print(f"\n\n{Cores.AMARELO}👋 Programa encerrado pelo usuário. Até logo!{Cores.RESET}\n")
     except Exception as e:
         print(f"\n{Cores.VERMELHO}❌ Erro inesperado: {e}{Cores.RESET}")
+    finally:
+        pool_sessoes.encerrar()
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Argumentos da coleta não interativa (sem argumentos, abre o menu)"""
+    parser = argparse.ArgumentParser(
+        description="Scraper The Coffee. Sem argumentos abre o menu interativo; "
+                    "com argumentos executa a coleta direto, sem perguntas (cron, CI).",
+        epilog="Subcomandos: 'python main.py consulta ...' e 'python main.py benchmark ...'")
+    parser.add_argument('--limit', type=int, metavar='N', help="número de produtos a coletar (padrão: todos)")
+    parser.add_argument('--engine', choices=['navegador', 'http', 'auto'], default='navegador',
+                        help="motor da coleta (padrão: navegador)")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="processos com navegador próprio (padrão: 1, coleta sequencial)")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl', 'sqlite', 'parquet'], default='csv',
+                        help="formato do arquivo de saída (padrão: csv)")
+    parser.add_argument('--all-stores', action='store_true',
+                        help="descobre e coleta os menus de todas as lojas em um único arquivo")
+    parser.add_argument('--quiet', action='store_true', help="mostra apenas avisos, erros e o arquivo gerado")
+    parser.add_argument('--batch', action='store_true', help="coleta completa sem perguntas, com as opções padrão")
+    return parser
+
+def executar_lote(argv: List[str]) -> int:
+    """
+    Executa a coleta sem o menu interativo.
+    
+    Args:
+        argv: Argumentos da linha de comando (ver criar_parser)
+    
+    Returns:
+        Código de saída: 0 se algum dado foi salvo, 1 caso contrário
+    """
+    argumentos = criar_parser().parse_args(argv)
+    if argumentos.limit is not None and argumentos.limit < 1:
+        print("❌ --limit deve ser maior que zero", file=sys.stderr)
+        return 2
+    
+    # Sem terminal (cron, CI) as cores só poluiriam o log
+    if not sys.stdout.isatty():
+        for nome in vars(Cores).copy():
+            if nome.isupper():
+                setattr(Cores, nome, '')
+    
+    from config.log import configurar_log
+    configurar_log(silencioso=argumentos.quiet)
+    
+    progresso = None
+    if not argumentos.quiet:
+        progresso = lambda concluidos: mostrar_progresso(concluidos, argumentos.limit)
+    
+    inicio = time.perf_counter()
+    arquivo = executar_coleta(limite_produtos=argumentos.limit, motor=argumentos.engine, num_workers=argumentos.workers,
+                              formato_saida=argumentos.output_format, todas_lojas=argumentos.all_stores,
+                              progresso=progresso)
+    if not arquivo:
+        return 1
+    print(f"✅ {arquivo} ({time.perf_counter() - inicio:.0f}s)")
+    return 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Subcomando de consulta: python main.py consulta --ordenar acucares --categoria "BEBIDAS AUTORAIS"
+    if len(sys.argv) > 1 and sys.argv[1] == 'consulta':
+        from config.consultas import main as executar_consulta
+        executar_consulta(sys.argv[2:])
+    # Benchmark das etapas: python main.py benchmark executar | comparar
+    elif len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        from config.benchmark import main as executar_benchmark
+        sys.exit(executar_benchmark(sys.argv[2:]))
+    # Coleta não interativa: python main.py --limit 10 --engine auto --output-format parquet --quiet
+    # Todas as lojas: python main.py --all-stores --output-format jsonl
+    elif len(sys.argv) > 1:
+        sys.exit(executar_lote(sys.argv[1:]))
+    else:
+        main() 
\ No newline at end of file